@@ -0,0 +1,549 @@
+/**
+ * Benchmark suite for PDF operations and conversions
+ *
+ * Generates a deterministic corpus (text-heavy and image-heavy PDFs of
+ * several sizes, plus HTML documents for conversion), then times each
+ * operation on each input. Every case runs in its own child process, so
+ * peak RSS and heap are that case's alone. Results are written to
+ * benchmarks/results.json and compared against benchmarks/baseline.json;
+ * cases that got slower or hungrier than the threshold are flagged and
+ * the run exits non-zero.
+ *
+ *   npm run bench                       # measure and compare
+ *   npm run bench -- --update-baseline  # measure and record a new baseline
+ *   npm run bench -- --only merge,split --corpus text-100 --iterations 10
+ *
+ * Thumbnail rendering needs `canvas` and `pdfjs-dist`, conversion needs
+ * LibreOffice + unoserver (see officePool); cases without them are
+ * reported as skipped rather than failing the run.
+ */
+
+import { fork } from 'child_process';
+import { existsSync, mkdirSync, readFileSync, rmSync, writeFileSync } from 'fs';
+import { cpus, tmpdir, totalmem } from 'os';
+import { join } from 'path';
+import { performance } from 'perf_hooks';
+import { deflateSync } from 'zlib';
+import { PDFDocument, StandardFonts } from 'pdf-lib';
+import { mergePDFs, splitPDF, extractPages, rotatePages } from './pdfOperations';
+import { readPDFMetadata } from './pdfMetadata';
+import { getOfficePool } from './officePool';
+
+// Bump when the generated corpus changes so stale files are rebuilt
+const CORPUS_VERSION = 1;
+const CORPUS_DIR = join(tmpdir(), 'pdf-merger-bench', `corpus-v${CORPUS_VERSION}`);
+const RESULTS_DIR = join(__dirname, '..', 'benchmarks');
+const RESULTS_FILE = join(RESULTS_DIR, 'results.json');
+const BASELINE_FILE = join(RESULTS_DIR, 'baseline.json');
+
+const DEFAULT_ITERATIONS = 5;
+const DEFAULT_THRESHOLD = 0.2; // Flag cases more than 20% slower or larger than baseline
+const THUMBNAIL_PAGES = 10;
+const THUMBNAIL_WIDTH = 150;
+const MEMORY_SAMPLE_MS = 5;
+
+type CorpusKind = 'text' | 'image' | 'document';
+
+interface CorpusSpec {
+  name: string;
+  kind: CorpusKind;
+  pages: number;
+}
+
+export const CORPUS: CorpusSpec[] = [
+  { name: 'text-10', kind: 'text', pages: 10 },
+  { name: 'text-100', kind: 'text', pages: 100 },
+  { name: 'text-500', kind: 'text', pages: 500 },
+  { name: 'image-10', kind: 'image', pages: 10 },
+  { name: 'image-50', kind: 'image', pages: 50 },
+  { name: 'document-5', kind: 'document', pages: 5 },
+  { name: 'document-50', kind: 'document', pages: 50 },
+];
+
+interface Operation {
+  name: string;
+  kinds: CorpusKind[];
+  // Resolves with the number of pages processed
+  run: (input: Uint8Array, spec: CorpusSpec) => Promise<number>;
+  // Resolves with a reason when the operation can't run on this machine
+  unavailable?: () => Promise<string | null>;
+}
+
+const PDF_KINDS: CorpusKind[] = ['text', 'image'];
+const allPages = (count: number) => Array.from({ length: count }, (_, i) => i + 1);
+
+export const OPERATIONS: Operation[] = [
+  {
+    name: 'merge',
+    kinds: PDF_KINDS,
+    run: async (input, spec) => {
+      await mergePDFs([input, input]);
+      return spec.pages * 2;
+    },
+  },
+  {
+    name: 'split',
+    kinds: PDF_KINDS,
+    run: async (input, spec) => {
+      const points = allPages(spec.pages).filter((page) => page % 10 === 0);
+      await splitPDF(input, points);
+      return spec.pages;
+    },
+  },
+  {
+    name: 'extract',
+    kinds: PDF_KINDS,
+    run: async (input, spec) => {
+      const odd = allPages(spec.pages).filter((page) => page % 2 === 1);
+      await extractPages(input, odd);
+      return odd.length;
+    },
+  },
+  {
+    name: 'rotate',
+    kinds: PDF_KINDS,
+    run: async (input, spec) => {
+      await rotatePages(input, allPages(spec.pages), 90);
+      return spec.pages;
+    },
+  },
+  {
+    name: 'metadata',
+    kinds: PDF_KINDS,
+    run: async (input) => (await readPDFMetadata(input)).pageCount,
+  },
+  {
+    name: 'thumbnails',
+    kinds: PDF_KINDS,
+    unavailable: async () => {
+      try {
+        require.resolve('canvas');
+        require.resolve('pdfjs-dist/legacy/build/pdf.js');
+        return null;
+      } catch {
+        return 'canvas and pdfjs-dist are not installed';
+      }
+    },
+    run: async (input, spec) => {
+      const pdfjs = require('pdfjs-dist/legacy/build/pdf.js');
+      const { createCanvas } = require('canvas');
+      // pdf.js takes ownership of the buffer it is given
+      const doc = await pdfjs.getDocument({ data: input.slice(), isEvalSupported: false }).promise;
+      const count = Math.min(spec.pages, THUMBNAIL_PAGES);
+
+      for (let pageNumber = 1; pageNumber <= count; pageNumber++) {
+        const page = await doc.getPage(pageNumber);
+        const unscaled = page.getViewport({ scale: 1 });
+        const viewport = page.getViewport({ scale: THUMBNAIL_WIDTH / unscaled.width });
+        const canvas = createCanvas(Math.ceil(viewport.width), Math.ceil(viewport.height));
+        await page.render({ canvasContext: canvas.getContext('2d'), viewport }).promise;
+        canvas.toBuffer('image/png');
+        page.cleanup();
+      }
+
+      await doc.destroy();
+      return count;
+    },
+  },
+  {
+    name: 'convert',
+    kinds: ['document'],
+    unavailable: async () => {
+      try {
+        await getOfficePool().warmUp();
+        return null;
+      } catch (error) {
+        return `office pool unavailable (${error instanceof Error ? error.message : String(error)})`;
+      }
+    },
+    run: async (input, spec) => {
+      const workDir = join(tmpdir(), `bench-convert-${process.pid}`);
+      mkdirSync(workDir, { recursive: true });
+      const inputPath = join(workDir, `${spec.name}.html`);
+      const outputPath = join(workDir, `${spec.name}.pdf`);
+      try {
+        writeFileSync(inputPath, input);
+        await getOfficePool().convert(inputPath, outputPath);
+        return (await readPDFMetadata(readFileSync(outputPath))).pageCount;
+      } finally {
+        rmSync(workDir, { recursive: true, force: true });
+      }
+    },
+  },
+];
+
+// --- Corpus generation (seeded, so every machine builds identical files) ---
+
+function seededRandom(seed: number): () => number {
+  // mulberry32
+  return () => {
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+const WORDS = (
+  'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut ' +
+  'labore et dolore magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris'
+).split(' ');
+
+function sentence(random: () => number, words: number): string {
+  return Array.from({ length: words }, () => WORDS[Math.floor(random() * WORDS.length)]).join(' ');
+}
+
+const CRC_TABLE = Array.from({ length: 256 }, (_, n) => {
+  let c = n;
+  for (let k = 0; k < 8; k++) c = c & 1 ? 0xedb88320 ^ (c >>> 1) : c >>> 1;
+  return c >>> 0;
+});
+
+function crc32(data: Buffer): number {
+  let crc = 0xffffffff;
+  for (const byte of data) crc = CRC_TABLE[(crc ^ byte) & 0xff] ^ (crc >>> 8);
+  return (crc ^ 0xffffffff) >>> 0;
+}
+
+/**
+ * Noise image as a PNG; noise doesn't compress, like scanned pages
+ */
+function noisePNG(random: () => number, width: number, height: number): Buffer {
+  const rows = Buffer.alloc((width * 3 + 1) * height);
+  for (let i = 0; i < rows.length; i++) {
+    rows[i] = i % (width * 3 + 1) === 0 ? 0 : Math.floor(random() * 256);
+  }
+
+  const chunk = (type: string, data: Buffer) => {
+    const body = Buffer.concat([Buffer.from(type, 'ascii'), data]);
+    const length = Buffer.alloc(4);
+    length.writeUInt32BE(data.length);
+    const crc = Buffer.alloc(4);
+    crc.writeUInt32BE(crc32(body));
+    return Buffer.concat([length, body, crc]);
+  };
+
+  const header = Buffer.alloc(13);
+  header.writeUInt32BE(width, 0);
+  header.writeUInt32BE(height, 4);
+  header.set([8, 2, 0, 0, 0], 8); // 8-bit RGB
+
+  return Buffer.concat([
+    Buffer.from([0x89, 0x50, 0x4e, 0x47, 0x0d, 0x0a, 0x1a, 0x0a]),
+    chunk('IHDR', header),
+    chunk('IDAT', deflateSync(rows)),
+    chunk('IEND', Buffer.alloc(0)),
+  ]);
+}
+
+async function generatePDF(spec: CorpusSpec): Promise<Uint8Array> {
+  const random = seededRandom(spec.pages * 7919 + spec.kind.length);
+  const doc = await PDFDocument.create();
+  doc.setCreationDate(new Date(0));
+  doc.setModificationDate(new Date(0));
+  const font = await doc.embedFont(StandardFonts.Helvetica);
+
+  for (let i = 0; i < spec.pages; i++) {
+    const page = doc.addPage([612, 792]);
+    if (spec.kind === 'image') {
+      const image = await doc.embedPng(noisePNG(random, 400, 400));
+      page.drawImage(image, { x: 106, y: 196, width: 400, height: 400 });
+      page.drawText(`Scanned page ${i + 1}`, { x: 72, y: 740, size: 12, font });
+    } else {
+      for (let line = 0; line < 60; line++) {
+        page.drawText(sentence(random, 14), { x: 72, y: 740 - line * 11, size: 9, font });
+      }
+    }
+  }
+
+  return doc.save();
+}
+
+function generateDocument(spec: CorpusSpec): Uint8Array {
+  const random = seededRandom(spec.pages * 104729);
+  const paragraphs = Array.from({ length: spec.pages * 8 }, (_, i) =>
+    i % 8 === 0 ? `<h2>Section ${i / 8 + 1}</h2>` : `<p>${sentence(random, 60)}</p>`
+  );
+  return Buffer.from(`<!DOCTYPE html><html><body>${paragraphs.join('\n')}</body></html>`);
+}
+
+function corpusPath(spec: CorpusSpec): string {
+  return join(CORPUS_DIR, `${spec.name}.${spec.kind === 'document' ? 'html' : 'pdf'}`);
+}
+
+async function ensureCorpus(specs: CorpusSpec[]): Promise<void> {
+  mkdirSync(CORPUS_DIR, { recursive: true });
+  for (const spec of specs) {
+    const path = corpusPath(spec);
+    if (existsSync(path)) continue;
+    const bytes = spec.kind === 'document' ? generateDocument(spec) : await generatePDF(spec);
+    writeFileSync(path, bytes);
+    console.log(`Generated ${spec.name} (${(bytes.byteLength / 1024 / 1024).toFixed(1)}MB)`);
+  }
+}
+
+// --- Measurement ---
+
+export interface CaseResult {
+  operation: string;
+  corpus: string;
+  pages: number; // Pages processed per iteration
+  inputBytes: number;
+  iterations: number;
+  wallMs?: { median: number; min: number; max: number };
+  peakRssMB?: number;
+  peakHeapMB?: number;
+  pagesPerSec?: number;
+  mbPerSec?: number;
+  skipped?: string;
+}
+
+export interface BenchmarkReport {
+  version: number;
+  recordedAt: string;
+  environment: { node: string; platform: string; cpu: string; cores: number; memoryMB: number };
+  results: CaseResult[];
+}
+
+const round = (value: number, digits = 1) => Number(value.toFixed(digits));
+const toMB = (bytes: number) => bytes / 1024 / 1024;
+
+/**
+ * Time one operation on one corpus file (runs inside the child process)
+ */
+async function measureCase(operation: Operation, spec: CorpusSpec, iterations: number): Promise<CaseResult> {
+  const input = new Uint8Array(readFileSync(corpusPath(spec)));
+  const base = { operation: operation.name, corpus: spec.name, pages: 0, inputBytes: input.byteLength, iterations };
+
+  const reason = operation.unavailable ? await operation.unavailable() : null;
+  if (reason) return { ...base, skipped: reason };
+
+  const gc = (global as unknown as { gc?: () => void }).gc;
+
+  // Warm-up run (JIT, lazy module loads, pool start-up) is not timed
+  const pages = await operation.run(input, spec);
+  gc?.();
+
+  let peakHeap = 0;
+  const sampler = setInterval(() => {
+    peakHeap = Math.max(peakHeap, process.memoryUsage().heapUsed);
+  }, MEMORY_SAMPLE_MS);
+
+  const times: number[] = [];
+  try {
+    for (let i = 0; i < iterations; i++) {
+      const started = performance.now();
+      await operation.run(input, spec);
+      times.push(performance.now() - started);
+      peakHeap = Math.max(peakHeap, process.memoryUsage().heapUsed);
+    }
+  } finally {
+    clearInterval(sampler);
+  }
+
+  times.sort((a, b) => a - b);
+  const median = times[Math.floor(times.length / 2)];
+
+  return {
+    ...base,
+    pages,
+    wallMs: { median: round(median), min: round(times[0]), max: round(times[times.length - 1]) },
+    // maxRSS is reported in kilobytes and covers this child process only
+    peakRssMB: round(process.resourceUsage().maxRSS / 1024),
+    peakHeapMB: round(toMB(peakHeap)),
+    pagesPerSec: round((pages / median) * 1000),
+    mbPerSec: round((toMB(input.byteLength) / median) * 1000, 2),
+  };
+}
+
+/**
+ * Run a case in a fresh child process so memory figures aren't shared
+ */
+function runIsolated(operation: string, corpus: string, iterations: number): Promise<CaseResult> {
+  return new Promise((resolve, reject) => {
+    const child = fork(__filename, ['--child', operation, corpus, String(iterations)], {
+      execArgv: ['--expose-gc'],
+    });
+    let result: CaseResult | null = null;
+    child.on('message', (message) => {
+      result = message as CaseResult;
+    });
+    child.on('error', reject);
+    child.on('exit', (code) => {
+      if (result) resolve(result);
+      else reject(new Error(`${operation} on ${corpus} exited with code ${code}`));
+    });
+  });
+}
+
+// --- Baseline comparison ---
+
+interface Regression {
+  operation: string;
+  corpus: string;
+  metric: string;
+  baseline: number;
+  current: number;
+}
+
+export function findRegressions(current: BenchmarkReport, baseline: BenchmarkReport, threshold: number): Regression[] {
+  const regressions: Regression[] = [];
+  const previous = new Map(baseline.results.map((result) => [`${result.operation}:${result.corpus}`, result]));
+
+  for (const result of current.results) {
+    const before = previous.get(`${result.operation}:${result.corpus}`);
+    if (!before || result.skipped || before.skipped) continue;
+
+    const metrics: Array<[string, number | undefined, number | undefined]> = [
+      ['wallMs.median', before.wallMs?.median, result.wallMs?.median],
+      ['peakRssMB', before.peakRssMB, result.peakRssMB],
+    ];
+    for (const [metric, was, now] of metrics) {
+      if (was !== undefined && now !== undefined && now > was * (1 + threshold)) {
+        regressions.push({ operation: result.operation, corpus: result.corpus, metric, baseline: was, current: now });
+      }
+    }
+  }
+
+  return regressions;
+}
+
+function printResults(results: CaseResult[]): void {
+  console.table(
+    results.map((result) => ({
+      operation: result.operation,
+      corpus: result.corpus,
+      'median ms': result.wallMs?.median ?? '-',
+      'peak RSS MB': result.peakRssMB ?? '-',
+      'peak heap MB': result.peakHeapMB ?? '-',
+      'pages/s': result.pagesPerSec ?? '-',
+      'MB/s': result.mbPerSec ?? '-',
+      note: result.skipped ?? '',
+    }))
+  );
+}
+
+interface CliOptions {
+  only?: string[];
+  corpus?: string[];
+  iterations: number;
+  threshold: number;
+  updateBaseline: boolean;
+}
+
+function parseArgs(argv: string[]): CliOptions {
+  const options: CliOptions = { iterations: DEFAULT_ITERATIONS, threshold: DEFAULT_THRESHOLD, updateBaseline: false };
+  for (let i = 0; i < argv.length; i++) {
+    const arg = argv[i];
+    if (arg === '--only') options.only = argv[++i].split(',');
+    else if (arg === '--corpus') options.corpus = argv[++i].split(',');
+    else if (arg === '--iterations') options.iterations = Number(argv[++i]);
+    else if (arg === '--threshold') options.threshold = Number(argv[++i]);
+    else if (arg === '--update-baseline') options.updateBaseline = true;
+    else throw new Error(`Unknown argument: ${arg}`);
+  }
+  return options;
+}
+
+async function main(argv: string[]): Promise<number> {
+  const options = parseArgs(argv);
+  const specs = CORPUS.filter((spec) => !options.corpus || options.corpus.includes(spec.name));
+  const operations = OPERATIONS.filter((operation) => !options.only || options.only.includes(operation.name));
+
+  await ensureCorpus(specs);
+
+  const results: CaseResult[] = [];
+  for (const operation of operations) {
+    for (const spec of specs.filter((candidate) => operation.kinds.includes(candidate.kind))) {
+      const result = await runIsolated(operation.name, spec.name, options.iterations);
+      console.log(
+        result.skipped
+          ? `- ${operation.name} ${spec.name}: skipped (${result.skipped})`
+          : `- ${operation.name} ${spec.name}: ${result.wallMs?.median}ms, ${result.peakRssMB}MB RSS`
+      );
+      results.push(result);
+    }
+  }
+
+  const report: BenchmarkReport = {
+    version: CORPUS_VERSION,
+    recordedAt: new Date().toISOString(),
+    environment: {
+      node: process.version,
+      platform: `${process.platform}-${process.arch}`,
+      cpu: cpus()[0]?.model ?? 'unknown',
+      cores: cpus().length,
+      memoryMB: Math.round(toMB(totalmem())),
+    },
+    results,
+  };
+
+  mkdirSync(RESULTS_DIR, { recursive: true });
+  writeFileSync(RESULTS_FILE, `${JSON.stringify(report, null, 2)}\n`);
+  printResults(results);
+  console.log(`Results written to ${RESULTS_FILE}`);
+
+  if (options.updateBaseline) {
+    writeFileSync(BASELINE_FILE, `${JSON.stringify(report, null, 2)}\n`);
+    console.log(`Baseline updated: ${BASELINE_FILE}`);
+    return 0;
+  }
+
+  if (!existsSync(BASELINE_FILE)) {
+    console.log('No baseline yet; record one with --update-baseline');
+    return 0;
+  }
+
+  const baseline = JSON.parse(readFileSync(BASELINE_FILE, 'utf8')) as BenchmarkReport;
+  if (baseline.version !== report.version) {
+    console.warn(`Baseline was recorded on corpus v${baseline.version}; re-record it with --update-baseline`);
+    return 0;
+  }
+  if (baseline.environment.cpu !== report.environment.cpu) {
+    console.warn(`Baseline was recorded on "${baseline.environment.cpu}"; timings may not be comparable`);
+  }
+
+  const regressions = findRegressions(report, baseline, options.threshold);
+  if (regressions.length === 0) {
+    console.log(`No regressions beyond ${options.threshold * 100}% of baseline`);
+    return 0;
+  }
+
+  console.error(`${regressions.length} regression(s) beyond ${options.threshold * 100}% of baseline:`);
+  for (const regression of regressions) {
+    console.error(
+      `  ${regression.operation} ${regression.corpus} ${regression.metric}: ${regression.baseline} -> ${regression.current}`
+    );
+  }
+  return 1;
+}
+
+if (require.main === module) {
+  const argv = process.argv.slice(2);
+
+  if (argv[0] === '--child') {
+    const [, operationName, corpusName, iterations] = argv;
+    const operation = OPERATIONS.find((candidate) => candidate.name === operationName);
+    const spec = CORPUS.find((candidate) => candidate.name === corpusName);
+
+    (async () => {
+      if (!operation || !spec) throw new Error(`Unknown case ${operationName} ${corpusName}`);
+      const result = await measureCase(operation, spec, Number(iterations));
+      if (operation.name === 'convert') await getOfficePool().shutdown();
+      // Exit only once the parent has the message
+      await new Promise<void>((resolve) => (process.send ? process.send(result, () => resolve()) : resolve()));
+    })()
+      .then(() => process.exit(0))
+      .catch((error) => {
+        console.error(error);
+        process.exit(1);
+      });
+  } else {
+    main(argv)
+      .then((code) => process.exit(code))
+      .catch((error) => {
+        console.error(error);
+        process.exit(1);
+      });
+  }
+}
@@ -11,14 +11,18 @@
 
 import * as functions from 'firebase-functions';
 import * as admin from 'firebase-admin';
-import { exec } from 'child_process';
+import { execFile } from 'child_process';
 import { promisify } from 'util';
-import { createReadStream, unlinkSync, existsSync } from 'fs';
+import { createReadStream, unlinkSync, existsSync, statSync, mkdtempSync, rmSync } from 'fs';
+import { rename } from 'fs/promises';
 import { tmpdir } from 'os';
-import { join } from 'path';
+import { basename, join } from 'path';
+import { pathToFileURL } from 'url';
 import { randomBytes } from 'crypto';
+import { DEFAULT_OFFICE_POOL_OPTIONS, getOfficePool } from './officePool';
+import { TraceContext, flushTrace, parseTraceparent, startSpan, withSpan } from './tracing';
 
-const execAsync = promisify(exec);
+const execFileAsync = promisify(execFile);
 const storage = admin.storage();
 const db = admin.firestore();
 
@@ -28,6 +32,7 @@ interface ConversionRequest {
   sourceFileName: string;
   sourceFileType: string;
   destinationType: 'word' | 'excel' | 'powerpoint';
+  traceparent?: string; // Set by the client; spans are returned in the response
 }
 
 /**
@@ -42,85 +47,23 @@ export const convertToPDF = functions.https.onCall(
     }
 
     const userId = context.auth.uid;
-    const { sourceFileUrl, sourceFileName, sourceFileType } = data;
+    const span = startSpan('convertToPDF', parseTraceparent(data.traceparent), {
+      fileName: data.sourceFileName,
+    });
 
     try {
-      // Validate file type
-      const validTypes = ['docx', 'doc', 'xlsx', 'xls', 'pptx', 'ppt'];
-      if (!validTypes.includes(sourceFileType.toLowerCase())) {
-        throw new functions.https.HttpsError(
-          'invalid-argument',
-          `Unsupported file type: ${sourceFileType}`
-        );
-      }
-
-      // Download source file
-      const tmpFile = join(tmpdir(), `${randomBytes(8).toString('hex')}_${sourceFileName}`);
-      const bucket = storage.bucket();
-      await bucket.file(sourceFileUrl).download({ destination: tmpFile });
-
-      // Convert to PDF
-      const pdfPath = tmpFile.replace(/\.[^/.]+$/, '.pdf');
-      await convertFileToPDF(tmpFile, pdfPath, sourceFileType);
-
-      // Upload PDF to Cloud Storage
-      const pdfFileName = sourceFileName.replace(/\.[^/.]+$/, '.pdf');
-      const destinationPath = `conversions/${userId}/${Date.now()}_${pdfFileName}`;
-
-      await bucket.upload(pdfPath, {
-        destination: destinationPath,
-        metadata: {
-          contentType: 'application/pdf',
-          metadata: {
-            sourceFileName,
-            sourceFileType,
-            convertedAt: new Date().toISOString(),
-            userId,
-          },
-        },
-      });
-
-      // Create signed URL (valid for 7 days)
-      const [signedUrl] = await bucket.file(destinationPath).getSignedUrl({
-        version: 'v4',
-        action: 'read',
-        expires: Date.now() + 7 * 24 * 60 * 60 * 1000,
-      });
-
-      // Store conversion record in Firestore
-      await db.collection('conversions').add({
-        userId,
-        sourceFileName,
-        sourceFileType,
-        pdfFileName,
-        pdfPath: destinationPath,
-        status: 'completed',
-        createdAt: new Date(),
-        fileSize: 0,
-      });
-
-      // Cleanup temporary files
-      if (existsSync(tmpFile)) unlinkSync(tmpFile);
-      if (existsSync(pdfPath)) unlinkSync(pdfPath);
+      const result = await runConversion(data, userId, span.context);
+      span.end();
 
       return {
         success: true,
-        pdfUrl: signedUrl,
-        fileName: pdfFileName,
-        timestamp: Date.now(),
+        ...result,
+        spans: await flushTrace(span.traceId),
       };
     } catch (error) {
-      console.error('Conversion error:', error);
-
-      // Store error record
-      await db.collection('conversions').add({
-        userId,
-        sourceFileName,
-        sourceFileType,
-        status: 'failed',
-        error: error instanceof Error ? error.message : 'Unknown error',
-        createdAt: new Date(),
-      });
+      await recordFailure(data, userId, error, span.context);
+      span.end(error);
+      await flushTrace(span.traceId);
 
       throw new functions.https.HttpsError(
         'internal',
@@ -130,14 +73,37 @@ export const convertToPDF = functions.https.onCall(
   }
 );
 
+// Cleared when unoserver isn't installed, so later calls skip straight to the one-shot path
+let officePoolAvailable = true;
+
 /**
- * Convert file to PDF using LibreOffice headless
+ * Convert file to PDF using the warm LibreOffice pool
+ * Falls back to a one-shot `libreoffice --headless` run where unoserver is missing.
  */
 async function convertFileToPDF(inputPath: string, outputPath: string, fileType: string) {
-  const command = `libreoffice --headless --convert-to pdf --outdir "${tmpdir()}" "${inputPath}"`;
+  if (officePoolAvailable) {
+    try {
+      await getOfficePool().convert(inputPath, outputPath);
+      return;
+    } catch (error) {
+      if ((error as NodeJS.ErrnoException).code !== 'ENOENT') throw error;
+      officePoolAvailable = false;
+      console.warn('unoserver not found, falling back to one-shot LibreOffice conversions');
+    }
+  }
+
+  // Each run gets its own output directory and profile: concurrent soffice
+  // runs on one shared profile fail or write nothing
+  const runDir = mkdtempSync(join(tmpdir(), 'soffice-oneshot-'));
 
   try {
-    const { stdout, stderr } = await execAsync(command);
+    const { stdout, stderr } = await execFileAsync('libreoffice', [
+      `-env:UserInstallation=${pathToFileURL(join(runDir, 'profile')).href}`,
+      '--headless',
+      '--convert-to', 'pdf',
+      '--outdir', runDir,
+      inputPath,
+    ]);
     console.log('LibreOffice output:', stdout);
 
     if (stderr) {
@@ -145,173 +111,480 @@ async function convertFileToPDF(inputPath: string, outputPath: string, fileType:
     }
 
     // Verify output file exists
-    const expectedOutput = inputPath.replace(/\.[^/.]+$/, '.pdf');
+    const expectedOutput = join(runDir, basename(inputPath).replace(/\.[^/.]+$/, '.pdf'));
     if (!existsSync(expectedOutput)) {
       throw new Error('PDF conversion did not produce output file');
     }
 
     // Move to desired output path
-    const { execSync } = require('child_process');
-    execSync(`mv "${expectedOutput}" "${outputPath}"`);
+    await rename(expectedOutput, outputPath);
   } catch (error) {
     throw new Error(`LibreOffice conversion failed: ${error instanceof Error ? error.message : String(error)}`);
+  } finally {
+    rmSync(runDir, { recursive: true, force: true });
+  }
+}
+
+// Batch tuning; items beyond the concurrency limit wait their turn. More
+// items in flight than pool instances would only queue inside the pool.
+const BATCH_CONCURRENCY = Number(
+  process.env.BATCH_CONVERSION_CONCURRENCY || DEFAULT_OFFICE_POOL_OPTIONS.size
+);
+const MAX_BATCH_CONCURRENCY = 8;
+const RETRY_ATTEMPTS = 3;
+const RETRY_BASE_DELAY_MS = 1000;
+
+type BatchItemStatus = 'queued' | 'processing' | 'retrying' | 'completed' | 'failed';
+
+interface BatchItemResult {
+  index: number;
+  status: BatchItemStatus;
+  fileName: string;
+  attempts: number;
+  pdfUrl?: string;
+  error?: string;
+}
+
+/**
+ * Run fn over items with at most `limit` calls in flight, preserving order
+ */
+async function mapWithConcurrency<T, R>(
+  items: T[],
+  limit: number,
+  fn: (item: T, index: number) => Promise<R>
+): Promise<R[]> {
+  const results: R[] = new Array(items.length);
+  let next = 0;
+
+  const worker = async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index], index);
+    }
+  };
+
+  await Promise.all(Array.from({ length: Math.min(limit, items.length) }, worker));
+  return results;
+}
+
+/**
+ * Bad input won't succeed on a second try; everything else (pool busy,
+ * LibreOffice crash, Storage hiccup) is worth retrying
+ */
+function isRetryable(error: unknown): boolean {
+  return !(error instanceof functions.https.HttpsError && error.code === 'invalid-argument');
+}
+
+/**
+ * Retry with exponential backoff and jitter
+ */
+async function withRetry<T>(
+  fn: () => Promise<T>,
+  onRetry: (attempt: number, error: unknown) => Promise<void>
+): Promise<{ result: T; attempts: number }> {
+  for (let attempt = 1; ; attempt++) {
+    try {
+      return { result: await fn(), attempts: attempt };
+    } catch (error) {
+      if (attempt >= RETRY_ATTEMPTS || !isRetryable(error)) {
+        throw Object.assign(error instanceof Error ? error : new Error(String(error)), { attempts: attempt });
+      }
+      await onRetry(attempt, error);
+      const backoff = RETRY_BASE_DELAY_MS * 2 ** (attempt - 1);
+      await new Promise((resolve) => setTimeout(resolve, backoff / 2 + Math.random() * backoff / 2));
+    }
   }
 }
 
 /**
  * Batch conversion function
- * Converts multiple files in sequence
+ * Converts up to `concurrency` files at a time and records each item on
+ * conversionBatches/{batchId} as it finishes, so clients can listen to that
+ * document and show or download results before the whole batch is done.
+ * Pass a client-generated batchId to subscribe before calling.
  */
-export const batchConvertToPDF = functions.https.onCall(
-  async (data: { conversions: ConversionRequest[] }, context) => {
+export const batchConvertToPDF = functions
+  .runWith({ timeoutSeconds: 540, memory: '2GB' })
+  .https.onCall(
+  async (
+    data: { conversions: ConversionRequest[]; batchId?: string; concurrency?: number; traceparent?: string },
+    context
+  ) => {
     if (!context.auth) {
       throw new functions.https.HttpsError('unauthenticated', 'User not authenticated');
     }
 
-    const results: any[] = [];
-
-    for (const conversionRequest of data.conversions) {
-      try {
-        const result = await handleConversionRequest(conversionRequest, context);
-        results.push({ success: true, ...result });
-      } catch (error) {
-        results.push({
-          success: false,
-          fileName: conversionRequest.sourceFileName,
-          error: error instanceof Error ? error.message : 'Unknown error',
-        });
-      }
+    const span = startSpan('batchConvertToPDF', parseTraceparent(data.traceparent));
+    try {
+      const result = await runBatch(data, context.auth.uid, span.context);
+      span.end();
+      return { ...result, spans: await flushTrace(span.traceId) };
+    } catch (error) {
+      span.end(error);
+      await flushTrace(span.traceId);
+      throw error;
     }
-
-    return { results };
   }
 );
 
 /**
- * Handle individual conversion request
+ * Convert a batch, recording each item on its conversionBatches document
  */
-async function handleConversionRequest(data: ConversionRequest, context: functions.https.CallableContext) {
-  // Verify authentication
-  if (!context.auth) {
-    throw new functions.https.HttpsError('unauthenticated', 'User not authenticated');
+async function runBatch(
+  data: { conversions: ConversionRequest[]; batchId?: string; concurrency?: number },
+  userId: string,
+  trace: TraceContext
+) {
+  const conversions = data.conversions || [];
+  const concurrency = Math.max(1, Math.min(MAX_BATCH_CONCURRENCY, data.concurrency || BATCH_CONCURRENCY));
+
+  const batchRef = data.batchId
+    ? db.collection('conversionBatches').doc(data.batchId)
+    : db.collection('conversionBatches').doc();
+
+  const existing = await batchRef.get();
+  if (existing.exists) {
+    throw new functions.https.HttpsError('already-exists', 'Batch ID already used');
   }
 
-  const userId = context.auth.uid;
-  const { sourceFileUrl, sourceFileName, sourceFileType } = data;
+  await withSpan('firestore.write', trace, () =>
+    batchRef.set({
+      batchId: batchRef.id,
+      userId,
+      status: 'processing',
+      total: conversions.length,
+      completed: 0,
+      failed: 0,
+      // A map keyed by index, not an array: updateItem writes `items.<index>`
+      // paths, which Firestore resolves as map keys
+      items: Object.fromEntries(
+        conversions.map((conversion, index) => [
+          index,
+          { index, status: 'queued', fileName: conversion.sourceFileName, attempts: 0 },
+        ])
+      ),
+      createdAt: admin.firestore.Timestamp.now(),
+    })
+  );
+
+  // Each item owns its own field path, so concurrent updates never collide
+  const updateItem = (item: BatchItemResult, parent: TraceContext, counters: Record<string, number> = {}) =>
+    withSpan(
+      'firestore.write',
+      parent,
+      () =>
+        batchRef.update({
+          [`items.${item.index}`]: item,
+          ...Object.fromEntries(
+            Object.entries(counters).map(([field, delta]) => [field, admin.firestore.FieldValue.increment(delta)])
+          ),
+          updatedAt: admin.firestore.Timestamp.now(),
+        }),
+      { status: item.status }
+    );
+
+  const results = await mapWithConcurrency(conversions, concurrency, async (conversionRequest, index) => {
+    const fileName = conversionRequest.sourceFileName;
+    // Covers the whole item, including time spent waiting for retries
+    const itemSpan = startSpan('batch.item', trace, { index, fileName });
+    await updateItem({ index, status: 'processing', fileName, attempts: 1 }, itemSpan.context);
 
-  try {
-    // Validate file type
-    const validTypes = ['docx', 'doc', 'xlsx', 'xls', 'pptx', 'ppt'];
-    if (!validTypes.includes(sourceFileType.toLowerCase())) {
-      throw new functions.https.HttpsError(
-        'invalid-argument',
-        `Unsupported file type: ${sourceFileType}`
+    try {
+      const { result, attempts } = await withRetry(
+        () => runConversion(conversionRequest, userId, itemSpan.context),
+        (attempt, error) => {
+          console.warn(`Batch ${batchRef.id} item ${index} attempt ${attempt} failed:`, error);
+          return updateItem(
+            {
+              index,
+              status: 'retrying',
+              fileName,
+              attempts: attempt,
+              error: error instanceof Error ? error.message : String(error),
+            },
+            itemSpan.context
+          );
+        }
       );
+
+      const item: BatchItemResult = {
+        index,
+        status: 'completed',
+        fileName: result.fileName,
+        attempts,
+        pdfUrl: result.pdfUrl,
+      };
+      await updateItem(item, itemSpan.context, { completed: 1 });
+      itemSpan.setAttributes({ attempts }).end();
+      return { success: true, ...result, attempts };
+    } catch (error) {
+      const message = error instanceof Error ? error.message : 'Unknown error';
+      const attempts = (error as { attempts?: number }).attempts ?? 1;
+      await recordFailure(conversionRequest, userId, error, itemSpan.context);
+      await updateItem({ index, status: 'failed', fileName, attempts, error: message }, itemSpan.context, {
+        failed: 1,
+      });
+      itemSpan.setAttributes({ attempts }).end(error);
+      return { success: false, fileName, error: message, attempts };
     }
+  });
 
+  await withSpan('firestore.write', trace, () =>
+    batchRef.update({
+      status: 'completed',
+      finishedAt: admin.firestore.Timestamp.now(),
+    })
+  );
+
+  return { batchId: batchRef.id, results };
+}
+
+/**
+ * Download, convert, upload and record one file
+ * Temporary files are removed whether or not the conversion succeeds.
+ * Each step is a span under trace.
+ */
+async function runConversion(data: ConversionRequest, userId: string, trace: TraceContext) {
+  const { sourceFileUrl, sourceFileName, sourceFileType } = data;
+
+  // Validate file type
+  const validTypes = ['docx', 'doc', 'xlsx', 'xls', 'pptx', 'ppt'];
+  if (!validTypes.includes(sourceFileType.toLowerCase())) {
+    throw new functions.https.HttpsError(
+      'invalid-argument',
+      `Unsupported file type: ${sourceFileType}`
+    );
+  }
+
+  const tmpFile = join(tmpdir(), `${randomBytes(8).toString('hex')}_${basename(sourceFileName)}`);
+  const pdfPath = tmpFile.replace(/\.[^/.]+$/, '.pdf');
+
+  try {
     // Download source file
-    const tmpFile = join(tmpdir(), `${randomBytes(8).toString('hex')}_${sourceFileName}`);
     const bucket = storage.bucket();
-    await bucket.file(sourceFileUrl).download({ destination: tmpFile });
+    await withSpan('storage.download', trace, async (span) => {
+      await bucket.file(sourceFileUrl).download({ destination: tmpFile });
+      span.setAttributes({ bytes: statSync(tmpFile).size });
+    });
 
     // Convert to PDF
-    const pdfPath = tmpFile.replace(/\.[^/.]+$/, '.pdf');
-    await convertFileToPDF(tmpFile, pdfPath, sourceFileType);
+    await withSpan('libreoffice.convert', trace, () => convertFileToPDF(tmpFile, pdfPath, sourceFileType), {
+      fileType: sourceFileType,
+    });
 
     // Upload PDF to Cloud Storage
     const pdfFileName = sourceFileName.replace(/\.[^/.]+$/, '.pdf');
     const destinationPath = `conversions/${userId}/${Date.now()}_${pdfFileName}`;
 
-    await bucket.upload(pdfPath, {
-      destination: destinationPath,
-      metadata: {
-        contentType: 'application/pdf',
-        metadata: {
-          sourceFileName,
-          sourceFileType,
-          convertedAt: new Date().toISOString(),
-          userId,
-        },
-      },
-    });
+    await withSpan(
+      'storage.upload',
+      trace,
+      () =>
+        bucket.upload(pdfPath, {
+          destination: destinationPath,
+          metadata: {
+            contentType: 'application/pdf',
+            metadata: {
+              sourceFileName,
+              sourceFileType,
+              convertedAt: new Date().toISOString(),
+              userId,
+            },
+          },
+        }),
+      { bytes: statSync(pdfPath).size }
+    );
 
     // Create signed URL (valid for 7 days)
-    const [signedUrl] = await bucket.file(destinationPath).getSignedUrl({
-      version: 'v4',
-      action: 'read',
-      expires: Date.now() + 7 * 24 * 60 * 60 * 1000,
-    });
+    const [signedUrl] = await withSpan('storage.signUrl', trace, () =>
+      bucket.file(destinationPath).getSignedUrl({
+        version: 'v4',
+        action: 'read',
+        expires: Date.now() + 7 * 24 * 60 * 60 * 1000,
+      })
+    );
 
     // Store conversion record in Firestore
-    await db.collection('conversions').add({
-      userId,
-      sourceFileName,
-      sourceFileType,
-      pdfFileName,
-      pdfPath: destinationPath,
-      status: 'completed',
-      createdAt: new Date(),
-      fileSize: 0,
-    });
-
-    // Cleanup temporary files
-    if (existsSync(tmpFile)) unlinkSync(tmpFile);
-    if (existsSync(pdfPath)) unlinkSync(pdfPath);
+    await withSpan('firestore.write', trace, () =>
+      db.collection('conversions').add({
+        userId,
+        sourceFileName,
+        sourceFileType,
+        pdfFileName,
+        pdfPath: destinationPath,
+        status: 'completed',
+        createdAt: new Date(),
+        fileSize: 0,
+      })
+    );
 
     return {
       pdfUrl: signedUrl,
       fileName: pdfFileName,
       timestamp: Date.now(),
     };
-  } catch (error) {
-    console.error('Conversion error:', error);
+  } finally {
+    // Cleanup temporary files
+    if (existsSync(tmpFile)) unlinkSync(tmpFile);
+    if (existsSync(pdfPath)) unlinkSync(pdfPath);
+  }
+}
 
-    // Store error record
-    await db.collection('conversions').add({
+/**
+ * Store an error record for a conversion that gave up
+ */
+async function recordFailure(data: ConversionRequest, userId: string, error: unknown, trace: TraceContext) {
+  console.error('Conversion error:', error);
+
+  await withSpan('firestore.write', trace, () =>
+    db.collection('conversions').add({
       userId,
-      sourceFileName,
-      sourceFileType,
+      sourceFileName: data.sourceFileName,
+      sourceFileType: data.sourceFileType,
       status: 'failed',
       error: error instanceof Error ? error.message : 'Unknown error',
       createdAt: new Date(),
-    });
+    })
+  );
+}
 
-    throw error;
-  }
+// Cleanup tuning. A page of records is deleted with one writeBatch, so a page
+// can't exceed Firestore's 500 writes per batch.
+const CLEANUP_RETENTION_MS = 7 * 24 * 60 * 60 * 1000;
+const CLEANUP_PAGE_SIZE = 500;
+const CLEANUP_STORAGE_CONCURRENCY = Number(process.env.CLEANUP_STORAGE_CONCURRENCY || 16);
+const CLEANUP_TIMEOUT_SECONDS = 540;
+// Stop starting new pages this long before the function would be killed
+const CLEANUP_DEADLINE_MARGIN_MS = 60_000;
+
+// Where an unfinished run leaves its cursor for the next one
+const cleanupCheckpointRef = () => db.collection('settings').doc('conversion_cleanup');
+
+interface CleanupCursor {
+  createdAt: admin.firestore.Timestamp;
+  id: string;
+}
+
+interface CleanupStats {
+  scanned: number;
+  recordsDeleted: number;
+  filesDeleted: number;
+  fileErrors: number; // Records kept because their file could not be deleted
+  pages: number;
+  durationMs: number;
+  recordsPerSecond: number;
+  completed: boolean; // False when the run stopped at the deadline
 }
 
 /**
- * Scheduled function to clean up old conversions (older than 7 days)
+ * Delete expired conversion records and their PDFs
+ * Pages through every record older than the retention window in createdAt
+ * order, starting after `cursor`. Each page's files are deleted with bounded
+ * parallelism, then the records whose files are gone are deleted in one
+ * batch. A record whose file delete fails is kept for the next pass; the
+ * cursor moves past it so a run never loops on it. Stops at `deadline` and
+ * returns the cursor to resume from.
  */
-export const cleanupOldConversions = functions.pubsub
-  .schedule('every 24 hours')
-  .onRun(async () => {
-    const sevenDaysAgo = new Date(Date.now() - 7 * 24 * 60 * 60 * 1000);
-
-    const snapshot = await db
+async function cleanupExpiredConversions(
+  cursor: CleanupCursor | null,
+  deadline: number
+): Promise<{ stats: CleanupStats; cursor: CleanupCursor | null }> {
+  const startedAt = Date.now();
+  const cutoff = new Date(startedAt - CLEANUP_RETENTION_MS);
+  const bucket = storage.bucket();
+  const stats: CleanupStats = {
+    scanned: 0,
+    recordsDeleted: 0,
+    filesDeleted: 0,
+    fileErrors: 0,
+    pages: 0,
+    durationMs: 0,
+    recordsPerSecond: 0,
+    completed: false,
+  };
+
+  while (Date.now() < deadline) {
+    let query = db
       .collection('conversions')
-      .where('createdAt', '<', sevenDaysAgo)
-      .limit(100)
-      .get();
-
-    const batch = db.batch();
-    const bucket = storage.bucket();
+      .where('createdAt', '<', cutoff)
+      .orderBy('createdAt')
+      .orderBy(admin.firestore.FieldPath.documentId())
+      .limit(CLEANUP_PAGE_SIZE);
+    if (cursor) query = query.startAfter(cursor.createdAt, cursor.id);
+
+    const snapshot = await query.get();
+    if (snapshot.empty) {
+      stats.completed = true;
+      cursor = null;
+      break;
+    }
 
-    for (const doc of snapshot.docs) {
+    const deletable = await mapWithConcurrency(snapshot.docs, CLEANUP_STORAGE_CONCURRENCY, async (doc) => {
       const { pdfPath } = doc.data();
+      if (!pdfPath) return true;
 
-      // Delete file from storage
-      if (pdfPath) {
-        await bucket.file(pdfPath).delete().catch(err => {
-          console.warn(`Failed to delete file ${pdfPath}:`, err);
-        });
+      try {
+        // Files already gone (e.g. a previous run crashed mid-page) count as deleted
+        await bucket.file(pdfPath).delete({ ignoreNotFound: true });
+        stats.filesDeleted++;
+        return true;
+      } catch (error) {
+        console.warn(`Failed to delete file ${pdfPath}:`, error);
+        stats.fileErrors++;
+        return false;
       }
+    });
+
+    const batch = db.batch();
+    snapshot.docs.forEach((doc, index) => {
+      if (deletable[index]) batch.delete(doc.ref);
+    });
+    await batch.commit();
 
-      // Delete document
-      batch.delete(doc.ref);
+    const last = snapshot.docs[snapshot.docs.length - 1];
+    cursor = { createdAt: last.get('createdAt'), id: last.id };
+    stats.scanned += snapshot.size;
+    stats.recordsDeleted += deletable.filter(Boolean).length;
+    stats.pages++;
+
+    if (snapshot.size < CLEANUP_PAGE_SIZE) {
+      stats.completed = true;
+      cursor = null;
+      break;
     }
+  }
 
-    await batch.commit();
+  stats.durationMs = Date.now() - startedAt;
+  stats.recordsPerSecond = stats.durationMs > 0 ? Math.round((stats.recordsDeleted / stats.durationMs) * 1000) : 0;
+  return { stats, cursor };
+}
+
+/**
+ * Scheduled function to clean up old conversions (older than 7 days)
+ * Runs hourly so a backlog too large for one run is drained from the saved
+ * checkpoint within hours rather than a day later; runs with nothing to do
+ * cost a single query.
+ */
+export const cleanupOldConversions = functions
+  .runWith({ timeoutSeconds: CLEANUP_TIMEOUT_SECONDS, memory: '512MB' })
+  .pubsub.schedule('every 1 hours')
+  .onRun(async () => {
+    const deadline = Date.now() + CLEANUP_TIMEOUT_SECONDS * 1000 - CLEANUP_DEADLINE_MARGIN_MS;
+    const checkpointRef = cleanupCheckpointRef();
+    const checkpoint = await checkpointRef.get();
+    const resumeFrom = (checkpoint.get('cursor') as CleanupCursor | undefined) ?? null;
+
+    const { stats, cursor } = await cleanupExpiredConversions(resumeFrom, deadline);
+
+    await checkpointRef.set({
+      cursor,
+      resumed: resumeFrom !== null,
+      lastRun: stats,
+      updatedAt: admin.firestore.Timestamp.now(),
+    });
+
+    console.log('Conversion cleanup run', { ...stats, resumed: resumeFrom !== null });
 
-    return `Deleted ${snapshot.docs.length} old conversion records`;
+    return `Deleted ${stats.recordsDeleted} old conversion records (${stats.filesDeleted} files, ` +
+      `${stats.recordsPerSecond}/s)${stats.completed ? '' : '; resuming from checkpoint next run'}`;
   });
@@ -2,6 +2,26 @@ import * as functions from 'firebase-functions';
 import * as admin from 'firebase-admin';
 import express from 'express';
 import cors from 'cors';
+import {
+  mergePDFs,
+  splitPDF,
+  extractPages,
+  rotatePages,
+  reorderPages,
+  deletePages,
+  addWatermark,
+  getPDFPageCount,
+  parsePageRange,
+  readPDFSource,
+  PDFSource,
+} from './pdfOperations';
+import {
+  isStoredPDF,
+  PDFMetadata,
+  readPDFMetadata,
+  readStoredPDFMetadata,
+} from './pdfMetadata';
+import { flushTrace, parseTraceparent, startSpan, withSpan } from './tracing';
 
 // Initialize Firebase Admin
 admin.initializeApp();
@@ -9,6 +29,23 @@ admin.initializeApp();
 const db = admin.firestore();
 const storage = admin.storage();
 
+// Keeps very long documents well under Firestore's 1MB document limit
+const MAX_INDEXED_PAGE_SIZES = 1000;
+
+/**
+ * Fields written to a files/{fileId} document so list views never open the PDF
+ */
+function indexFields(metadata: PDFMetadata) {
+  return {
+    pageCount: metadata.pageCount,
+    metadata: {
+      pageSizes: metadata.pageSizes.slice(0, MAX_INDEXED_PAGE_SIZES),
+      encrypted: metadata.encrypted,
+      producer: metadata.producer ?? null,
+    },
+  };
+}
+
 // Express app for HTTP functions
 const app = express();
 app.use(cors({ origin: true }));
@@ -49,7 +86,7 @@ app.post('/prepare-upload', async (req, res) => {
       originalName: fileName,
       size: 0,
       mime: 'application/pdf',
-      pageCount: 0,
+      pageCount: 0, // Filled in by onFileUpload once the bytes land
       uploadedAt: admin.firestore.Timestamp.now(),
       status: 'uploading',
       operations: [],
@@ -82,6 +119,186 @@ app.get('/job-status/:jobId', async (req, res) => {
   }
 });
 
+/**
+ * Resolve the caller from an `Authorization: Bearer <Firebase ID token>` header
+ */
+async function verifyCaller(req: express.Request): Promise<string | null> {
+  const match = /^Bearer (.+)$/.exec(req.get('authorization') ?? '');
+  if (!match) return null;
+
+  try {
+    return (await admin.auth().verifyIdToken(match[1])).uid;
+  } catch (error) {
+    console.warn('Rejected ID token:', error);
+    return null;
+  }
+}
+
+/**
+ * Read a Storage object through a read stream
+ * pdf-lib needs a whole document in memory, so the chunks are still joined,
+ * but only when an operation asks for that input.
+ */
+async function readObject(path: string): Promise<Buffer> {
+  const chunks: Buffer[] = [];
+  for await (const chunk of storage.bucket().file(path).createReadStream()) {
+    chunks.push(chunk as Buffer);
+  }
+  return Buffer.concat(chunks);
+}
+
+/**
+ * Run a PDF operation server-side
+ * Requires a Firebase ID token; the caller's uid comes from the token.
+ * Body: { type, fileIds, params } - fileIds refer to users/{uid}/files/{fileId}.
+ * Inputs are streamed from Storage one at a time as the operation reaches them.
+ * Results are stored as new files and recorded on the operations/{jobId} document.
+ * A `traceparent` header continues the caller's trace; the spans are returned.
+ */
+app.post('/operations', async (req, res) => {
+  const uid = await verifyCaller(req);
+  if (!uid) {
+    return res.status(401).json({ error: 'Missing or invalid ID token' });
+  }
+
+  const { type, fileIds, params = {} } = req.body;
+
+  if (!type || !Array.isArray(fileIds) || fileIds.length === 0) {
+    return res.status(400).json({ error: 'Missing type or fileIds' });
+  }
+
+  const span = startSpan('operations', parseTraceparent(req.get('traceparent')), { type, files: fileIds.length });
+  const trace = span.context;
+
+  const jobRef = db.collection('operations').doc();
+
+  try {
+    await withSpan('firestore.write', trace, () =>
+      jobRef.set({
+        opId: jobRef.id,
+        owner: uid,
+        type,
+        params,
+        fileIds,
+        status: 'processing',
+        startedAt: admin.firestore.Timestamp.now(),
+      })
+    );
+
+    const bucket = storage.bucket();
+    const inputs: PDFSource[] = fileIds.map(
+      (fileId: string) => () =>
+        withSpan('storage.download', trace, async (download) => {
+          const bytes = await readObject(`users/${uid}/files/${fileId}`);
+          download.setAttributes({ bytes: bytes.byteLength });
+          return bytes;
+        })
+    );
+
+    const outputs = await withSpan(`pdf.${type}`, trace, () => runOperation(type, inputs, params));
+
+    const resultIds: string[] = [];
+    for (const [index, bytes] of outputs.entries()) {
+      const fileId = `${Date.now()}-${Math.random().toString(36).substr(2, 9)}`;
+      await withSpan(
+        'storage.upload',
+        trace,
+        () =>
+          bucket.file(`users/${uid}/files/${fileId}`).save(Buffer.from(bytes), {
+            contentType: 'application/pdf',
+          }),
+        { bytes: bytes.byteLength }
+      );
+      const metadata = await withSpan('pdf.metadata', trace, () => readPDFMetadata(bytes));
+      await withSpan('firestore.write', trace, () =>
+        db.collection('files').doc(fileId).set({
+          id: fileId,
+          owner: uid,
+          originalName: outputs.length > 1 ? `${type}_part_${index + 1}.pdf` : `${type}.pdf`,
+          size: bytes.byteLength,
+          mime: 'application/pdf',
+          ...indexFields(metadata),
+          uploadedAt: admin.firestore.Timestamp.now(),
+          status: 'ready',
+          operations: [jobRef.id],
+        })
+      );
+      resultIds.push(fileId);
+    }
+
+    const result = { fileId: resultIds[0], fileIds: resultIds };
+    await withSpan('firestore.write', trace, () =>
+      jobRef.update({
+        status: 'completed',
+        finishedAt: admin.firestore.Timestamp.now(),
+        progress: 100,
+        result,
+      })
+    );
+
+    span.end();
+    return res.json({ jobId: jobRef.id, status: 'completed', result, spans: await flushTrace(span.traceId) });
+  } catch (error) {
+    console.error(`Error in operation ${jobRef.id}:`, error);
+    const message = error instanceof Error ? error.message : 'Operation failed';
+
+    // The job document may not exist if creating it was what failed
+    await jobRef
+      .set(
+        {
+          opId: jobRef.id,
+          owner: uid,
+          status: 'failed',
+          finishedAt: admin.firestore.Timestamp.now(),
+          error: message,
+        },
+        { merge: true }
+      )
+      .catch((updateError) => console.error(`Failed to record failure of ${jobRef.id}:`, updateError));
+
+    span.end(error);
+    return res
+      .status(500)
+      .json({ jobId: jobRef.id, status: 'failed', error: message, spans: await flushTrace(span.traceId) });
+  }
+});
+
+/**
+ * Dispatch an operation to the matching pdfOperations function
+ */
+async function runOperation(
+  type: string,
+  inputs: PDFSource[],
+  params: Record<string, any>
+): Promise<Uint8Array[]> {
+  // Merge reads its inputs as it goes; everything else works on the first
+  if (type === 'merge') {
+    return [await mergePDFs(inputs)];
+  }
+  const first = await readPDFSource(inputs[0]);
+
+  // Page lists may be sent as arrays or as "1,3-5,7" range strings
+  const pagesFrom = async (value: number[] | string): Promise<number[]> =>
+    typeof value === 'string' ? parsePageRange(value, await getPDFPageCount(first)) : value;
+
+  switch (type) {
+    case 'split':
+      return splitPDF(first, params.splitPoints);
+    case 'extract':
+      return [await extractPages(first, await pagesFrom(params.pageNumbers))];
+    case 'rotate':
+      return [await rotatePages(first, await pagesFrom(params.pageNumbers), params.degrees)];
+    case 'reorder':
+      return [await reorderPages(first, params.newOrder)];
+    case 'delete':
+      return [await deletePages(first, await pagesFrom(params.pageNumbers))];
+    case 'watermark':
+      return [await addWatermark(first, params.text, params.options)];
+    default:
+      throw new Error(`Unknown operation type: ${type}`);
+  }
+}
+
 /**
  * Trigger on file upload
  */
@@ -96,21 +313,35 @@ export const onFileUpload = functions.storage
     const parts = filePath.split('/');
     const uid = parts[1];
     const fileId = parts[3];
+    const size = Number(object.size);
+
+    // uploadFile stores the client's traceparent on the object
+    const span = startSpan('onFileUpload', parseTraceparent(object.metadata?.traceparent), { fileId });
+    const trace = span.context;
 
     try {
-      // Update file metadata
-      const bucket = storage.bucket();
-      const file = bucket.file(filePath);
-      const [metadata] = await file.getMetadata();
+      // Index the page tree once, here, with ranged reads rather than a download.
+      // Signed-URL uploads may carry no content type, so sniff the header too.
+      const file = storage.bucket().file(filePath);
+      const isPDF = object.contentType === 'application/pdf' || (await isStoredPDF(file, size));
+      const indexed = isPDF
+        ? await withSpan('pdf.metadata', trace, () => readStoredPDFMetadata(file, size))
+        : null;
 
-      await db.collection('files').doc(fileId).update({
-        size: metadata.size,
-        status: 'ready',
-        uploadedAt: admin.firestore.Timestamp.now(),
-      });
+      // Every upload becomes ready; only PDFs get page fields
+      await withSpan('firestore.write', trace, () =>
+        db.collection('files').doc(fileId).update({
+          size,
+          ...(indexed ? indexFields(indexed) : {}),
+          status: 'ready',
+          uploadedAt: admin.firestore.Timestamp.now(),
+        })
+      );
 
+      span.setAttributes({ bytes: size, pages: indexed?.pageCount ?? 0 }).end();
       console.log(`File ${fileId} uploaded successfully for user ${uid}`);
     } catch (error) {
+      span.end(error);
       console.error(`Error processing upload for file ${fileId}:`, error);
 
       // Update file status to error
@@ -118,6 +349,8 @@ export const onFileUpload = functions.storage
         status: 'error',
         error: 'Failed to process upload',
       });
+    } finally {
+      await flushTrace(span.traceId);
     }
   });
 
@@ -0,0 +1,369 @@
+/**
+ * Warm LibreOffice pool for Office-to-PDF conversion
+ *
+ * Keeps a few headless soffice instances running in listener mode, each
+ * fronted by unoserver (https://github.com/unoconv/unoserver), and hands
+ * documents to them over unoserver's XML-RPC API. Conversions then cost the
+ * render time only, instead of a multi-second soffice cold start per file.
+ *
+ * - Each instance has its own port and user profile, so they never contend
+ * - Instances are health-checked before use and restarted if they stop answering
+ * - An instance is recycled after maxJobsPerInstance conversions (soffice leaks)
+ * - Waiting jobs are bounded; convert() fails fast with OfficePoolBusyError
+ *
+ * Requires LibreOffice and `pip install unoserver` on the host. Try it locally:
+ *   npm run build && node dist/officePool.js report.docx slides.pptx
+ */
+
+import { ChildProcess, spawn } from 'child_process';
+import { request } from 'http';
+import { mkdtempSync, rmSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { pathToFileURL } from 'url';
+
+export interface OfficePoolOptions {
+  size: number; // Number of soffice instances
+  basePort: number; // XML-RPC ports are basePort, basePort + 2, ...; UNO ports are one above each
+  maxJobsPerInstance: number; // Recycle an instance after this many conversions
+  maxQueue: number; // Jobs allowed to wait for a free instance
+  startupTimeoutMs: number;
+  jobTimeoutMs: number;
+  healthCheckTimeoutMs: number;
+  executable: string; // unoserver launcher
+}
+
+export const DEFAULT_OFFICE_POOL_OPTIONS: OfficePoolOptions = {
+  size: Number(process.env.OFFICE_POOL_SIZE || 2),
+  basePort: Number(process.env.OFFICE_POOL_BASE_PORT || 2003),
+  maxJobsPerInstance: Number(process.env.OFFICE_POOL_MAX_JOBS || 50),
+  maxQueue: Number(process.env.OFFICE_POOL_MAX_QUEUE || 32),
+  startupTimeoutMs: 30_000,
+  jobTimeoutMs: 120_000,
+  healthCheckTimeoutMs: 5_000,
+  executable: process.env.UNOSERVER_BIN || 'unoserver',
+};
+
+export class OfficePoolBusyError extends Error {
+  constructor(queued: number) {
+    super(`Conversion queue is full (${queued} waiting)`);
+    this.name = 'OfficePoolBusyError';
+  }
+}
+
+interface OfficeInstance {
+  index: number;
+  port: number;
+  process: ChildProcess | null;
+  profileDir: string | null;
+  ready: Promise<void> | null;
+  jobs: number;
+  busy: boolean;
+}
+
+interface QueuedJob {
+  inputPath: string;
+  outputPath: string;
+  resolve: () => void;
+  reject: (error: Error) => void;
+}
+
+// --- XML-RPC (only what unoserver's API needs) ---
+
+class XmlRpcFault extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = 'XmlRpcFault';
+  }
+}
+
+type RpcValue = string | boolean | null | RpcValue[];
+
+const escapeXml = (value: string): string =>
+  value.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+
+function encodeValue(value: RpcValue): string {
+  if (value === null) return '<nil/>';
+  if (typeof value === 'boolean') return `<boolean>${value ? 1 : 0}</boolean>`;
+  if (Array.isArray(value)) {
+    return `<array><data>${value.map((v) => `<value>${encodeValue(v)}</value>`).join('')}</data></array>`;
+  }
+  return `<string>${escapeXml(value)}</string>`;
+}
+
+/**
+ * Call an XML-RPC method; resolves once the server answers without a fault
+ */
+function xmlRpcCall(port: number, method: string, params: RpcValue[], timeoutMs: number): Promise<string> {
+  const body =
+    `<?xml version="1.0"?><methodCall><methodName>${method}</methodName><params>` +
+    params.map((p) => `<param><value>${encodeValue(p)}</value></param>`).join('') +
+    '</params></methodCall>';
+
+  return new Promise((resolve, reject) => {
+    const req = request(
+      {
+        host: '127.0.0.1',
+        port,
+        path: '/RPC2',
+        method: 'POST',
+        headers: { 'Content-Type': 'text/xml', 'Content-Length': Buffer.byteLength(body) },
+        timeout: timeoutMs,
+      },
+      (res) => {
+        const chunks: Buffer[] = [];
+        res.on('data', (chunk: Buffer) => chunks.push(chunk));
+        res.on('end', () => {
+          const text = Buffer.concat(chunks).toString('utf8');
+          if (res.statusCode !== 200) {
+            reject(new Error(`XML-RPC ${method} returned HTTP ${res.statusCode}`));
+          } else if (text.includes('<fault>')) {
+            const message = /<name>faultString<\/name>\s*<value>(?:<string>)?([\s\S]*?)(?:<\/string>)?<\/value>/.exec(text);
+            reject(new XmlRpcFault(message ? message[1] : `XML-RPC ${method} failed`));
+          } else {
+            resolve(text);
+          }
+        });
+      }
+    );
+    req.on('timeout', () => req.destroy(new Error(`XML-RPC ${method} timed out after ${timeoutMs}ms`)));
+    req.on('error', reject);
+    req.end(body);
+  });
+}
+
+const delay = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+export class OfficePool {
+  readonly options: OfficePoolOptions;
+  private instances: OfficeInstance[];
+  private queue: QueuedJob[] = [];
+  private closed = false;
+
+  constructor(options: Partial<OfficePoolOptions> = {}) {
+    this.options = { ...DEFAULT_OFFICE_POOL_OPTIONS, ...options };
+    this.instances = Array.from({ length: this.options.size }, (_, index) => ({
+      index,
+      port: this.options.basePort + index * 2,
+      process: null,
+      profileDir: null,
+      ready: null,
+      jobs: 0,
+      busy: false,
+    }));
+  }
+
+  /**
+   * Start every instance ahead of the first job
+   */
+  async warmUp(): Promise<void> {
+    await Promise.all(this.instances.map((instance) => this.ensureStarted(instance)));
+  }
+
+  /**
+   * Convert a file on disk to PDF at outputPath
+   */
+  convert(inputPath: string, outputPath: string): Promise<void> {
+    if (this.closed) {
+      return Promise.reject(new Error('Office pool is shut down'));
+    }
+    if (this.queue.length >= this.options.maxQueue) {
+      return Promise.reject(new OfficePoolBusyError(this.queue.length));
+    }
+
+    return new Promise((resolve, reject) => {
+      this.queue.push({ inputPath, outputPath, resolve, reject });
+      this.dispatch();
+    });
+  }
+
+  get stats() {
+    return {
+      instances: this.instances.length,
+      running: this.instances.filter((instance) => instance.process).length,
+      busy: this.instances.filter((instance) => instance.busy).length,
+      queued: this.queue.length,
+    };
+  }
+
+  /**
+   * Stop all instances and fail anything still queued
+   */
+  async shutdown(): Promise<void> {
+    this.closed = true;
+    this.queue.splice(0).forEach((job) => job.reject(new Error('Office pool is shut down')));
+    await Promise.all(this.instances.map((instance) => this.stop(instance)));
+  }
+
+  private dispatch(): void {
+    while (this.queue.length > 0) {
+      const instance = this.instances.find((candidate) => !candidate.busy);
+      if (!instance) return;
+
+      const job = this.queue.shift()!;
+      instance.busy = true;
+      this.run(instance, job)
+        .then(job.resolve, job.reject)
+        .finally(() => {
+          instance.busy = false;
+          this.dispatch();
+        });
+    }
+  }
+
+  private async run(instance: OfficeInstance, job: QueuedJob): Promise<void> {
+    await this.ensureHealthy(instance);
+
+    try {
+      // convert(inpath, indata, outpath, convert_to, filtername, filter_options, update_index)
+      await xmlRpcCall(
+        instance.port,
+        'convert',
+        [job.inputPath, null, job.outputPath, 'pdf', null, [], true],
+        this.options.jobTimeoutMs
+      );
+    } catch (error) {
+      // A hung or crashed instance is replaced before its next job
+      await this.stop(instance);
+      throw new Error(`LibreOffice conversion failed: ${error instanceof Error ? error.message : String(error)}`);
+    }
+
+    instance.jobs++;
+    if (instance.jobs >= this.options.maxJobsPerInstance) {
+      await this.stop(instance);
+    }
+  }
+
+  private async ensureHealthy(instance: OfficeInstance): Promise<void> {
+    await this.ensureStarted(instance);
+    if (await this.isHealthy(instance)) return;
+
+    console.warn(`Office instance ${instance.index} failed its health check, restarting`);
+    await this.stop(instance);
+    await this.ensureStarted(instance);
+  }
+
+  /**
+   * An instance is healthy if its server answers at all; a fault for the
+   * probe method still proves the XML-RPC loop (and soffice behind it) is up
+   */
+  private async isHealthy(instance: OfficeInstance): Promise<boolean> {
+    if (!instance.process || instance.process.exitCode !== null) return false;
+    try {
+      await xmlRpcCall(instance.port, 'info', [], this.options.healthCheckTimeoutMs);
+      return true;
+    } catch (error) {
+      return error instanceof XmlRpcFault;
+    }
+  }
+
+  private ensureStarted(instance: OfficeInstance): Promise<void> {
+    if (!instance.ready) {
+      instance.ready = this.start(instance).catch((error) => {
+        instance.ready = null;
+        throw error;
+      });
+    }
+    return instance.ready;
+  }
+
+  private async start(instance: OfficeInstance): Promise<void> {
+    const profileDir = mkdtempSync(join(tmpdir(), `soffice-${instance.index}-`));
+    const child = spawn(
+      this.options.executable,
+      [
+        '--interface', '127.0.0.1',
+        '--port', String(instance.port),
+        '--uno-port', String(instance.port + 1),
+        '--user-installation', pathToFileURL(profileDir).href,
+      ],
+      { stdio: ['ignore', 'ignore', 'pipe'] }
+    );
+
+    instance.process = child;
+    instance.profileDir = profileDir;
+    instance.jobs = 0;
+
+    child.stderr?.on('data', (chunk: Buffer) => {
+      console.log(`[office ${instance.index}] ${chunk.toString().trim()}`);
+    });
+    child.on('exit', () => {
+      if (instance.process === child) {
+        instance.process = null;
+        instance.ready = null;
+      }
+    });
+
+    const spawnError = new Promise<never>((_, reject) => child.once('error', reject));
+    const deadline = Date.now() + this.options.startupTimeoutMs;
+
+    // Poll until the server answers; soffice needs a few seconds to come up
+    const waitForServer = async () => {
+      while (Date.now() < deadline) {
+        if (child.exitCode !== null) throw new Error(`unoserver exited with code ${child.exitCode}`);
+        if (await this.isHealthy(instance)) return;
+        await delay(250);
+      }
+      throw new Error(`Office instance ${instance.index} did not start within ${this.options.startupTimeoutMs}ms`);
+    };
+
+    try {
+      await Promise.race([waitForServer(), spawnError]);
+    } catch (error) {
+      await this.stop(instance);
+      throw error;
+    }
+  }
+
+  private async stop(instance: OfficeInstance): Promise<void> {
+    const child = instance.process;
+    instance.process = null;
+    instance.ready = null;
+
+    if (child && child.exitCode === null) {
+      const exited = new Promise((resolve) => child.once('exit', resolve));
+      child.kill('SIGTERM');
+      const forced = delay(5_000).then(() => child.kill('SIGKILL'));
+      await Promise.race([exited, forced]);
+    }
+
+    if (instance.profileDir) {
+      rmSync(instance.profileDir, { recursive: true, force: true });
+      instance.profileDir = null;
+    }
+  }
+}
+
+let sharedPool: OfficePool | null = null;
+
+/**
+ * Pool shared by every conversion in this process (started on first use)
+ */
+export function getOfficePool(): OfficePool {
+  if (!sharedPool) sharedPool = new OfficePool();
+  return sharedPool;
+}
+
+// Local smoke test: node dist/officePool.js <files...>
+if (require.main === module) {
+  (async () => {
+    const files = process.argv.slice(2);
+    const pool = new OfficePool();
+
+    let started = Date.now();
+    await pool.warmUp();
+    console.log(`Pool of ${pool.options.size} warmed up in ${Date.now() - started}ms`);
+
+    for (const file of files) {
+      started = Date.now();
+      const output = file.replace(/\.[^/.]+$/, '.pdf');
+      await pool.convert(file, output);
+      console.log(`${file} -> ${output} in ${Date.now() - started}ms`);
+    }
+
+    await pool.shutdown();
+  })().catch((error) => {
+    console.error(error);
+    process.exit(1);
+  });
+}
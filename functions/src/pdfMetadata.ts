@@ -0,0 +1,63 @@
+/**
+ * PDF Metadata Index (Cloud Functions)
+ * Reads page count, page sizes, encryption flag and producer from bytes in
+ * memory or straight from Storage; the reader itself is shared/pdfMetadata
+ */
+
+import { promisify } from 'util';
+import { inflate as zlibInflate } from 'zlib';
+import { PDFBytes } from './pdfOperations';
+import { bytesSource, PDFMetadata, readPDFMetadataFrom, withBlockCache } from './shared/pdfMetadata';
+
+export type { PageSize, PDFMetadata } from './shared/pdfMetadata';
+
+const inflateAsync = promisify(zlibInflate);
+
+async function inflate(data: Uint8Array): Promise<Uint8Array> {
+  return inflateAsync(data);
+}
+
+// The part of a Storage File the ranged reader needs
+interface RangedFile {
+  createReadStream(options: { start: number; end: number }): NodeJS.ReadableStream;
+}
+
+// Readers accept the %PDF- header anywhere in the first 1024 bytes
+const PDF_HEADER_WINDOW = 1024;
+
+async function readRange(file: RangedFile, start: number, end: number): Promise<Buffer> {
+  if (end <= start) return Buffer.alloc(0);
+  const chunks: Buffer[] = [];
+  // Storage ranges are inclusive at both ends
+  for await (const chunk of file.createReadStream({ start, end: end - 1 })) {
+    chunks.push(chunk as Buffer);
+  }
+  return Buffer.concat(chunks);
+}
+
+/**
+ * Whether a stored object starts like a PDF, whatever its content type says
+ */
+export async function isStoredPDF(file: RangedFile, size: number): Promise<boolean> {
+  const head = await readRange(file, 0, Math.min(size, PDF_HEADER_WINDOW));
+  return head.includes('%PDF-');
+}
+
+/**
+ * Read page count, page sizes, encryption flag and producer
+ * Uses the xref and page tree only, and falls back to a full parse if needed.
+ */
+export async function readPDFMetadata(bytes: PDFBytes): Promise<PDFMetadata> {
+  const data = bytes instanceof Uint8Array ? bytes : new Uint8Array(bytes);
+  return readPDFMetadataFrom(bytesSource(data), inflate);
+}
+
+/**
+ * Same as readPDFMetadata, for an object in Storage of the given size
+ * Fetches the tail, xref and page tree with ranged reads instead of
+ * downloading the object; only the full-parse fallback reads all of it.
+ */
+export async function readStoredPDFMetadata(file: RangedFile, size: number): Promise<PDFMetadata> {
+  const source = withBlockCache({ size, read: (start, end) => readRange(file, start, end) });
+  return readPDFMetadataFrom(source, inflate);
+}
@@ -0,0 +1,231 @@
+/**
+ * Server-side PDF operations
+ * Mirrors web/src/utils/pdfOperations.ts so large jobs can run headless on
+ * Cloud Functions instead of in the user's tab.
+ *
+ * Semantics match the client exactly:
+ * - page numbers are 1-based, out-of-range pages are ignored
+ * - split points are the page numbers a new part starts after
+ * - parsePageRange accepts the same "1,3-5,7" grammar
+ *
+ * Inputs and outputs are raw bytes rather than Blobs.
+ */
+
+import { PDFDocument, rgb, degrees as toDegrees } from 'pdf-lib';
+import { readPDFMetadata } from './pdfMetadata';
+
+export type PDFBytes = Uint8Array | ArrayBuffer;
+
+// Bytes, or a reader that fetches them when the operation first needs them
+export type PDFSource = PDFBytes | (() => Promise<PDFBytes>);
+
+export interface WatermarkOptions {
+  opacity?: number;
+  rotation?: number;
+  fontSize?: number;
+  color?: [number, number, number]; // RGB components from 0 to 1
+}
+
+/**
+ * Load PDF from bytes
+ */
+export async function loadPDF(bytes: PDFBytes): Promise<PDFDocument> {
+  return PDFDocument.load(bytes);
+}
+
+export async function readPDFSource(source: PDFSource): Promise<PDFBytes> {
+  return typeof source === 'function' ? source() : source;
+}
+
+/**
+ * Merge multiple PDFs in given order
+ * Readers are called one input at a time, so with lazy sources only the
+ * input being copied is held in memory alongside the output.
+ */
+export async function mergePDFs(inputs: PDFSource[]): Promise<Uint8Array> {
+  const merged = await PDFDocument.create();
+
+  for (const source of inputs) {
+    const doc = await loadPDF(await readPDFSource(source));
+    const pages = await merged.copyPages(doc, doc.getPageIndices());
+    pages.forEach((page) => merged.addPage(page));
+  }
+
+  return merged.save();
+}
+
+/**
+ * Extract specific pages from PDF
+ */
+export async function extractPages(bytes: PDFBytes, pageNumbers: number[]): Promise<Uint8Array> {
+  const doc = await loadPDF(bytes);
+  const extracted = await PDFDocument.create();
+
+  // Validate page numbers
+  const validPages = pageNumbers.filter((p) => p >= 1 && p <= doc.getPageCount());
+
+  if (validPages.length === 0) {
+    throw new Error('No valid page numbers provided');
+  }
+
+  // Copy pages (adjust for 0-based indexing)
+  const pagesToCopy = await extracted.copyPages(doc, validPages.map((p) => p - 1));
+  pagesToCopy.forEach((page) => extracted.addPage(page));
+
+  return extracted.save();
+}
+
+/**
+ * Split PDF at specific page numbers
+ */
+export async function splitPDF(bytes: PDFBytes, splitPoints: number[]): Promise<Uint8Array[]> {
+  const doc = await loadPDF(bytes);
+  const totalPages = doc.getPageCount();
+  const results: Uint8Array[] = [];
+
+  // Add 0 at start and end if not present
+  const points = [0, ...splitPoints.filter((p) => p > 0 && p < totalPages), totalPages];
+  const unique = Array.from(new Set(points)).sort((a, b) => a - b);
+
+  for (let i = 0; i < unique.length - 1; i++) {
+    const start = unique[i];
+    const end = unique[i + 1];
+    const pageIndices = Array.from({ length: end - start }, (_, idx) => start + idx);
+
+    const part = await PDFDocument.create();
+    const copiedPages = await part.copyPages(doc, pageIndices);
+    copiedPages.forEach((page) => part.addPage(page));
+
+    results.push(await part.save());
+  }
+
+  return results;
+}
+
+/**
+ * Rotate pages
+ */
+export async function rotatePages(
+  bytes: PDFBytes,
+  pageNumbers: number[],
+  degrees: number
+): Promise<Uint8Array> {
+  const doc = await loadPDF(bytes);
+  const validPages = pageNumbers.filter((p) => p >= 1 && p <= doc.getPageCount());
+
+  for (const pageNum of validPages) {
+    const page = doc.getPage(pageNum - 1);
+    const currentRotation = page.getRotation().angle;
+    page.setRotation(toDegrees((currentRotation + degrees) % 360));
+  }
+
+  return doc.save();
+}
+
+/**
+ * Reorder pages
+ */
+export async function reorderPages(bytes: PDFBytes, newOrder: number[]): Promise<Uint8Array> {
+  const doc = await loadPDF(bytes);
+  const totalPages = doc.getPageCount();
+
+  // Validate new order
+  if (newOrder.length !== totalPages || !newOrder.every((p) => p >= 1 && p <= totalPages)) {
+    throw new Error('Invalid page order');
+  }
+
+  // Create new document with reordered pages
+  const reordered = await PDFDocument.create();
+  const pageIndices = newOrder.map((p) => p - 1);
+  const copiedPages = await reordered.copyPages(doc, pageIndices);
+  copiedPages.forEach((page) => reordered.addPage(page));
+
+  return reordered.save();
+}
+
+/**
+ * Delete pages
+ */
+export async function deletePages(bytes: PDFBytes, pageNumbers: number[]): Promise<Uint8Array> {
+  const doc = await loadPDF(bytes);
+  const totalPages = doc.getPageCount();
+
+  // Sort in descending order to delete from end first
+  const pagesToDelete = pageNumbers
+    .filter((p) => p >= 1 && p <= totalPages)
+    .sort((a, b) => b - a);
+
+  for (const pageNum of pagesToDelete) {
+    doc.removePage(pageNum - 1);
+  }
+
+  return doc.save();
+}
+
+/**
+ * Add watermark text to PDF
+ */
+export async function addWatermark(
+  bytes: PDFBytes,
+  text: string,
+  options: WatermarkOptions = {}
+): Promise<Uint8Array> {
+  const doc = await loadPDF(bytes);
+  const { opacity = 0.3, rotation = -45, fontSize = 60, color = [0.78, 0.78, 0.78] } = options;
+
+  for (const page of doc.getPages()) {
+    const { width, height } = page.getSize();
+
+    page.drawText(text, {
+      x: width / 2 - text.length * 3,
+      y: height / 2,
+      size: fontSize,
+      color: rgb(...color),
+      opacity,
+      rotate: toDegrees(rotation),
+    });
+  }
+
+  return doc.save();
+}
+
+/**
+ * Get PDF page count (reads the page tree only, see pdfMetadata)
+ */
+export async function getPDFPageCount(bytes: PDFBytes): Promise<number> {
+  return (await readPDFMetadata(bytes)).pageCount;
+}
+
+/**
+ * Parse page range string (e.g., "1,3-5,7")
+ */
+export function parsePageRange(rangeStr: string, maxPages: number): number[] {
+  const pages = new Set<number>();
+
+  const parts = rangeStr.split(',').map((p) => p.trim());
+
+  for (const part of parts) {
+    if (part.includes('-')) {
+      const [start, end] = part.split('-').map((p) => parseInt(p.trim()));
+      if (!Number.isNaN(start) && !Number.isNaN(end)) {
+        for (let i = Math.max(1, start); i <= Math.min(maxPages, end); i++) {
+          pages.add(i);
+        }
+      }
+    } else {
+      const page = parseInt(part);
+      if (!Number.isNaN(page) && page >= 1 && page <= maxPages) {
+        pages.add(page);
+      }
+    }
+  }
+
+  return Array.from(pages).sort((a, b) => a - b);
+}
+
+/**
+ * Validate page numbers
+ */
+export function validatePageNumbers(pages: number[], maxPages: number): boolean {
+  return pages.every((p) => Number.isInteger(p) && p >= 1 && p <= maxPages);
+}
@@ -0,0 +1,691 @@
+/**
+ * PDF Metadata Index
+ * Reads page count, page sizes, encryption flag and producer without
+ * parsing the whole document
+ *
+ * Only the trailer, the cross-reference data and the objects on the way to
+ * each page (catalog, page tree nodes, Info) are read; content streams,
+ * fonts and images are never touched. Files this reader cannot follow
+ * (damaged xref, encrypted object streams, unusual filters) fall back to a
+ * full pdf-lib parse, so callers always get the same answer either way.
+ *
+ * Shared by the web app (as @shared/pdfMetadata) and Cloud Functions. The
+ * file is read through a ByteSource, so only the byte ranges above are ever
+ * fetched: a Blob slice in the browser, a ranged read from Storage on the
+ * server. Each side supplies its own inflate.
+ */
+
+import { PDFDocument } from 'pdf-lib';
+
+export interface PageSize {
+  width: number;
+  height: number;
+}
+
+export interface PDFMetadata {
+  pageCount: number;
+  pageSizes: PageSize[];
+  encrypted: boolean;
+  producer?: string;
+}
+
+/**
+ * Random access to the file's bytes
+ */
+export interface ByteSource {
+  size: number;
+  read(start: number, end: number): Promise<Uint8Array>; // Bytes [start, end)
+}
+
+// zlib inflate of a FlateDecode stream
+export type Inflate = (data: Uint8Array) => Promise<Uint8Array>;
+
+/**
+ * A ByteSource over bytes already in memory
+ */
+export function bytesSource(data: Uint8Array): ByteSource {
+  return { size: data.length, read: async (start, end) => data.subarray(start, end) };
+}
+
+/**
+ * Serve reads from aligned, cached blocks, for sources where every read is
+ * a request (e.g. Storage). Neighbouring objects usually share a block.
+ * Reads spanning more than maxBlocks go straight to the source.
+ */
+export function withBlockCache(
+  source: ByteSource,
+  blockSize = 256 * 1024,
+  maxBlocks = 64
+): ByteSource {
+  const blocks = new Map<number, Promise<Uint8Array>>();
+
+  const block = (index: number): Promise<Uint8Array> => {
+    let cached = blocks.get(index);
+    if (cached) {
+      // Refresh LRU position
+      blocks.delete(index);
+    } else {
+      cached = source.read(index * blockSize, Math.min(source.size, (index + 1) * blockSize));
+      cached.catch(() => blocks.delete(index));
+    }
+    blocks.set(index, cached);
+    while (blocks.size > maxBlocks) blocks.delete(blocks.keys().next().value as number);
+    return cached;
+  };
+
+  return {
+    size: source.size,
+    async read(start, end) {
+      if (end <= start) return new Uint8Array(0);
+      const first = Math.floor(start / blockSize);
+      const last = Math.floor((end - 1) / blockSize);
+      if (last - first + 1 > maxBlocks) return source.read(start, end);
+
+      const parts = await Promise.all(
+        Array.from({ length: last - first + 1 }, (_, i) => block(first + i))
+      );
+      if (parts.length === 1) {
+        return parts[0].subarray(start - first * blockSize, end - first * blockSize);
+      }
+
+      const out = new Uint8Array(end - start);
+      parts.forEach((part, i) => {
+        const blockStart = (first + i) * blockSize;
+        const from = Math.max(start, blockStart) - blockStart;
+        const to = Math.min(end, blockStart + part.length) - blockStart;
+        out.set(part.subarray(from, to), blockStart + from - start);
+      });
+      return out;
+    },
+  };
+}
+
+// --- Minimal object model (only what the trailer and page tree need) ---
+
+type PDFDict = { kind: 'dict'; entries: Map<string, PDFValue>; streamStart?: number };
+
+type PDFValue =
+  | number
+  | boolean
+  | null
+  | PDFValue[]
+  | PDFDict
+  | { kind: 'name'; value: string }
+  | { kind: 'string'; bytes: Uint8Array }
+  | { kind: 'ref'; num: number };
+
+const isObject = (value: PDFValue): value is Exclude<PDFValue, number | boolean | null | PDFValue[]> =>
+  typeof value === 'object' && value !== null && !Array.isArray(value);
+const isDict = (value: PDFValue): value is PDFDict => isObject(value) && value.kind === 'dict';
+const nameOf = (value: PDFValue | undefined): string | undefined =>
+  value !== undefined && isObject(value) && value.kind === 'name' ? value.value : undefined;
+
+const WHITESPACE = new Set([0, 9, 10, 12, 13, 32]);
+const DELIMITERS = new Set(Array.from('()<>[]{}/%', (c) => c.charCodeAt(0)));
+const STRING_ESCAPES: Record<number, number> = { 0x6e: 10, 0x72: 13, 0x74: 9, 0x62: 8, 0x66: 12 }; // \n \r \t \b \f
+
+function latin1(data: Uint8Array, start: number, end: number): string {
+  let text = '';
+  for (let i = start; i < end; i++) text += String.fromCharCode(data[i]);
+  return text;
+}
+
+/**
+ * Decode a PDF text string (UTF-16BE with BOM, otherwise PDFDocEncoding)
+ */
+function decodeText(bytes: Uint8Array): string {
+  if (bytes[0] === 0xfe && bytes[1] === 0xff) {
+    let text = '';
+    for (let i = 2; i + 1 < bytes.length; i += 2) text += String.fromCharCode((bytes[i] << 8) | bytes[i + 1]);
+    return text;
+  }
+  return latin1(bytes, 0, bytes.length);
+}
+
+/**
+ * Undo PNG row predictors (used by most xref and object streams)
+ */
+function unpredictPNG(data: Uint8Array, columns: number, bytesPerPixel: number): Uint8Array {
+  const rowLength = columns * bytesPerPixel;
+  const rows = Math.floor(data.length / (rowLength + 1));
+  const out = new Uint8Array(rows * rowLength);
+
+  for (let row = 0; row < rows; row++) {
+    const filter = data[row * (rowLength + 1)];
+    const src = row * (rowLength + 1) + 1;
+    const dst = row * rowLength;
+
+    for (let i = 0; i < rowLength; i++) {
+      const left = i >= bytesPerPixel ? out[dst + i - bytesPerPixel] : 0;
+      const up = row > 0 ? out[dst - rowLength + i] : 0;
+      const upLeft = row > 0 && i >= bytesPerPixel ? out[dst - rowLength + i - bytesPerPixel] : 0;
+      let predicted = 0;
+      if (filter === 1) predicted = left;
+      else if (filter === 2) predicted = up;
+      else if (filter === 3) predicted = (left + up) >> 1;
+      else if (filter === 4) {
+        const p = left + up - upLeft;
+        const pa = Math.abs(p - left);
+        const pb = Math.abs(p - up);
+        const pc = Math.abs(p - upLeft);
+        predicted = pa <= pb && pa <= pc ? left : pb <= pc ? up : upLeft;
+      }
+      out[dst + i] = (data[src + i] + predicted) & 0xff;
+    }
+  }
+
+  return out;
+}
+
+// Thrown when a value runs past the end of a window that isn't the end of the file
+class NeedMoreData extends Error {}
+
+class Lexer {
+  /**
+   * @param base File offset of data[0], for reporting stream positions
+   * @param truncated The file continues past the end of data
+   */
+  constructor(
+    private data: Uint8Array,
+    public pos = 0,
+    private base = 0,
+    private truncated = false
+  ) {}
+
+  /**
+   * Whether data[at] exists; asks for a larger window instead of guessing
+   */
+  private more(at = this.pos): boolean {
+    if (at < this.data.length) return true;
+    if (this.truncated) throw new NeedMoreData();
+    return false;
+  }
+
+  private skipSpace(): void {
+    const { data } = this;
+    while (this.more()) {
+      if (WHITESPACE.has(data[this.pos])) {
+        this.pos++;
+      } else if (data[this.pos] === 0x25) {
+        // Comment runs to end of line
+        while (this.more() && data[this.pos] !== 10 && data[this.pos] !== 13) this.pos++;
+      } else {
+        break;
+      }
+    }
+  }
+
+  private expectMore(): void {
+    if (!this.more()) throw new Error('Unexpected end of data');
+  }
+
+  /**
+   * Next run of regular characters (a number or keyword)
+   */
+  word(): string {
+    this.skipSpace();
+    return this.regular();
+  }
+
+  private regular(): string {
+    const start = this.pos;
+    while (
+      this.more() &&
+      !WHITESPACE.has(this.data[this.pos]) &&
+      !DELIMITERS.has(this.data[this.pos])
+    ) {
+      this.pos++;
+    }
+    return latin1(this.data, start, this.pos);
+  }
+
+  value(): PDFValue {
+    this.skipSpace();
+    this.expectMore();
+    const { data } = this;
+    const c = data[this.pos];
+
+    if (c === 0x2f) {
+      this.pos++;
+      return { kind: 'name', value: this.name() };
+    }
+    if (c === 0x5b) {
+      this.pos++;
+      const items: PDFValue[] = [];
+      for (;;) {
+        this.skipSpace();
+        this.expectMore();
+        if (data[this.pos] === 0x5d) {
+          this.pos++;
+          return items;
+        }
+        items.push(this.value());
+      }
+    }
+    if (c === 0x3c && this.more(this.pos + 1) && data[this.pos + 1] === 0x3c) {
+      this.pos += 2;
+      const entries = new Map<string, PDFValue>();
+      for (;;) {
+        this.skipSpace();
+        this.expectMore();
+        if (data[this.pos] === 0x3e) {
+          this.pos += 2;
+          return { kind: 'dict', entries };
+        }
+        const key = nameOf(this.value());
+        if (key === undefined) throw new Error(`Malformed dictionary at ${this.pos}`);
+        entries.set(key, this.value());
+      }
+    }
+    if (c === 0x3c) return { kind: 'string', bytes: this.hexString() };
+    if (c === 0x28) return { kind: 'string', bytes: this.literalString() };
+
+    const word = this.word();
+    if (word === 'true') return true;
+    if (word === 'false') return false;
+    if (word === 'null') return null;
+
+    const num = Number(word);
+    if (word === '' || Number.isNaN(num)) throw new Error(`Unexpected token "${word}" at ${this.pos}`);
+
+    // "num gen R" is an indirect reference
+    if (Number.isInteger(num)) {
+      const save = this.pos;
+      if (/^\d+$/.test(this.word()) && this.word() === 'R') return { kind: 'ref', num };
+      this.pos = save;
+    }
+    return num;
+  }
+
+  /**
+   * Parse "num gen obj <value>" and note where stream data starts, if any
+   */
+  indirectObject(): PDFValue {
+    this.word();
+    this.word();
+    if (this.word() !== 'obj') throw new Error(`Expected object at ${this.pos}`);
+
+    const value = this.value();
+    if (isDict(value)) {
+      const save = this.pos;
+      if (this.word() === 'stream') {
+        if (this.more() && this.data[this.pos] === 13) this.pos++;
+        if (this.more() && this.data[this.pos] === 10) this.pos++;
+        value.streamStart = this.base + this.pos;
+      } else {
+        this.pos = save;
+      }
+    }
+    return value;
+  }
+
+  private name(): string {
+    // Names escape bytes as #xx
+    return this.regular().replace(/#([0-9a-fA-F]{2})/g, (_, hex) =>
+      String.fromCharCode(parseInt(hex, 16))
+    );
+  }
+
+  private hexString(): Uint8Array {
+    const end = this.data.indexOf(0x3e, this.pos);
+    if (end < 0 && this.truncated) throw new NeedMoreData();
+    if (end < 0) throw new Error('Unterminated hex string');
+    const hex = latin1(this.data, this.pos + 1, end).replace(/\s+/g, '');
+    this.pos = end + 1;
+    const padded = hex.length % 2 ? `${hex}0` : hex;
+    return Uint8Array.from(padded.match(/../g) ?? [], (pair) => parseInt(pair, 16));
+  }
+
+  private literalString(): Uint8Array {
+    const { data } = this;
+    const bytes: number[] = [];
+    let depth = 0;
+    this.pos++;
+
+    for (;;) {
+      this.expectMore();
+      const c = data[this.pos++];
+      if (c === 0x28) depth++;
+      if (c === 0x29 && depth-- === 0) return Uint8Array.from(bytes);
+      if (c !== 0x5c) {
+        bytes.push(c);
+        continue;
+      }
+
+      this.expectMore();
+      const next = data[this.pos++];
+      if (next in STRING_ESCAPES) {
+        bytes.push(STRING_ESCAPES[next]);
+      } else if (next >= 0x30 && next <= 0x37) {
+        let octal = next - 0x30;
+        for (let i = 0; i < 2 && this.more() && data[this.pos] >= 0x30 && data[this.pos] <= 0x37; i++) {
+          octal = octal * 8 + data[this.pos++] - 0x30;
+        }
+        bytes.push(octal & 0xff);
+      } else if (next === 13) {
+        // Escaped line break continues the string
+        if (this.more() && data[this.pos] === 10) this.pos++;
+      } else if (next !== 10) {
+        bytes.push(next);
+      }
+    }
+  }
+}
+
+// XRef entries: an offset in the file, or a slot in an object stream; null if free
+type XRefEntry = { offset: number } | { stream: number; index: number } | null;
+
+// Decoded object stream and where each of its objects starts
+type ObjectStream = { data: Uint8Array; offsets: number[] };
+
+class PDFIndexReader {
+  private xref = new Map<number, XRefEntry>();
+  private objects = new Map<number, PDFValue>();
+  private objectStreams = new Map<number, Promise<ObjectStream>>();
+  private trailer = new Map<string, PDFValue>();
+
+  constructor(
+    private source: ByteSource,
+    private inflate: Inflate
+  ) {}
+
+  /**
+   * Parse from a file offset, reading a larger window while the value runs
+   * past the current one
+   */
+  private async parseAt<T>(offset: number, parse: (lexer: Lexer) => T): Promise<T> {
+    const { size } = this.source;
+    for (let window = 4096; ; window *= 4) {
+      const end = Math.min(size, offset + window);
+      const data = await this.source.read(offset, end);
+      try {
+        return parse(new Lexer(data, 0, offset, end < size));
+      } catch (error) {
+        if (!(error instanceof NeedMoreData)) throw error;
+      }
+    }
+  }
+
+  async read(): Promise<PDFMetadata> {
+    await this.readXRef();
+    const encrypted = this.trailer.has('Encrypt');
+    const pageSizes = await this.readPageSizes();
+
+    let producer: string | undefined;
+    if (!encrypted) {
+      const info = await this.resolve(this.trailer.get('Info'));
+      const value = isDict(info) ? await this.resolve(info.entries.get('Producer')) : null;
+      if (isObject(value) && value.kind === 'string') producer = decodeText(value.bytes);
+    }
+
+    return { pageCount: pageSizes.length, pageSizes, encrypted, producer };
+  }
+
+  /**
+   * Follow startxref and every /Prev; the newest section wins for each object
+   */
+  private async readXRef(): Promise<void> {
+    const { size } = this.source;
+    const tailBytes = await this.source.read(Math.max(0, size - 1024), size);
+    const tail = latin1(tailBytes, 0, tailBytes.length);
+    const at = tail.lastIndexOf('startxref');
+    if (at < 0) throw new Error('startxref not found');
+
+    let offset: number | undefined = parseInt(tail.slice(at + 9).trim(), 10);
+    const seen = new Set<number>();
+    let newest = true;
+
+    while (offset !== undefined && !seen.has(offset)) {
+      if (!Number.isInteger(offset) || offset < 0 || offset >= size) {
+        throw new Error(`Bad xref offset ${offset}`);
+      }
+      seen.add(offset);
+
+      const trailer = await this.readXRefSection(offset);
+      if (newest) {
+        this.trailer = trailer;
+        newest = false;
+      }
+      const prev = trailer.get('Prev');
+      offset = typeof prev === 'number' ? prev : undefined;
+    }
+
+    if (!this.trailer.has('Root')) throw new Error('Trailer has no /Root');
+  }
+
+  private addEntry(num: number, entry: XRefEntry): void {
+    if (!this.xref.has(num)) this.xref.set(num, entry);
+  }
+
+  private async readXRefSection(offset: number): Promise<Map<string, PDFValue>> {
+    const table = await this.parseAt(offset, (lexer) => {
+      if (lexer.word() !== 'xref') return null;
+
+      const entries: Array<[number, XRefEntry]> = [];
+      for (;;) {
+        const word = lexer.word();
+        if (word === 'trailer') break;
+
+        const start = Number(word);
+        const count = Number(lexer.word());
+        if (!Number.isInteger(start) || !Number.isInteger(count)) throw new Error('Malformed xref table');
+
+        for (let i = 0; i < count; i++) {
+          const entryOffset = Number(lexer.word());
+          lexer.word();
+          entries.push([start + i, lexer.word() === 'n' ? { offset: entryOffset } : null]);
+        }
+      }
+      return { entries, trailer: lexer.value() };
+    });
+
+    if (!table) return this.readXRefStream(offset);
+    table.entries.forEach(([num, entry]) => this.addEntry(num, entry));
+
+    const { trailer } = table;
+    if (!isDict(trailer)) throw new Error('Malformed trailer');
+
+    // Hybrid files list compressed objects in a separate xref stream
+    const xrefStream = trailer.entries.get('XRefStm');
+    if (typeof xrefStream === 'number') await this.readXRefStream(xrefStream);
+
+    return trailer.entries;
+  }
+
+  private async readXRefStream(offset: number): Promise<Map<string, PDFValue>> {
+    const dict = await this.parseAt(offset, (lexer) => lexer.indirectObject());
+    if (!isDict(dict) || nameOf(dict.entries.get('Type')) !== 'XRef') {
+      throw new Error(`No xref at offset ${offset}`);
+    }
+
+    const widths = dict.entries.get('W');
+    if (!Array.isArray(widths) || widths.length !== 3 || !widths.every((w) => typeof w === 'number')) {
+      throw new Error('Malformed xref stream /W');
+    }
+    const [w0, w1, w2] = widths as number[];
+    const size = dict.entries.get('Size');
+    const index = dict.entries.get('Index') ?? [0, size ?? 0];
+    if (!Array.isArray(index)) throw new Error('Malformed xref stream /Index');
+
+    const rows = await this.streamData(dict);
+    const field = (pos: number, width: number): number => {
+      let value = 0;
+      for (let i = 0; i < width; i++) value = value * 256 + rows[pos + i];
+      return value;
+    };
+
+    let pos = 0;
+    for (let i = 0; i + 1 < index.length; i += 2) {
+      const start = index[i] as number;
+      const count = index[i + 1] as number;
+      for (let j = 0; j < count; j++, pos += w0 + w1 + w2) {
+        if (pos + w0 + w1 + w2 > rows.length) throw new Error('Truncated xref stream');
+        const type = w0 === 0 ? 1 : field(pos, w0);
+        const second = field(pos + w0, w1);
+        const third = field(pos + w0 + w1, w2);
+        if (type === 1) this.addEntry(start + j, { offset: second });
+        else if (type === 2) this.addEntry(start + j, { stream: second, index: third });
+        else this.addEntry(start + j, null);
+      }
+    }
+
+    return dict.entries;
+  }
+
+  private async streamData(dict: PDFDict): Promise<Uint8Array> {
+    if (dict.streamStart === undefined) throw new Error('Object is not a stream');
+    const length = await this.resolve(dict.entries.get('Length'));
+    if (typeof length !== 'number') throw new Error('Stream has no /Length');
+    const raw = await this.source.read(dict.streamStart, dict.streamStart + length);
+
+    let filter = await this.resolve(dict.entries.get('Filter') ?? null);
+    let params = await this.resolve(dict.entries.get('DecodeParms') ?? null);
+    if (Array.isArray(filter)) {
+      if (filter.length > 1) throw new Error('Chained stream filters are not supported');
+      filter = filter[0] ?? null;
+      params = Array.isArray(params) ? params[0] ?? null : params;
+    }
+
+    if (filter === null) return raw;
+    if (nameOf(filter) !== 'FlateDecode') throw new Error(`Unsupported filter ${nameOf(filter)}`);
+
+    const inflated = await this.inflate(raw);
+    const predictor = isDict(params) ? params.entries.get('Predictor') : undefined;
+    if (typeof predictor !== 'number' || predictor < 10) {
+      if (typeof predictor === 'number' && predictor > 1) throw new Error('TIFF predictor is not supported');
+      return inflated;
+    }
+
+    const setting = (key: string, fallback: number): number => {
+      const value = isDict(params) ? params.entries.get(key) : undefined;
+      return typeof value === 'number' ? value : fallback;
+    };
+    const bytesPerPixel = Math.max(1, (setting('Colors', 1) * setting('BitsPerComponent', 8)) / 8);
+    return unpredictPNG(inflated, setting('Columns', 1), bytesPerPixel);
+  }
+
+  private async resolve(value: PDFValue | undefined): Promise<PDFValue> {
+    if (value === undefined) return null;
+    return isObject(value) && value.kind === 'ref' ? this.object(value.num) : value;
+  }
+
+  private async object(num: number): Promise<PDFValue> {
+    const cached = this.objects.get(num);
+    if (cached !== undefined) return cached;
+
+    const entry = this.xref.get(num);
+    let value: PDFValue = null;
+    if (entry && 'offset' in entry) {
+      value = await this.parseAt(entry.offset, (lexer) => lexer.indirectObject());
+    } else if (entry) {
+      const stream = await this.objectStream(entry.stream);
+      if (entry.index >= stream.offsets.length) throw new Error(`Object ${num} missing from its stream`);
+      value = new Lexer(stream.data, stream.offsets[entry.index]).value();
+    }
+
+    this.objects.set(num, value);
+    return value;
+  }
+
+  private objectStream(num: number): Promise<ObjectStream> {
+    let stream = this.objectStreams.get(num);
+    if (!stream) {
+      stream = (async () => {
+        // Object streams of encrypted files are encrypted; leave those to pdf-lib
+        if (this.trailer.has('Encrypt')) throw new Error('Encrypted object stream');
+
+        const entry = this.xref.get(num);
+        if (!entry || !('offset' in entry)) throw new Error(`Object stream ${num} not found`);
+        const dict = await this.parseAt(entry.offset, (lexer) => lexer.indirectObject());
+        if (!isDict(dict)) throw new Error(`Object ${num} is not a stream`);
+
+        const data = await this.streamData(dict);
+        const count = dict.entries.get('N');
+        const first = dict.entries.get('First');
+        if (typeof count !== 'number' || typeof first !== 'number') throw new Error('Malformed object stream');
+
+        // Header is "objnum offset" pairs; offsets are relative to /First
+        const header = new Lexer(data);
+        const offsets: number[] = [];
+        for (let i = 0; i < count; i++) {
+          header.word();
+          offsets.push(first + Number(header.word()));
+        }
+        return { data, offsets };
+      })();
+      this.objectStreams.set(num, stream);
+    }
+    return stream;
+  }
+
+  private async readPageSizes(): Promise<PageSize[]> {
+    const catalog = await this.resolve(this.trailer.get('Root'));
+    if (!isDict(catalog)) throw new Error('Catalog not found');
+
+    const sizes: PageSize[] = [];
+    const visited = new Set<number>();
+
+    // MediaBox is inheritable, so it is passed down the tree
+    const walk = async (node: PDFValue | undefined, inheritedBox?: number[]): Promise<void> => {
+      if (node !== undefined && isObject(node) && node.kind === 'ref') {
+        if (visited.has(node.num)) throw new Error('Page tree has a cycle');
+        visited.add(node.num);
+      }
+
+      const dict = await this.resolve(node);
+      if (!isDict(dict)) throw new Error('Page tree node is not a dictionary');
+
+      const box = (await this.numbers(dict.entries.get('MediaBox'))) ?? inheritedBox;
+      const kids = await this.resolve(dict.entries.get('Kids'));
+
+      if (nameOf(dict.entries.get('Type')) !== 'Page' && Array.isArray(kids)) {
+        for (const kid of kids) await walk(kid, box);
+        return;
+      }
+
+      if (!box || box.length < 4) throw new Error('Page has no MediaBox');
+      sizes.push({ width: Math.abs(box[2] - box[0]), height: Math.abs(box[3] - box[1]) });
+    };
+
+    await walk(catalog.entries.get('Pages'));
+    if (sizes.length === 0) throw new Error('No pages found');
+    return sizes;
+  }
+
+  private async numbers(value: PDFValue | undefined): Promise<number[] | undefined> {
+    const array = await this.resolve(value);
+    if (!Array.isArray(array)) return undefined;
+    const items = await Promise.all(array.map((item) => this.resolve(item)));
+    return items.every((item) => typeof item === 'number') ? (items as number[]) : undefined;
+  }
+}
+
+/**
+ * Full parse with pdf-lib, for files the index reader cannot follow
+ */
+async function readWithPDFLib(data: Uint8Array): Promise<PDFMetadata> {
+  const doc = await PDFDocument.load(data, { ignoreEncryption: true, updateMetadata: false });
+  return {
+    pageCount: doc.getPageCount(),
+    pageSizes: doc.getPages().map((page) => page.getSize()),
+    encrypted: doc.isEncrypted,
+    producer: doc.isEncrypted ? undefined : doc.getProducer(),
+  };
+}
+
+/**
+ * Read page count, page sizes, encryption flag and producer
+ * Uses the xref and page tree only, and falls back to a full parse (which
+ * reads the whole source) if needed.
+ */
+export async function readPDFMetadataFrom(source: ByteSource, inflate: Inflate): Promise<PDFMetadata> {
+  try {
+    return await new PDFIndexReader(source, inflate).read();
+  } catch (error) {
+    console.warn(
+      'PDF index read failed, falling back to a full parse:',
+      error instanceof Error ? error.message : error
+    );
+    return readWithPDFLib(await source.read(0, source.size));
+  }
+}
@@ -0,0 +1,220 @@
+/**
+ * Tracing
+ * Records timed spans for an operation across the page, PDF workers and
+ * Cloud Functions, linked by one trace ID
+ *
+ * Shared by the web app (as @shared/tracing) and Cloud Functions; each side
+ * calls configureTracing() once with its service name. Context crosses each
+ * boundary as a W3C traceparent string (in worker messages, callable
+ * payloads and Storage metadata), and finished spans travel back with the
+ * result so one side ends up holding the whole trace. toOTLP() encodes
+ * them as OTLP/JSON for an OpenTelemetry collector.
+ */
+
+export type SpanAttributes = Record<string, string | number | boolean>;
+
+export interface TraceContext {
+  traceId: string; // 32 hex chars
+  spanId: string; // 16 hex chars
+}
+
+export interface SpanRecord {
+  traceId: string;
+  spanId: string;
+  parentSpanId?: string;
+  name: string;
+  service: string;
+  startTime: number; // Epoch ms with sub-millisecond precision
+  endTime: number;
+  attributes: SpanAttributes;
+  status: 'ok' | 'error';
+  error?: string;
+}
+
+export interface TracingOptions {
+  service: string; // service.name on every span started here
+  randomHex?: (bytes: number) => string; // Defaults to Web Crypto
+}
+
+// Finished spans kept until taken or exported; the oldest are dropped beyond this
+export const MAX_RECORDED_SPANS = 5000;
+
+const TRACEPARENT = /^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$/;
+
+// Web Crypto is global in browsers, workers and Node 19+
+type WebCrypto = { getRandomValues(array: Uint8Array): Uint8Array };
+const webCrypto = (): WebCrypto => (globalThis as unknown as { crypto: WebCrypto }).crypto;
+
+let recorded: SpanRecord[] = [];
+let service = 'pdf-merger';
+let randomHex = (bytes: number): string =>
+  Array.from(webCrypto().getRandomValues(new Uint8Array(bytes)), (byte) =>
+    byte.toString(16).padStart(2, '0')
+  ).join('');
+
+// timeOrigin + now() keeps page and worker timestamps on the same clock
+const now = (): number => performance.timeOrigin + performance.now();
+
+/**
+ * Set the service name and ID source for spans started in this runtime
+ */
+export function configureTracing(options: TracingOptions): void {
+  service = options.service;
+  if (options.randomHex) randomHex = options.randomHex;
+}
+
+export class Span {
+  readonly context: TraceContext;
+  private record: SpanRecord;
+  private ended = false;
+
+  constructor(name: string, parent?: TraceContext | null, attributes: SpanAttributes = {}) {
+    this.context = { traceId: parent?.traceId ?? randomHex(16), spanId: randomHex(8) };
+    this.record = {
+      ...this.context,
+      parentSpanId: parent?.spanId,
+      name,
+      service,
+      startTime: now(),
+      endTime: 0,
+      attributes: { ...attributes },
+      status: 'ok',
+    };
+  }
+
+  get traceId(): string {
+    return this.context.traceId;
+  }
+
+  setAttributes(attributes: SpanAttributes): this {
+    Object.assign(this.record.attributes, attributes);
+    return this;
+  }
+
+  /**
+   * Finish the span (only the first call counts); pass an error to mark it failed
+   */
+  end(error?: unknown): void {
+    if (this.ended) return;
+    this.ended = true;
+    this.record.endTime = now();
+    if (error !== undefined) {
+      this.record.status = 'error';
+      this.record.error = error instanceof Error ? error.message : String(error);
+    }
+    recordSpans([this.record]);
+  }
+}
+
+/**
+ * Start a span; without a parent it begins a new trace
+ */
+export function startSpan(name: string, parent?: TraceContext | null, attributes?: SpanAttributes): Span {
+  return new Span(name, parent, attributes);
+}
+
+/**
+ * Run fn inside a span that ends when it settles
+ */
+export async function withSpan<T>(
+  name: string,
+  parent: TraceContext | null | undefined,
+  fn: (span: Span) => Promise<T>,
+  attributes?: SpanAttributes
+): Promise<T> {
+  const span = startSpan(name, parent, attributes);
+  try {
+    const result = await fn(span);
+    span.end();
+    return result;
+  } catch (error) {
+    span.end(error);
+    throw error;
+  }
+}
+
+export function formatTraceparent(context: TraceContext): string {
+  return `00-${context.traceId}-${context.spanId}-01`;
+}
+
+/**
+ * Read a traceparent string; anything malformed is ignored
+ */
+export function parseTraceparent(value: unknown): TraceContext | null {
+  const match = typeof value === 'string' ? TRACEPARENT.exec(value) : null;
+  return match ? { traceId: match[1], spanId: match[2] } : null;
+}
+
+/**
+ * Add finished spans, e.g. the ones a worker or function sent back
+ */
+export function recordSpans(spans: SpanRecord[]): void {
+  recorded.push(...spans);
+  if (recorded.length > MAX_RECORDED_SPANS) {
+    recorded = recorded.slice(recorded.length - MAX_RECORDED_SPANS);
+  }
+}
+
+/**
+ * Remove and return the spans of one trace (workers hand these back)
+ */
+export function takeSpans(traceId: string): SpanRecord[] {
+  const taken = recorded.filter((span) => span.traceId === traceId);
+  recorded = recorded.filter((span) => span.traceId !== traceId);
+  return taken;
+}
+
+export function getSpans(traceId?: string): SpanRecord[] {
+  return traceId ? recorded.filter((span) => span.traceId === traceId) : [...recorded];
+}
+
+export function clearSpans(): void {
+  recorded = [];
+}
+
+// OTLP encodes nanoseconds as decimal strings; split to keep precision
+const toUnixNano = (ms: number): string =>
+  (BigInt(Math.floor(ms)) * BigInt(1_000_000) + BigInt(Math.round((ms % 1) * 1e6))).toString();
+
+const toOTLPValue = (value: string | number | boolean) => {
+  if (typeof value === 'boolean') return { boolValue: value };
+  if (typeof value === 'number') {
+    return Number.isInteger(value) ? { intValue: String(value) } : { doubleValue: value };
+  }
+  return { stringValue: value };
+};
+
+const toOTLPAttributes = (attributes: SpanAttributes) =>
+  Object.entries(attributes).map(([key, value]) => ({ key, value: toOTLPValue(value) }));
+
+/**
+ * Convert spans to an OTLP/JSON ExportTraceServiceRequest, one resource per service
+ */
+export function toOTLP(spans: SpanRecord[]) {
+  const services = new Map<string, SpanRecord[]>();
+  for (const span of spans) {
+    services.set(span.service, [...(services.get(span.service) ?? []), span]);
+  }
+
+  return {
+    resourceSpans: Array.from(services, ([service, serviceSpans]) => ({
+      resource: { attributes: toOTLPAttributes({ 'service.name': service }) },
+      scopeSpans: [
+        {
+          scope: { name: 'pdf-merger' },
+          spans: serviceSpans.map((span) => ({
+            traceId: span.traceId,
+            spanId: span.spanId,
+            ...(span.parentSpanId ? { parentSpanId: span.parentSpanId } : {}),
+            name: span.name,
+            kind: 1, // SPAN_KIND_INTERNAL
+            startTimeUnixNano: toUnixNano(span.startTime),
+            endTimeUnixNano: toUnixNano(span.endTime),
+            attributes: toOTLPAttributes(span.attributes),
+            status: span.status === 'error' ? { code: 2, message: span.error ?? '' } : { code: 1 },
+          })),
+        },
+      ],
+    })),
+  };
+}
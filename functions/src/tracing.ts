@@ -0,0 +1,39 @@
+/**
+ * Tracing (Cloud Functions)
+ * The span model lives in shared/tracing.ts, shared with the web app.
+ *
+ * Handlers continue the client's trace from the `traceparent` field of a
+ * callable payload (or the HTTP header / Storage metadata of that name),
+ * then call flushTrace() when done. That returns the trace's spans so they
+ * can go back to the client, and appends them as one OTLP/JSON line to
+ * TRACE_FILE when it is set, e.g. TRACE_FILE=/tmp/traces.jsonl under the
+ * emulator. An OpenTelemetry collector's otlpjsonfile receiver can read
+ * that file directly.
+ */
+
+import { appendFile } from 'fs/promises';
+import { randomBytes } from 'crypto';
+import { configureTracing, SpanRecord, takeSpans, toOTLP } from './shared/tracing';
+
+export * from './shared/tracing';
+
+configureTracing({
+  service: 'pdf-merger-functions',
+  randomHex: (bytes) => randomBytes(bytes).toString('hex'),
+});
+
+/**
+ * Remove the spans of one trace, write them to the file sink and return them
+ */
+export async function flushTrace(traceId: string): Promise<SpanRecord[]> {
+  const spans = takeSpans(traceId);
+
+  const sink = process.env.TRACE_FILE;
+  if (sink && spans.length > 0) {
+    await appendFile(sink, `${JSON.stringify(toOTLP(spans))}\n`).catch((error) => {
+      console.warn(`Failed to write spans to ${sink}:`, error);
+    });
+  }
+
+  return spans;
+}
@@ -0,0 +1,112 @@
+/**
+ * The index reader is shared by the server and web wrappers; both must agree
+ * with a full pdf-lib parse on the same fixtures.
+ */
+
+import { Readable } from 'stream';
+import { PDFDocument } from 'pdf-lib';
+import * as server from '../src/pdfMetadata';
+import * as web from '../../web/src/utils/pdfMetadata';
+
+async function fixture(pageCount: number, useObjectStreams: boolean): Promise<Uint8Array> {
+  const doc = await PDFDocument.create();
+  doc.setProducer('pdf-merger-pro tests');
+  for (let i = 0; i < pageCount; i++) {
+    doc.addPage([100 + i * 10, 200 + i]);
+  }
+  return doc.save({ useObjectStreams });
+}
+
+async function expected(bytes: Uint8Array): Promise<server.PDFMetadata> {
+  const doc = await PDFDocument.load(bytes, { updateMetadata: false });
+  return {
+    pageCount: doc.getPageCount(),
+    pageSizes: doc.getPages().map((page) => page.getSize()),
+    encrypted: false,
+    producer: doc.getProducer(),
+  };
+}
+
+// A Storage file stand-in that records every ranged read
+function rangedFile(bytes: Uint8Array) {
+  const reads: Array<{ start: number; end: number }> = [];
+  return {
+    reads,
+    createReadStream({ start, end }: { start: number; end: number }) {
+      reads.push({ start, end });
+      return Readable.from([Buffer.from(bytes.subarray(start, end + 1))]);
+    },
+  };
+}
+
+describe.each([
+  ['with object streams', true],
+  ['with an xref table', false],
+])('readPDFMetadata %s', (_, useObjectStreams) => {
+  let bytes: Uint8Array;
+
+  beforeAll(async () => {
+    bytes = await fixture(40, useObjectStreams);
+  });
+
+  it('matches pdf-lib on the server', async () => {
+    expect(await server.readPDFMetadata(bytes)).toEqual(await expected(bytes));
+  });
+
+  it('matches pdf-lib in the browser wrapper', async () => {
+    const metadata = await expected(bytes);
+    expect(await web.readPDFMetadata(bytes)).toEqual(metadata);
+    expect(await web.readPDFMetadata(new Blob([bytes]))).toEqual(metadata);
+  });
+
+  it('reads a stored object without downloading it', async () => {
+    // A large stream nothing points at stands in for fonts and images
+    const doc = await PDFDocument.load(bytes);
+    doc.context.register(doc.context.stream(new Uint8Array(4 * 1024 * 1024).fill(0x41)));
+    const large = await doc.save({ useObjectStreams });
+
+    const file = rangedFile(large);
+    expect(await server.readStoredPDFMetadata(file, large.length)).toEqual(await expected(large));
+
+    const bytesRead = file.reads.reduce((total, { start, end }) => total + end + 1 - start, 0);
+    expect(bytesRead).toBeLessThan(large.length / 4);
+  });
+});
+
+describe('readPDFMetadata fallbacks', () => {
+  it('falls back to a full parse when the xref offset is wrong', async () => {
+    const bytes = await fixture(3, false);
+    const text = Buffer.from(bytes).toString('latin1');
+    const at = text.lastIndexOf('startxref');
+    const broken = Buffer.from(
+      text.slice(0, at) + text.slice(at).replace(/startxref\s+\d+/, 'startxref\n7'),
+      'latin1'
+    );
+
+    jest.spyOn(console, 'warn').mockImplementation(() => undefined);
+    expect(await server.readPDFMetadata(broken)).toEqual(await expected(bytes));
+    expect(await web.readPDFMetadata(broken)).toEqual(await expected(bytes));
+  });
+
+  it('decodes a UTF-16 producer', async () => {
+    // pdf-lib writes Info strings as UTF-16 hex strings
+    const doc = await PDFDocument.create();
+    doc.addPage([300, 400]);
+    doc.setProducer('Ünïcödé');
+    const bytes = await doc.save({ useObjectStreams: false });
+
+    expect((await server.readPDFMetadata(bytes)).producer).toBe('Ünïcödé');
+    expect((await web.readPDFMetadata(bytes)).producer).toBe('Ünïcödé');
+  });
+});
+
+describe('isStoredPDF', () => {
+  it('sniffs the header instead of trusting the content type', async () => {
+    const bytes = await fixture(1, false);
+    expect(await server.isStoredPDF(rangedFile(bytes), bytes.length)).toBe(true);
+
+    const text = Buffer.from('Plain text, not a PDF');
+    expect(await server.isStoredPDF(rangedFile(text), text.length)).toBe(false);
+    expect(await server.isStoredPDF(rangedFile(new Uint8Array(0)), 0)).toBe(false);
+  });
+});
@@ -0,0 +1,128 @@
+/**
+ * Parity tests: the server operations must produce the same pages as the
+ * client ones in web/src/utils/pdfOperations.ts for the same input.
+ */
+
+import { PDFDocument } from 'pdf-lib';
+import * as server from '../src/pdfOperations';
+import * as web from '../../web/src/utils/pdfOperations';
+
+type PageSummary = { width: number; rotation: number };
+
+// Page widths are 100, 110, 120, ... so each page can be told apart
+async function fixture(pageCount: number, firstWidth = 100): Promise<Uint8Array> {
+  const doc = await PDFDocument.create();
+  for (let i = 0; i < pageCount; i++) {
+    doc.addPage([firstWidth + i * 10, 200]);
+  }
+  return doc.save();
+}
+
+async function summarize(bytes: Uint8Array | ArrayBuffer): Promise<PageSummary[]> {
+  const doc = await PDFDocument.load(bytes);
+  return doc.getPages().map((page) => ({
+    width: page.getWidth(),
+    rotation: page.getRotation().angle,
+  }));
+}
+
+const toBlob = (bytes: Uint8Array) => new Blob([bytes], { type: 'application/pdf' });
+const fromBlob = async (blob: Blob) => new Uint8Array(await blob.arrayBuffer());
+
+describe('parsePageRange', () => {
+  it.each([
+    ['1,3-5,7', 10, [1, 3, 4, 5, 7]],
+    ['5-3', 10, []],
+    ['0-2, 9-20', 10, [1, 2, 9, 10]],
+    ['2,2,1', 10, [1, 2]],
+    ['a, 3, -, 4-x', 10, [3]],
+    ['', 10, []],
+  ])('parses %p with %p pages the same way', (range, maxPages, expected) => {
+    expect(server.parsePageRange(range, maxPages)).toEqual(expected);
+    expect(web.parsePageRange(range, maxPages)).toEqual(expected);
+  });
+});
+
+describe('operations match the web implementation', () => {
+  let six: Uint8Array;
+  let three: Uint8Array;
+
+  beforeAll(async () => {
+    six = await fixture(6);
+    three = await fixture(3, 500);
+  });
+
+  it('merges', async () => {
+    const ours = await summarize(await server.mergePDFs([six, async () => three]));
+    const theirs = await summarize(await fromBlob(await web.mergePDFs([toBlob(six), toBlob(three)])));
+    expect(ours).toEqual(theirs);
+    expect(ours.map((page) => page.width)).toEqual([100, 110, 120, 130, 140, 150, 500, 510, 520]);
+  });
+
+  it('splits', async () => {
+    const ours = await Promise.all((await server.splitPDF(six, [2, 4, 9])).map(summarize));
+    const theirs = await Promise.all(
+      (await web.splitPDF(toBlob(six), [2, 4, 9])).map(async (blob) => summarize(await fromBlob(blob)))
+    );
+    expect(ours).toEqual(theirs);
+    expect(ours.map((part) => part.length)).toEqual([2, 2, 2]);
+  });
+
+  it('streams split parts with explicit pages and rotations', async () => {
+    const parts = [];
+    const ranges = [{ from: 1, to: 2 }, { from: 2, to: 6, pages: [6, 2, 99] }];
+    for await (const part of web.splitPDFStream(toBlob(six), ranges, { rotations: { 2: 90 } })) {
+      parts.push({ index: part.index, pages: await summarize(await fromBlob(part.blob)) });
+    }
+
+    expect(parts).toEqual([
+      { index: 0, pages: [{ width: 100, rotation: 0 }, { width: 110, rotation: 90 }] },
+      { index: 1, pages: [{ width: 150, rotation: 0 }, { width: 110, rotation: 90 }] },
+    ]);
+  });
+
+  it('extracts', async () => {
+    const ours = await summarize(await server.extractPages(six, [5, 1, 9]));
+    const theirs = await summarize(await fromBlob(await web.extractPages(toBlob(six), [5, 1, 9])));
+    expect(ours).toEqual(theirs);
+
+    await expect(server.extractPages(six, [0, 7])).rejects.toThrow('No valid page numbers');
+    await expect(web.extractPages(toBlob(six), [0, 7])).rejects.toThrow('No valid page numbers');
+  });
+
+  it.each([90, -90, 270])('rotates by %p degrees', async (degrees) => {
+    const ours = await summarize(await server.rotatePages(six, [1, 3, 8], degrees));
+    const theirs = await summarize(await fromBlob(await web.rotatePages(toBlob(six), [1, 3, 8], degrees)));
+    expect(ours).toEqual(theirs);
+  });
+
+  it('reorders', async () => {
+    const order = [6, 1, 5, 2, 4, 3];
+    const ours = await summarize(await server.reorderPages(six, order));
+    const theirs = await summarize(await fromBlob(await web.reorderPages(toBlob(six), order)));
+    expect(ours).toEqual(theirs);
+
+    await expect(server.reorderPages(six, [1, 2])).rejects.toThrow('Invalid page order');
+    await expect(web.reorderPages(toBlob(six), [1, 2])).rejects.toThrow('Invalid page order');
+  });
+
+  it('deletes', async () => {
+    const ours = await summarize(await server.deletePages(six, [2, 4, 99]));
+    const theirs = await summarize(await fromBlob(await web.deletePages(toBlob(six), [2, 4, 99])));
+    expect(ours).toEqual(theirs);
+    expect(ours.map((page) => page.width)).toEqual([100, 120, 140, 150]);
+  });
+
+  it('watermarks', async () => {
+    const ours = await summarize(await server.addWatermark(six, 'DRAFT', { fontSize: 40 }));
+    const theirs = await summarize(
+      await fromBlob(await web.addWatermark(toBlob(six), 'DRAFT', { fontSize: 40 }))
+    );
+    expect(ours).toEqual(theirs);
+  });
+
+  it('counts pages', async () => {
+    expect(await server.getPDFPageCount(six)).toBe(6);
+    expect(await web.getPDFPageCount(toBlob(six))).toBe(6);
+  });
+});
@@ -0,0 +1,92 @@
+/**
+ * Trace context must survive every hop: the shared implementation (web and
+ * functions) and the converter's plain-JS copy read headers the same way.
+ */
+
+import {
+  SpanRecord,
+  TraceContext,
+  formatTraceparent,
+  parseTraceparent,
+  startSpan,
+  toOTLP,
+  withSpan,
+} from '../src/tracing';
+
+// eslint-disable-next-line @typescript-eslint/no-var-requires
+const converter = require('../../pdfconvertor/tracing');
+
+const TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736';
+const SPAN_ID = '00f067aa0ba902b7';
+
+const INVALID: unknown[] = [
+  undefined,
+  null,
+  42,
+  { traceId: TRACE_ID, spanId: SPAN_ID },
+  '',
+  `01-${TRACE_ID}-${SPAN_ID}-01`, // Unknown version
+  `00-${TRACE_ID.toUpperCase()}-${SPAN_ID}-01`, // Hex must be lowercase
+  `00-${TRACE_ID.slice(1)}-${SPAN_ID}-01`, // Short trace ID
+  `00-${TRACE_ID}-${SPAN_ID}0-01`, // Long span ID
+  `00-${TRACE_ID}-${SPAN_ID}-1`, // Short flags
+  `00-${TRACE_ID}-${SPAN_ID}-01-extra`,
+  ` 00-${TRACE_ID}-${SPAN_ID}-01`,
+  `00-${TRACE_ID}-${SPAN_ID}`,
+  `00-${'g'.repeat(32)}-${SPAN_ID}-01`,
+];
+
+describe('traceparent', () => {
+  it('parses a valid header', () => {
+    const header = `00-${TRACE_ID}-${SPAN_ID}-01`;
+    expect(parseTraceparent(header)).toEqual({ traceId: TRACE_ID, spanId: SPAN_ID });
+    // Sampled or not, the context is the same
+    expect(parseTraceparent(`00-${TRACE_ID}-${SPAN_ID}-00`)).toEqual(parseTraceparent(header));
+  });
+
+  it('round-trips through format and parse', () => {
+    const context: TraceContext = { traceId: TRACE_ID, spanId: SPAN_ID };
+    expect(parseTraceparent(formatTraceparent(context))).toEqual(context);
+
+    for (let i = 0; i < 20; i++) {
+      const { context: generated } = startSpan('round-trip');
+      expect(parseTraceparent(formatTraceparent(generated))).toEqual(generated);
+    }
+  });
+
+  it.each(INVALID.map((value) => [value]))('ignores %p', (value) => {
+    expect(parseTraceparent(value)).toBeNull();
+  });
+
+  it('is read the same way by the converter', () => {
+    const headers = [`00-${TRACE_ID}-${SPAN_ID}-01`, ...INVALID];
+    for (const header of headers) {
+      expect(converter.parseTraceparent(header)).toEqual(parseTraceparent(header));
+    }
+  });
+});
+
+describe('spans', () => {
+  it('continue the parent trace', async () => {
+    const parent = parseTraceparent(`00-${TRACE_ID}-${SPAN_ID}-01`);
+    const child = await withSpan('child', parent, async (span) => span.context);
+    expect(child.traceId).toBe(TRACE_ID);
+    expect(child.spanId).toMatch(/^[0-9a-f]{16}$/);
+    expect(child.spanId).not.toBe(SPAN_ID);
+  });
+
+  it('encode to the same OTLP as the converter', () => {
+    const span: SpanRecord = {
+      traceId: TRACE_ID,
+      spanId: SPAN_ID,
+      name: 'convert',
+      service: 'pdf-converter',
+      startTime: 1700000000000.25,
+      endTime: 1700000000123.5,
+      attributes: { bytes: 1024, ratio: 0.5, cached: false, format: 'docx' },
+      status: 'error',
+      error: 'timeout',
+    };
+    expect(toOTLP([span])).toEqual(converter.toOTLP([span]));
+  });
+});
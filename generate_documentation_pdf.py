@@ -17,13 +17,24 @@ from reportlab.platypus import (
     Table, 
     TableStyle,
     Image,
+    Preformatted,
     KeepTogether,
     Frame,
     PageTemplate
 )
 from reportlab.pdfgen import canvas
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from xml.sax.saxutils import escape
+import argparse
+import glob
+import hashlib
+import json
 import os
+import re
+import shutil
+import sys
+import tempfile
 
 # Color scheme
 PRIMARY_COLOR = HexColor("#0ea5e9")      # Sky blue
@@ -34,24 +45,33 @@ ERROR_COLOR = HexColor("#ef4444")        # Red
 TEXT_COLOR = HexColor("#1e293b")         # Dark slate
 LIGHT_BG = HexColor("#f1f5f9")          # Light slate
 
-def create_pdf():
-    """Generate PDF from documentation"""
-    
-    # Create PDF document
-    pdf_path = r"c:\Users\R A J A\Pyton_proj\pdf_merger\PDF_MERGER_PRO_DOCUMENTATION.pdf"
-    doc = SimpleDocTemplate(
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Bump when the rendered output changes in a way the source hash can't see
+GENERATOR_VERSION = "1.1.0"
+DEFAULT_CACHE_DIR = os.path.join(REPO_ROOT, ".doc_cache")
+DEFAULT_CACHE_SIZE_MB = 256
+
+# Written by `npm run bench -- --update-baseline` in functions/
+DEFAULT_BENCHMARK_RESULTS = os.path.join(REPO_ROOT, "functions", "benchmarks", "baseline.json")
+
+def make_doc_template(pdf_path, title):
+    """Create the page template shared by every generated document"""
+    return SimpleDocTemplate(
         pdf_path,
         pagesize=letter,
         rightMargin=0.75*inch,
         leftMargin=0.75*inch,
         topMargin=1*inch,
         bottomMargin=0.75*inch,
-        title="PDF Merger Pro - Complete Documentation",
+        title=title,
         author="PDF Merger Development Team"
     )
-    
-    # Define styles
-    styles = getSampleStyleSheet()
+
+def build_styles(styles=None):
+    """Build the paragraph styles shared by every generated document"""
+    if styles is None:
+        styles = getSampleStyleSheet()
     
     # Custom styles
     title_style = ParagraphStyle(
@@ -112,6 +132,54 @@ def create_pdf():
         borderPadding=5
     )
     
+    return {
+        'title': title_style,
+        'heading1': heading1_style,
+        'heading2': heading2_style,
+        'body': body_style,
+        'code': code_style,
+    }
+
+def load_benchmark_results(path):
+    """Read a benchmark report, or None if it hasn't been recorded"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def benchmark_table_data(report):
+    """Rows for the measured performance table (skipped cases are left out)"""
+    rows = [['Operation', 'Corpus', 'Median', 'Peak RSS', 'Throughput']]
+    for result in report.get('results', []):
+        if result.get('skipped') or 'wallMs' not in result:
+            continue
+        rows.append([
+            result['operation'],
+            result['corpus'],
+            f"{result['wallMs']['median']:.0f} ms",
+            f"{result['peakRssMB']:.0f} MB",
+            f"{result['pagesPerSec']:.0f} pages/s",
+        ])
+    return rows
+
+def create_pdf(pdf_path=None, benchmark_path=DEFAULT_BENCHMARK_RESULTS):
+    """Generate PDF from documentation"""
+    
+    # Create PDF document
+    if pdf_path is None:
+        pdf_path = os.path.join(REPO_ROOT, "PDF_MERGER_PRO_DOCUMENTATION.pdf")
+    doc = make_doc_template(pdf_path, "PDF Merger Pro - Complete Documentation")
+    
+    # Define styles
+    styles = getSampleStyleSheet()
+    doc_styles = build_styles(styles)
+    title_style = doc_styles['title']
+    heading1_style = doc_styles['heading1']
+    heading2_style = doc_styles['heading2']
+    body_style = doc_styles['body']
+    code_style = doc_styles['code']
+    
     # Story elements
     story = []
     
@@ -346,17 +414,17 @@ def create_pdf():
     story.append(Paragraph("⚡ Performance Optimizations", heading1_style))
     
     perf_data = [
-        ['Optimization', 'Implementation', 'Benefit'],
-        ['Enhanced Loading', 'Animated UI with tips', '↓ Perceived wait time'],
-        ['PDF Worker Config', 'Centralized setup', '↓ Rendering to worker thread'],
-        ['Lazy Thumbnails', '3 immediate, rest on-demand', '↓ 80% faster initial load'],
-        ['Web Workers', 'Background PDF ops', '↓ No UI blocking'],
-        ['Code Splitting', 'Separate PDF vendor chunk', '↓ 30% faster JS load'],
-        ['Render Cancellation', 'Task refs + mounted check', '↓ Smoother animations']
+        ['Optimization', 'Implementation'],
+        ['Enhanced Loading', 'Animated UI with tips'],
+        ['PDF Worker Config', 'Centralized setup'],
+        ['Lazy Thumbnails', '3 immediate, rest on-demand'],
+        ['Web Workers', 'Background PDF ops'],
+        ['Code Splitting', 'Separate PDF vendor chunk'],
+        ['Render Cancellation', 'Task refs + mounted check']
     ]
     
-    perf_table = Table(perf_data, colWidths=[1.8*inch, 2.2*inch, 1.5*inch])
-    perf_table.setStyle(TableStyle([
+    perf_table = Table(perf_data, colWidths=[2.2*inch, 3.3*inch])
+    perf_table_style = TableStyle([
         ('BACKGROUND', (0, 0), (-1, 0), ACCENT_COLOR),
         ('TEXTCOLOR', (0, 0), (-1, 0), white),
         ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
@@ -370,20 +438,27 @@ def create_pdf():
         ('LEFTPADDING', (0, 0), (-1, -1), 8),
         ('RIGHTPADDING', (0, 0), (-1, -1), 8),
         ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
+    ])
+    perf_table.setStyle(perf_table_style)
     story.append(perf_table)
     story.append(Spacer(1, 0.3*inch))
     
-    # Performance Metrics
-    story.append(Paragraph("<b>Performance Metrics (Before vs After):</b>", heading2_style))
-    metrics_perf = [
-        "PDF Load Time: 5-10s → 1-2s (80% faster)",
-        "First Thumbnails: 2-3s → 0.5-1s (70% faster)",
-        "Memory Usage: 150MB → 100MB (33% reduction)",
-        "UI Responsiveness: Sluggish → Smooth (Professional)"
-    ]
-    for metric in metrics_perf:
-        story.append(Paragraph(f"✓ {metric}", body_style))
+    # Performance Metrics (measured by functions/src/benchmark.ts)
+    story.append(Paragraph("<b>Measured Performance:</b>", heading2_style))
+    report = load_benchmark_results(benchmark_path)
+    if report is None:
+        story.append(Paragraph(
+            "No benchmark baseline recorded yet. Run <i>npm run bench -- --update-baseline</i> "
+            "in functions/ and regenerate this document.", body_style))
+    else:
+        env = report['environment']
+        story.append(Paragraph(
+            f"Recorded {escape(report['recordedAt'][:10])} on {escape(env['cpu'])} "
+            f"({env['cores']} cores, Node {escape(env['node'])}); median of each case.", body_style))
+        metrics_table = Table(benchmark_table_data(report),
+                              colWidths=[1.1*inch, 1.1*inch, 1*inch, 1*inch, 1.3*inch])
+        metrics_table.setStyle(perf_table_style)
+        story.append(metrics_table)
     
     # Components Section
     story.append(PageBreak())
@@ -505,7 +580,7 @@ downloadBlob(extracted, 'extracted.pdf');
     ✅ Professional user interface with smooth animations<br/>
     ✅ Firebase integration (Auth, Firestore, Storage)<br/>
     ✅ Type-safe implementation with 100% TypeScript coverage<br/>
-    ✅ Optimized performance (80% faster than initial version)<br/>
+    ✅ Performance measured by a benchmark suite against a recorded baseline<br/>
     ✅ Responsive design for mobile, tablet, and desktop<br/>
     ✅ Complete documentation and code examples<br/>
     ✅ Ready for production deployment<br/><br/>
@@ -538,13 +613,498 @@ downloadBlob(extracted, 'extracted.pdf');
     
     return pdf_path
 
-if __name__ == "__main__":
+# Markdown rendering
+
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)(?:\s+#+)?\s*$')
+FENCE_RE = re.compile(r'^\s*(```|~~~)')
+LIST_RE = re.compile(r'^(\s*)([-*+]|\d+[.)])\s+(.*)$')
+RULE_RE = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+TABLE_SEPARATOR_RE = re.compile(r'^\s*\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?\s*$')
+
+def iter_markdown_blocks(lines):
+    """
+    Parse Markdown lines into blocks, yielding each block as soon as it ends.
+
+    Blocks are (kind, payload) tuples where kind is one of 'heading',
+    'paragraph', 'list', 'table', 'code', 'quote' or 'rule'. Only the block
+    currently being parsed is held in memory, so any iterable of lines
+    (including an open file) can be streamed through.
+    """
+    kind = None
+    buffer = []
+
+    def flush():
+        if kind == 'paragraph':
+            return ('paragraph', buffer)
+        if kind == 'list':
+            return ('list', buffer)
+        if kind == 'table':
+            # Drop the |---|---| separator row
+            rows = [row for row in buffer if not TABLE_SEPARATOR_RE.match(row)]
+            return ('table', [split_table_row(row) for row in rows])
+        if kind == 'quote':
+            return ('quote', buffer)
+        return None
+
+    fence = None
+    for raw_line in lines:
+        line = raw_line.rstrip('\r\n')
+
+        # Fenced code is copied verbatim until the matching fence
+        if fence is not None:
+            if line.strip().startswith(fence):
+                yield ('code', '\n'.join(buffer))
+                kind, buffer, fence = None, [], None
+            else:
+                buffer.append(line.expandtabs(4))
+            continue
+
+        fence_match = FENCE_RE.match(line)
+        heading_match = HEADING_RE.match(line)
+        list_match = LIST_RE.match(line)
+        is_table_row = line.lstrip().startswith('|')
+        is_quote = line.lstrip().startswith('>')
+
+        # Close the current block when the next line starts something else
+        if kind is not None:
+            continues = (
+                (kind == 'paragraph' and line.strip() and not (
+                    fence_match or heading_match or list_match or is_table_row
+                    or is_quote or RULE_RE.match(line)))
+                or (kind == 'list' and line.strip() and (
+                    list_match or (line.startswith(' ') and not fence_match)))
+                or (kind == 'table' and is_table_row)
+                or (kind == 'quote' and is_quote)
+            )
+            if continues:
+                if kind == 'list' and not list_match:
+                    # Lazy continuation of the previous list item
+                    indent, ordered, text = buffer[-1]
+                    buffer[-1] = (indent, ordered, f"{text} {line.strip()}")
+                elif kind == 'list':
+                    buffer.append(parse_list_item(list_match))
+                elif kind == 'quote':
+                    buffer.append(line.lstrip()[1:].strip())
+                else:
+                    buffer.append(line)
+                continue
+            block = flush()
+            if block is not None:
+                yield block
+            kind, buffer = None, []
+
+        if not line.strip():
+            continue
+        if fence_match:
+            fence = fence_match.group(1)
+            kind, buffer = 'code', []
+        elif heading_match:
+            yield ('heading', (len(heading_match.group(1)), heading_match.group(2)))
+        elif RULE_RE.match(line):
+            yield ('rule', None)
+        elif list_match:
+            kind, buffer = 'list', [parse_list_item(list_match)]
+        elif is_table_row:
+            kind, buffer = 'table', [line]
+        elif is_quote:
+            kind, buffer = 'quote', [line.lstrip()[1:].strip()]
+        else:
+            kind, buffer = 'paragraph', [line]
+
+    # Unterminated fences still render whatever they contained
+    if fence is not None:
+        yield ('code', '\n'.join(buffer))
+    else:
+        block = flush()
+        if block is not None:
+            yield block
+
+def parse_list_item(match):
+    """Return (nesting level, ordered marker or None, text) for a list line"""
+    indent = len(match.group(1).expandtabs(4)) // 2
+    marker = match.group(2)
+    ordered = marker if marker[0].isdigit() else None
+    return (indent, ordered, match.group(3))
+
+def split_table_row(row):
+    """Split a Markdown table row into cell strings"""
+    row = row.strip()
+    if row.startswith('|'):
+        row = row[1:]
+    if row.endswith('|') and not row.endswith('\\|'):
+        row = row[:-1]
+    cells = re.split(r'(?<!\\)\|', row)
+    return [cell.strip().replace('\\|', '|') for cell in cells]
+
+def format_inline(text):
+    """Convert inline Markdown (bold, italic, code, links) to ReportLab markup"""
+    code_spans = []
+
+    def stash_code(match):
+        code_spans.append(escape(match.group(1)))
+        return f"\x00{len(code_spans) - 1}\x00"
+
+    # Code spans are protected from the other inline rules
+    text = re.sub(r'`([^`]+)`', stash_code, text)
+    text = escape(text)
+    text = re.sub(r'!\[([^\]]*)\]\([^)]*\)', r'\1', text)
+    text = re.sub(
+        r'\[([^\]]+)\]\((https?://[^)\s]+)\)',
+        rf'<link href="\2" color="{PRIMARY_COLOR.hexval()}"><u>\1</u></link>',
+        text
+    )
+    text = re.sub(r'\[([^\]]+)\]\([^)]*\)', rf'<font color="{PRIMARY_COLOR.hexval()}">\1</font>', text)
+    text = re.sub(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1', r'<b>\2</b>', text)
+    text = re.sub(r'(?<![\w*])\*(?=\S)(.+?)(?<=\S)\*(?!\*)', r'<i>\1</i>', text)
+    text = re.sub(r'~~(?=\S)(.+?)(?<=\S)~~', r'<strike>\1</strike>', text)
+    return re.sub(
+        r'\x00(\d+)\x00',
+        lambda m: f'<font name="Courier" color="#1e40af">{code_spans[int(m.group(1))]}</font>',
+        text
+    )
+
+def safe_paragraph(markup, style, plain_text):
+    """Build a Paragraph, falling back to escaped text if the markup is unbalanced"""
+    try:
+        return Paragraph(markup, style)
+    except ValueError:
+        return Paragraph(escape(plain_text), style)
+
+def markdown_table(rows, doc_styles, available_width):
+    """Lay out parsed table rows using the same look as the hand-built tables"""
+    column_count = max(len(row) for row in rows)
+    header_style = ParagraphStyle('MarkdownTableHeader', parent=doc_styles['body'],
+                                  fontName='Helvetica-Bold', textColor=white,
+                                  fontSize=9, leading=11, alignment=TA_LEFT, spaceAfter=0)
+    cell_style = ParagraphStyle('MarkdownTableCell', parent=doc_styles['body'],
+                                fontSize=9, leading=11, alignment=TA_LEFT, spaceAfter=0)
+    data = []
+    for index, row in enumerate(rows):
+        row = row + [''] * (column_count - len(row))
+        style = header_style if index == 0 else cell_style
+        data.append([safe_paragraph(format_inline(cell), style, cell) for cell in row])
+
+    table = Table(data, colWidths=[available_width / column_count] * column_count, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), PRIMARY_COLOR),
+        ('GRID', (0, 0), (-1, -1), 1, HexColor("#cbd5e1")),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, LIGHT_BG]),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+    return table
+
+def markdown_flowables(blocks, doc_styles, available_width=7*inch):
+    """Map parsed Markdown blocks onto the documentation styles, one flowable at a time"""
+    list_styles = {}
+    code_style = doc_styles['code']
+    code_columns = int(
+        (available_width - code_style.leftIndent - code_style.rightIndent - 2*code_style.borderPadding)
+        / (code_style.fontSize * 0.6)
+    )
+    quote_style = ParagraphStyle('MarkdownQuote', parent=doc_styles['body'],
+                                 leftIndent=20, textColor=HexColor("#64748b"))
+
+    for kind, payload in blocks:
+        if kind == 'heading':
+            level, text = payload
+            if level == 1:
+                style = doc_styles['title']
+            elif level == 2:
+                style = doc_styles['heading1']
+            else:
+                style = doc_styles['heading2']
+            yield safe_paragraph(format_inline(text), style, text)
+        elif kind == 'paragraph':
+            # Two trailing spaces are a Markdown hard line break
+            lines, current = [], []
+            for line in payload:
+                current.append(line.strip())
+                if line.endswith('  '):
+                    lines.append(' '.join(current))
+                    current = []
+            if current:
+                lines.append(' '.join(current))
+            text = '<br/>'.join(format_inline(line) for line in lines)
+            yield safe_paragraph(text, doc_styles['body'], ' '.join(lines))
+        elif kind == 'list':
+            for indent, ordered, text in payload:
+                if indent not in list_styles:
+                    list_styles[indent] = ParagraphStyle(
+                        f'MarkdownList{indent}', parent=doc_styles['body'],
+                        alignment=TA_LEFT, spaceAfter=3, leftIndent=12 + 14*indent
+                    )
+                bullet = ordered or '•'
+                yield safe_paragraph(f"{bullet} {format_inline(text)}", list_styles[indent], text)
+        elif kind == 'table':
+            if payload:
+                yield markdown_table(payload, doc_styles, available_width)
+                yield Spacer(1, 0.15*inch)
+        elif kind == 'code':
+            yield Preformatted(payload, code_style, maxLineLength=code_columns, newLineChars='  ')
+        elif kind == 'quote':
+            text = ' '.join(payload)
+            yield safe_paragraph(f"<i>{format_inline(text)}</i>", quote_style, text)
+        elif kind == 'rule':
+            yield Spacer(1, 0.15*inch)
+
+def render_markdown(md_path, pdf_path=None):
+    """Render a Markdown file to PDF using the documentation styles"""
+    if pdf_path is None:
+        pdf_path = os.path.splitext(md_path)[0] + '.pdf'
+
+    title = os.path.splitext(os.path.basename(md_path))[0].replace('_', ' ').title()
+    doc = make_doc_template(pdf_path, f"PDF Merger Pro - {title}")
+    doc_styles = build_styles()
+
+    # The parser streams the file; ReportLab needs the full story to paginate
+    with open(md_path, encoding='utf-8') as source:
+        story = list(markdown_flowables(iter_markdown_blocks(source), doc_styles, doc.width))
+    doc.build(story)
+
+    return pdf_path
+
+# Incremental build cache
+
+_generator_fingerprint = None
+
+def generator_fingerprint():
+    """Hash the generator version, this script and the style definitions"""
+    global _generator_fingerprint
+    if _generator_fingerprint is None:
+        digest = hashlib.sha256(GENERATOR_VERSION.encode('utf-8'))
+        with open(os.path.abspath(__file__), 'rb') as script:
+            digest.update(script.read())
+        for name, style in sorted(build_styles().items()):
+            attrs = sorted((k, repr(v)) for k, v in vars(style).items() if k != 'parent')
+            digest.update(repr((name, style.parent.name if style.parent else None, attrs)).encode('utf-8'))
+        _generator_fingerprint = digest.hexdigest()
+    return _generator_fingerprint
+
+def cache_key(md_path):
+    """Content hash identifying the PDF a Markdown source renders to"""
+    digest = hashlib.sha256(generator_fingerprint().encode('utf-8'))
+    # The file name feeds the document title
+    digest.update(os.path.basename(md_path).encode('utf-8'))
+    with open(md_path, 'rb') as source:
+        for chunk in iter(lambda: source.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def render_markdown_cached(md_path, pdf_path, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Render md_path unless an identical render is already cached.
+
+    Returns (pdf_path, cached). Cache hits are copied out and touched so
+    evict_cache() treats them as recently used.
+    """
+    key = cache_key(md_path)
+    cached_pdf = os.path.join(cache_dir, key + '.pdf')
+
+    if os.path.isfile(cached_pdf):
+        shutil.copyfile(cached_pdf, pdf_path)
+        os.utime(cached_pdf)
+        return pdf_path, True
+
+    render_markdown(md_path, pdf_path)
+
+    # Write through a temp file so concurrent workers never see a partial entry
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    os.close(fd)
     try:
-        pdf_file = create_pdf()
+        shutil.copyfile(pdf_path, tmp_path)
+        os.replace(tmp_path, cached_pdf)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return pdf_path, False
+
+def evict_cache(cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_SIZE_MB * 1024 * 1024):
+    """Delete least recently used cache entries until the cache fits in max_bytes"""
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.is_file() and entry.name.endswith('.pdf'):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    evicted = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        evicted += 1
+    return evicted
+
+# Multi-document builds
+
+INDEX_LINK_RE = re.compile(r'\]\(([^)#\s]+\.md)(?:#[^)]*)?\)')
+
+def collect_sources(patterns=(), index_file=None):
+    """Expand glob patterns and index links into an ordered, de-duplicated list of Markdown files"""
+    sources = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        sources.extend(matches if matches else [pattern])
+
+    if index_file is not None:
+        index_dir = os.path.dirname(os.path.abspath(index_file))
+        sources.append(index_file)
+        with open(index_file, encoding='utf-8') as index:
+            for line in index:
+                for link in INDEX_LINK_RE.findall(line):
+                    if '://' in link:
+                        continue
+                    path = os.path.normpath(os.path.join(index_dir, link))
+                    if os.path.isfile(path):
+                        sources.append(path)
+
+    seen = set()
+    unique = []
+    for source in sources:
+        key = os.path.abspath(source)
+        if key not in seen:
+            seen.add(key)
+            unique.append(source)
+    return unique
+
+def output_path_for(md_path, out_dir=None):
+    """Map a Markdown source to its PDF path, next to the source or inside out_dir"""
+    if out_dir is None:
+        return os.path.splitext(md_path)[0] + '.pdf'
+
+    # Keep sources from different folders (e.g. two README.md) apart
+    relative = os.path.relpath(os.path.abspath(md_path))
+    if relative.startswith('..'):
+        relative = os.path.basename(md_path)
+    name = os.path.splitext(relative)[0].replace(os.sep, '__')
+    return os.path.join(out_dir, name + '.pdf')
+
+def render_job(source, pdf_path, cache_dir=None):
+    """Render one document, through the cache when one is configured"""
+    if cache_dir is None:
+        return render_markdown(source, pdf_path), False
+    return render_markdown_cached(source, pdf_path, cache_dir)
+
+def build_documents(sources, out_dir=None, workers=None, cache_dir=None):
+    """
+    Render every source to its own PDF, spreading layout across worker processes.
+
+    Yields (source, pdf_path, cached, error) as each document finishes, in
+    completion order.
+    """
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+    jobs = [(source, output_path_for(source, out_dir)) for source in sources]
+
+    # A pool is pure overhead for a single document or worker
+    if workers == 1 or len(jobs) <= 1:
+        for source, pdf_path in jobs:
+            try:
+                yield (source, *render_job(source, pdf_path, cache_dir), None)
+            except Exception as e:
+                yield source, None, False, e
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(render_job, source, pdf_path, cache_dir): source
+            for source, pdf_path in jobs
+        }
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                yield (source, *future.result(), None)
+            except Exception as e:
+                yield source, None, False, e
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+def parse_args(argv=None):
+    """Parse command line options for the documentation generator"""
+    parser = argparse.ArgumentParser(
+        description="Generate PDF Merger Pro documentation PDFs. "
+                    "Without arguments the built-in overview document is generated."
+    )
+    parser.add_argument('sources', nargs='*',
+                        help="Markdown files or glob patterns (e.g. '*.md')")
+    parser.add_argument('-i', '--index',
+                        help="Markdown index whose linked documents are rendered (e.g. DOCUMENTATION_INDEX.md)")
+    parser.add_argument('-o', '--out-dir',
+                        help="Directory for generated PDFs (default: next to each source)")
+    parser.add_argument('-j', '--workers', type=positive_int, default=os.cpu_count() or 1,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="Directory for the incremental build cache (default: .doc_cache)")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE_MB,
+                        help=f"Cache size limit in MB (default: {DEFAULT_CACHE_SIZE_MB})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Re-render every document and leave the cache untouched")
+    parser.add_argument('--benchmarks', default=DEFAULT_BENCHMARK_RESULTS,
+                        help="Benchmark report for the performance tables "
+                             "(default: functions/benchmarks/baseline.json)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Command line entry point, returns the process exit code"""
+    args = parse_args(argv)
+
+    if not args.sources and not args.index:
+        pdf_file = create_pdf(benchmark_path=args.benchmarks)
         print(f"✅ PDF generated successfully!")
         print(f"📄 Location: {pdf_file}")
         print(f"✨ Professional documentation ready for sharing")
+        return 0
+
+    sources = collect_sources(args.sources, args.index)
+    if not sources:
+        print("❌ No Markdown sources found")
+        return 1
+
+    cache_dir = None if args.no_cache else args.cache_dir
+    started = datetime.now()
+    failures = 0
+    cache_hits = 0
+    for source, pdf_file, cached, error in build_documents(sources, args.out_dir, args.workers, cache_dir):
+        if error is None:
+            cache_hits += cached
+            print(f"📄 {source} → {pdf_file}{' (cached)' if cached else ''}")
+        else:
+            failures += 1
+            print(f"❌ {source}: {error}")
+
+    if cache_dir is not None:
+        evict_cache(cache_dir, args.cache_size * 1024 * 1024)
+
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"✅ Rendered {len(sources) - failures}/{len(sources)} documents "
+          f"({cache_hits} from cache) in {elapsed:.1f}s")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
     except Exception as e:
         print(f"❌ Error generating PDF: {e}")
         import traceback
         traceback.print_exc()
+        sys.exit(1)
@@ -3,14 +3,42 @@
  * Converts Office documents (Word, Excel, PowerPoint) to PDF
  */
 
-const {onCall} = require("firebase-functions/v2/https");
+const {onCall, HttpsError} = require("firebase-functions/v2/https");
 const {setGlobalOptions} = require("firebase-functions/v2");
 const logger = require("firebase-functions/logger");
 const libre = require("libreoffice-convert");
 const {promisify} = require("util");
+const {execFile} = require("child_process");
+const {createReadStream, createWriteStream} = require("fs");
+const fs = require("fs/promises");
+const os = require("os");
+const path = require("path");
+const {pipeline} = require("stream/promises");
+const {pathToFileURL} = require("url");
+const {randomUUID} = require("crypto");
+const {initializeApp} = require("firebase-admin/app");
+const {getStorage} = require("firebase-admin/storage");
+const {
+  startSpan,
+  withSpan,
+  parseTraceparent,
+  flushTrace,
+} = require("./tracing");
+
+initializeApp();
 
 // Convert libre callback to promise
 const convertAsync = promisify(libre.convert);
+const execFileAsync = promisify(execFile);
+
+const SOFFICE_BIN = process.env.LIBREOFFICE_BIN || "soffice";
+const VALID_EXTENSIONS = ["doc", "docx", "xls", "xlsx", "ppt", "pptx"];
+
+// Largest source convertStoredDocument accepts; matches the uploads/temp
+// limit in storage.rules and the client check in convertOfficeDocument.
+// /tmp is memory-backed, so the source, the PDF and LibreOffice itself all
+// count against the function's 2GiB.
+const MAX_SOURCE_BYTES = 100 * 1024 * 1024;
 
 // Set global options for cost control
 setGlobalOptions({
@@ -22,6 +50,10 @@ setGlobalOptions({
  * Convert Office document to PDF
  * Accepts: Word (.docx, .doc), Excel (.xlsx, .xls), PowerPoint (.pptx, .ppt)
  * Returns: PDF as base64 string
+ *
+ * Deprecated for anything but small files: the base64 payloads are ~33%
+ * larger than the file and several copies are held in memory. Prefer
+ * convertStoredDocument.
  */
 exports.convertDocument = onCall({
   timeoutSeconds: 300, // 5 minutes for large files
@@ -98,6 +130,135 @@ exports.convertDocument = onCall({
   }
 });
 
+/**
+ * Convert an Office document already uploaded to Cloud Storage
+ * The client uploads to uploads/temp/{uid}/..., the source is streamed to
+ * a temp file, LibreOffice converts it on disk, and the PDF is streamed
+ * back to conversions/{uid}/{conversionId}/. Only the storage path is
+ * returned, so no file bytes pass through the callable payload or the
+ * function's heap. Each step is traced under the request's traceparent and
+ * the spans are returned with the result. Sources over MAX_SOURCE_BYTES are
+ * rejected before download.
+ */
+exports.convertStoredDocument = onCall({
+  timeoutSeconds: 300,
+  memory: "2GiB",
+  cors: true,
+}, async (request) => {
+  if (!request.auth) {
+    throw new HttpsError("unauthenticated", "User not authenticated");
+  }
+
+  const uid = request.auth.uid;
+  const {storagePath, fileName} = request.data || {};
+  if (!storagePath || !fileName) {
+    throw new HttpsError("invalid-argument", "Missing storagePath or fileName");
+  }
+  if (!storagePath.startsWith(`uploads/temp/${uid}/`)) {
+    throw new HttpsError("permission-denied", "Source is not your upload");
+  }
+
+  const ext = path.extname(fileName).slice(1).toLowerCase();
+  if (!VALID_EXTENSIONS.includes(ext)) {
+    throw new HttpsError("invalid-argument", `Unsupported file type: .${ext}`);
+  }
+
+  const span = startSpan("convertStoredDocument",
+      parseTraceparent(request.data.traceparent), {fileName});
+  const trace = span.context;
+  const conversionId = randomUUID();
+  const workDir = await fs.mkdtemp(path.join(os.tmpdir(), "convert-"));
+  const inputPath = path.join(workDir, `source.${ext}`);
+  const pdfPath = path.join(workDir, "source.pdf");
+  const bucket = getStorage().bucket();
+
+  try {
+    const [{size: sourceSize}] = await bucket.file(storagePath).getMetadata();
+    if (Number(sourceSize) > MAX_SOURCE_BYTES) {
+      throw new HttpsError("invalid-argument",
+          `File is larger than ${MAX_SOURCE_BYTES / (1024 * 1024)}MB`);
+    }
+
+    const inputSize = await withSpan("storage.download", trace, async (s) => {
+      await pipeline(
+          bucket.file(storagePath).createReadStream(),
+          createWriteStream(inputPath),
+      );
+      const {size} = await fs.stat(inputPath);
+      s.setAttributes({bytes: size});
+      return size;
+    });
+    logger.info("Source downloaded", {storagePath, bytes: inputSize});
+
+    await withSpan("libreoffice.convert", trace,
+        () => convertOnDisk(inputPath, workDir), {fileType: ext});
+    const {size: outputSize} = await fs.stat(pdfPath);
+
+    const outputName = fileName.replace(/\.[^.]+$/, ".pdf");
+    const outputPath = `conversions/${uid}/${conversionId}/${outputName}`;
+    await withSpan("storage.upload", trace, () => pipeline(
+        createReadStream(pdfPath),
+        bucket.file(outputPath).createWriteStream({
+          contentType: "application/pdf",
+          resumable: false,
+        }),
+    ), {bytes: outputSize});
+
+    logger.info("Conversion successful", {
+      inputSize,
+      outputSize,
+      traceId: span.traceId,
+    });
+
+    // The staged source is no longer needed
+    await withSpan("storage.delete", trace,
+        () => bucket.file(storagePath).delete()).catch((error) => {
+      logger.warn("Failed to delete staged upload", {error: error.message});
+    });
+
+    span.end();
+    return {
+      success: true,
+      storagePath: outputPath,
+      fileName: outputName,
+      inputSize,
+      outputSize,
+      spans: await flushTrace(span.traceId),
+    };
+  } catch (error) {
+    logger.error("Conversion failed", {
+      error: error.message,
+      stack: error.stack,
+      traceId: span.traceId,
+    });
+    span.end(error);
+    await flushTrace(span.traceId);
+
+    if (error instanceof HttpsError) throw error;
+    throw new HttpsError("internal", `Conversion failed: ${error.message}`);
+  } finally {
+    await fs.rm(workDir, {recursive: true, force: true});
+  }
+});
+
+/**
+ * Convert a file on disk to PDF next to it with headless LibreOffice.
+ * Each call gets its own profile so concurrent requests never share one.
+ * @param {string} inputPath File to convert
+ * @param {string} outDir Directory the PDF is written to
+ * @return {Promise<void>}
+ */
+async function convertOnDisk(inputPath, outDir) {
+  const profileDir = path.join(outDir, "profile");
+  await execFileAsync(SOFFICE_BIN, [
+    `-env:UserInstallation=${pathToFileURL(profileDir).href}`,
+    "--headless",
+    "--convert-to", "pdf",
+    "--outdir", outDir,
+    inputPath,
+  ], {timeout: 240000});
+}
+
 /**
  * Health check endpoint
  */
@@ -0,0 +1,202 @@
+/**
+ * Tracing for the converter functions
+ * Plain-JS copy of functions/src/shared/tracing.ts, as this codebase is
+ * deployed on its own without a build step; functions/test/tracing.test.ts
+ * checks that both read and write traceparent the same way. A
+ * handler continues the caller's trace from the `traceparent` field of the
+ * request, then calls flushTrace(), which returns the trace's spans and
+ * appends them as one OTLP/JSON line to TRACE_FILE when it is set.
+ */
+
+const {appendFile} = require("fs/promises");
+const {randomBytes} = require("crypto");
+const {performance} = require("perf_hooks");
+
+const SERVICE_NAME = "pdf-converter";
+const MAX_RECORDED_SPANS = 5000;
+const TRACEPARENT = /^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$/;
+
+let recorded = [];
+
+const now = () => performance.timeOrigin + performance.now();
+
+/**
+ * A timed operation; recorded when ended.
+ */
+class Span {
+  /**
+   * @param {string} name Span name
+   * @param {?{traceId: string, spanId: string}} parent Parent context
+   * @param {Object<string, (string|number|boolean)>} attributes Attributes
+   */
+  constructor(name, parent, attributes = {}) {
+    this.context = {
+      traceId: parent ? parent.traceId : randomBytes(16).toString("hex"),
+      spanId: randomBytes(8).toString("hex"),
+    };
+    this.traceId = this.context.traceId;
+    this.ended = false;
+    this.record = {
+      ...this.context,
+      parentSpanId: parent ? parent.spanId : undefined,
+      name,
+      service: SERVICE_NAME,
+      startTime: now(),
+      endTime: 0,
+      attributes: {...attributes},
+      status: "ok",
+    };
+  }
+
+  /**
+   * @param {Object<string, (string|number|boolean)>} attributes Attributes
+   * @return {Span} This span
+   */
+  setAttributes(attributes) {
+    Object.assign(this.record.attributes, attributes);
+    return this;
+  }
+
+  /**
+   * Finish the span; only the first call counts.
+   * @param {*=} error Marks the span failed when given
+   */
+  end(error) {
+    if (this.ended) return;
+    this.ended = true;
+    this.record.endTime = now();
+    if (error !== undefined) {
+      this.record.status = "error";
+      this.record.error =
+        error instanceof Error ? error.message : String(error);
+    }
+    recorded.push(this.record);
+    if (recorded.length > MAX_RECORDED_SPANS) {
+      recorded = recorded.slice(recorded.length - MAX_RECORDED_SPANS);
+    }
+  }
+}
+
+/**
+ * Start a span; without a parent it begins a new trace.
+ * @param {string} name Span name
+ * @param {?{traceId: string, spanId: string}=} parent Parent context
+ * @param {Object<string, (string|number|boolean)>=} attributes Attributes
+ * @return {Span} The started span
+ */
+function startSpan(name, parent, attributes) {
+  return new Span(name, parent, attributes);
+}
+
+/**
+ * Run fn inside a span that ends when it settles.
+ * @param {string} name Span name
+ * @param {?{traceId: string, spanId: string}} parent Parent context
+ * @param {function(Span): Promise<*>} fn Work to time
+ * @param {Object<string, (string|number|boolean)>=} attributes Attributes
+ * @return {Promise<*>} Whatever fn resolves to
+ */
+async function withSpan(name, parent, fn, attributes) {
+  const span = startSpan(name, parent, attributes);
+  try {
+    const result = await fn(span);
+    span.end();
+    return result;
+  } catch (error) {
+    span.end(error);
+    throw error;
+  }
+}
+
+/**
+ * Read a W3C traceparent string; anything malformed is ignored.
+ * @param {*} value Candidate traceparent
+ * @return {?{traceId: string, spanId: string}} Parent context
+ */
+function parseTraceparent(value) {
+  const match = typeof value === "string" ? TRACEPARENT.exec(value) : null;
+  return match ? {traceId: match[1], spanId: match[2]} : null;
+}
+
+/**
+ * Remove one trace's spans, write them to the file sink and return them.
+ * @param {string} traceId Trace to flush
+ * @return {Promise<Array<Object>>} The trace's spans
+ */
+async function flushTrace(traceId) {
+  const spans = recorded.filter((span) => span.traceId === traceId);
+  recorded = recorded.filter((span) => span.traceId !== traceId);
+
+  const sink = process.env.TRACE_FILE;
+  if (sink && spans.length > 0) {
+    await appendFile(sink, `${JSON.stringify(toOTLP(spans))}\n`)
+        .catch((error) => {
+          console.warn(`Failed to write spans to ${sink}:`, error);
+        });
+  }
+
+  return spans;
+}
+
+/**
+ * OTLP encodes nanoseconds as decimal strings; split to keep precision.
+ * @param {number} ms Epoch milliseconds
+ * @return {string} Epoch nanoseconds
+ */
+function toUnixNano(ms) {
+  const whole = BigInt(Math.floor(ms)) * 1000000n;
+  return (whole + BigInt(Math.round((ms % 1) * 1e6))).toString();
+}
+
+/**
+ * @param {Object<string, (string|number|boolean)>} attributes Attributes
+ * @return {Array<Object>} OTLP key/value list
+ */
+function toOTLPAttributes(attributes) {
+  return Object.entries(attributes).map(([key, value]) => {
+    if (typeof value === "boolean") return {key, value: {boolValue: value}};
+    if (typeof value === "number") {
+      return Number.isInteger(value) ?
+        {key, value: {intValue: String(value)}} :
+        {key, value: {doubleValue: value}};
+    }
+    return {key, value: {stringValue: value}};
+  });
+}
+
+/**
+ * Convert spans to an OTLP/JSON ExportTraceServiceRequest.
+ * @param {Array<Object>} spans Recorded spans
+ * @return {Object} OTLP request body
+ */
+function toOTLP(spans) {
+  return {
+    resourceSpans: [{
+      resource: {attributes: toOTLPAttributes({"service.name": SERVICE_NAME})},
+      scopeSpans: [{
+        scope: {name: "pdf-merger"},
+        spans: spans.map((span) => ({
+          traceId: span.traceId,
+          spanId: span.spanId,
+          ...(span.parentSpanId ? {parentSpanId: span.parentSpanId} : {}),
+          name: span.name,
+          kind: 1, // SPAN_KIND_INTERNAL
+          startTimeUnixNano: toUnixNano(span.startTime),
+          endTimeUnixNano: toUnixNano(span.endTime),
+          attributes: toOTLPAttributes(span.attributes),
+          status: span.status === "error" ?
+            {code: 2, message: span.error || ""} :
+            {code: 1},
+        })),
+      }],
+    }],
+  };
+}
+
+module.exports = {
+  startSpan,
+  withSpan,
+  parseTraceparent,
+  flushTrace,
+  toOTLP,
+};
@@ -0,0 +1,34 @@
+"""Tests for the documentation generator's command line and Markdown parser"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_documentation_pdf as docgen  # noqa: E402
+
+
+@pytest.mark.parametrize('value', ['0', '-2', 'two'])
+def test_workers_must_be_a_positive_int(value, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        docgen.parse_args(['--workers', value, 'README.md'])
+    assert exit_info.value.code == 2
+    assert '--workers' in capsys.readouterr().err
+
+
+def test_workers_accepts_positive_values():
+    assert docgen.parse_args(['-j', '3', 'README.md']).workers == 3
+    assert docgen.parse_args(['README.md']).workers >= 1
+
+
+@pytest.mark.parametrize('line, expected', [
+    ('# C#', (1, 'C#')),
+    ('## Title ##', (2, 'Title')),
+    ('### F# and C# ###   ', (3, 'F# and C#')),
+    ('#### Issue #42', (4, 'Issue #42')),
+    ('# Title#', (1, 'Title#')),
+])
+def test_heading_keeps_hashes_that_belong_to_the_text(line, expected):
+    assert list(docgen.iter_markdown_blocks([line])) == [('heading', expected)]
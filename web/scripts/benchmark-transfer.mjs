@@ -0,0 +1,97 @@
+/**
+ * Worker boundary benchmark
+ * Measures what it costs to hand merge inputs to a worker and get the result
+ * back, with and without a transfer list:
+ *
+ *   clone     - ArrayBuffers posted without a transfer list (the old protocol)
+ *   transfer  - ArrayBuffers moved with a transfer list
+ *
+ * The worker echoes an output the size of its inputs, so each run covers the
+ * round trip of a merge. Uses worker_threads, which share the browser's
+ * structured clone / transfer semantics. Blob handles are not measured here:
+ * Node keeps Blob bytes on the heap, unlike browser File/Blob storage, so the
+ * numbers would not say anything about the browser.
+ *
+ * Usage: node scripts/benchmark-transfer.mjs [totalMB=200] [files=4]
+ */
+
+import { Worker } from 'node:worker_threads';
+import { performance } from 'node:perf_hooks';
+
+const totalMB = Number(process.argv[2] || 200);
+const fileCount = Number(process.argv[3] || 4);
+const fileBytes = Math.floor((totalMB * 1024 * 1024) / fileCount);
+
+const workerSource = `
+const { parentPort } = require('node:worker_threads');
+parentPort.on('message', ({ mode, inputs }) => {
+  const total = inputs.reduce((sum, input) => sum + input.byteLength, 0);
+  const output = new ArrayBuffer(total);
+  parentPort.postMessage({ output }, mode === 'transfer' ? [output] : []);
+});
+`;
+
+const MB = 1024 * 1024;
+
+function makeInputs() {
+  return Array.from({ length: fileCount }, () => new ArrayBuffer(fileBytes));
+}
+
+async function run(mode) {
+  const worker = new Worker(workerSource, { eval: true });
+  // Let the worker start before timing
+  await new Promise((resolve) => worker.once('online', resolve));
+
+  let inputs = makeInputs();
+  global.gc?.();
+
+  const baseline = process.memoryUsage();
+  let peakRss = baseline.rss;
+  let peakBuffers = baseline.arrayBuffers;
+  const sampler = setInterval(() => {
+    const usage = process.memoryUsage();
+    peakRss = Math.max(peakRss, usage.rss);
+    peakBuffers = Math.max(peakBuffers, usage.arrayBuffers);
+  }, 5);
+
+  const start = performance.now();
+  const done = new Promise((resolve) => worker.once('message', resolve));
+  const transfer = mode === 'transfer' ? inputs : [];
+  worker.postMessage({ mode, inputs }, transfer);
+  const postedAt = performance.now();
+  inputs = null;
+
+  const { output } = await done;
+  const elapsed = performance.now() - start;
+
+  clearInterval(sampler);
+  const usage = process.memoryUsage();
+  peakRss = Math.max(peakRss, usage.rss);
+  peakBuffers = Math.max(peakBuffers, usage.arrayBuffers);
+  await worker.terminate();
+
+  return {
+    mode,
+    postMs: postedAt - start,
+    roundTripMs: elapsed,
+    peakRssMB: (peakRss - baseline.rss) / MB,
+    peakArrayBuffersMB: (peakBuffers - baseline.arrayBuffers) / MB,
+    outputMB: output.byteLength / MB,
+  };
+}
+
+const results = [];
+for (const mode of ['clone', 'transfer']) {
+  results.push(await run(mode));
+}
+
+console.log(`Merge inputs: ${fileCount} x ${(fileBytes / MB).toFixed(1)} MB`);
+console.table(
+  results.map((r) => ({
+    mode: r.mode,
+    'post (ms)': r.postMs.toFixed(1),
+    'round trip (ms)': r.roundTripMs.toFixed(1),
+    'peak RSS delta (MB)': r.peakRssMB.toFixed(0),
+    'peak ArrayBuffer delta (MB)': r.peakArrayBuffersMB.toFixed(0),
+  }))
+);
@@ -10,6 +10,7 @@ import React, { useCallback, useState, useRef } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { useFileStore } from '@/context/fileContext';
 import { convertToPDF, canConvertClientSide, needsConversion } from '@/utils/conversion';
+import { getPDFPageCount } from '@/utils/pdfOperations';
 import Toast from './Toast';
 import ConversionConsentModal from './ConversionConsentModal';
 import { FiUpload, FiFile, FiCheckCircle, FiAlertCircle, FiX } from 'react-icons/fi';
@@ -121,6 +122,7 @@ export const EnhancedUploadZone: React.FC<UploadZoneProps> = ({
           blob: file,
           size: file.size,
           type: mimeType,
+          pages: await getPDFPageCount(file).catch(() => 0),
           uploadedAt: new Date(),
           status: 'ready',
         };
@@ -156,6 +158,7 @@ export const EnhancedUploadZone: React.FC<UploadZoneProps> = ({
           blob: pdfBlob,
           size: pdfBlob.size,
           type: 'application/pdf',
+          pages: await getPDFPageCount(pdfBlob).catch(() => 0),
           uploadedAt: new Date(),
           status: 'ready',
         };
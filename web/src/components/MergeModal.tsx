@@ -1,11 +1,14 @@
-import React, { useState, useMemo } from 'react';
+import React, { useState, useMemo, useRef, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { useNavigate } from 'react-router-dom';
 import Modal from './Modal';
 import UploadZone from './UploadZone';
+import ProgressBar from './ProgressBar';
 import { useFileStore } from '@/context/fileContext';
 import { useEditorStore } from '@/context/editorContext';
-import { mergePDFs, downloadBlob, getPDFPageCount } from '@/utils/pdfOperations';
+import { mergePDFsStreaming, downloadBlob, getPDFPageCount, DedupStats } from '@/utils/pdfOperations';
+import { withSpan } from '@/utils/tracing';
+import { usePDFWorker } from '@/hooks/usePDFWorker';
 import toast from 'react-hot-toast';
 import { FaCheck, FaTrash, FaArrowUp, FaArrowDown, FaPlus } from 'react-icons/fa';
 
@@ -32,6 +35,29 @@ const MergeModal: React.FC<MergeModalProps> = ({
   const [mergedBlob, setMergedBlob] = useState<Blob | null>(null);
   const [showPreview, setShowPreview] = useState(false);
   const [showUpload, setShowUpload] = useState(files.length === 0);
+  const [mergeProgress, setMergeProgress] = useState<{ percent: number; bytesWritten?: number } | null>(
+    null
+  );
+  const bytesSavedRef = useRef(0);
+
+  // Stable callbacks, so the worker hook's task function is created once
+  const workerOptions = useMemo(
+    () => ({
+      onProgress: (percent: number, bytesWritten?: number) =>
+        // Only re-render when the whole-number percentage moves
+        setMergeProgress((prev) =>
+          prev && Math.floor(prev.percent) === Math.floor(percent) ? prev : { percent, bytesWritten }
+        ),
+      onDeduplicated: (stats: DedupStats) => {
+        bytesSavedRef.current = stats.bytesSaved;
+      },
+    }),
+    []
+  );
+  const pdfWorker = usePDFWorker(workerOptions);
+  const { cleanup: cancelWorkerTasks } = pdfWorker;
+
+  useEffect(() => cancelWorkerTasks, [cancelWorkerTasks]);
 
   // Available files to add
   const availableFiles = useMemo(() => {
@@ -41,7 +67,7 @@ const MergeModal: React.FC<MergeModalProps> = ({
   const handleFileUpload = async (uploadedFiles: File[]) => {
     // Process uploaded files and add to store
     for (const file of uploadedFiles) {
-      const blob = new Blob([await file.arrayBuffer()], { type: 'application/pdf' });
+      const blob = file.slice(0, file.size, 'application/pdf'); // Shares the file's storage, no copy
       const pageCount = await getPDFPageCount(blob);
       
       const newFile = {
@@ -109,16 +135,35 @@ const MergeModal: React.FC<MergeModalProps> = ({
         })
       );
 
-      const merged = await mergePDFs(fileBlobs);
+      bytesSavedRef.current = 0;
+      setMergeProgress({ percent: 0 });
+
+      // The worker reads inputs one at a time and reports bytes written; the
+      // main-thread fallback skips deduplication to keep the page responsive
+      const merged = await withSpan(
+        'merge',
+        null,
+        (span) =>
+          pdfWorker.isWorkerSupported
+            ? pdfWorker.mergePDFsStreaming(fileBlobs, true, { trace: span.context })
+            : mergePDFsStreaming(fileBlobs, workerOptions.onProgress, { trace: span.context }),
+        { files: fileBlobs.length }
+      );
+      const bytesSaved = bytesSavedRef.current;
       setMergedBlob(merged);
       setShowPreview(true);
       
-      toast.success(`✓ Files merged! Preview or download below.`);
+      toast.success(
+        bytesSaved > 0
+          ? `✓ Files merged (${(bytesSaved / 1024).toFixed(0)} KB of duplicate resources removed)! Preview or download below.`
+          : `✓ Files merged! Preview or download below.`
+      );
     } catch (error) {
       console.error('Merge error:', error);
       toast.error(`Failed to merge PDFs: ${error instanceof Error ? error.message : 'Unknown error'}`);
     } finally {
       setIsLoading(false);
+      setMergeProgress(null);
     }
   };
 
@@ -354,6 +399,18 @@ const MergeModal: React.FC<MergeModalProps> = ({
               />
             </div>
 
+            {/* Merge progress */}
+            {mergeProgress && (
+              <ProgressBar
+                progress={mergeProgress.percent}
+                label={
+                  mergeProgress.bytesWritten !== undefined
+                    ? `Writing merged PDF (${(mergeProgress.bytesWritten / (1024 * 1024)).toFixed(1)} MB)`
+                    : 'Copying pages'
+                }
+              />
+            )}
+
             {/* Files to merge section */}
             <div className="space-y-3">
               <h3 className="font-semibold text-gray-900">
@@ -35,7 +35,7 @@ const SplitExtractModal: React.FC<SplitExtractModalProps> = ({
     if (uploadedFiles.length === 0) return;
     
     const file = uploadedFiles[0]; // Only take first file
-    const blob = new Blob([await file.arrayBuffer()], { type: 'application/pdf' });
+    const blob = file.slice(0, file.size, 'application/pdf'); // Shares the file's storage, no copy
     const count = await getPDFPageCount(blob);
     
     setUploadedBlob(blob);
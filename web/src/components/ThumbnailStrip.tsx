@@ -1,11 +1,16 @@
-import React, { useEffect, useRef, useState } from 'react';
+import React, { useEffect, useRef } from 'react';
 import { motion } from 'framer-motion';
-import { pdfjsLib } from '@/utils/pdfWorkerConfig';
 import { useEditorStore } from '../context/editorContext';
 import { FaCheck, FaChevronLeft, FaChevronRight } from 'react-icons/fa';
 import { DragDropContext, Droppable, Draggable, DropResult } from '@hello-pangea/dnd';
-import { reorderPages as reorderPDF } from '../utils/pdfOperations';
 import toast from 'react-hot-toast';
+import { useThumbnailWorker } from '@/hooks/useThumbnailWorker';
+
+// Rendered at the size of a thumbnail card
+const THUMBNAIL_OPTIONS = { width: 100, height: 140 };
+
+// Pages rendered as soon as a file opens; the rest load as they scroll into view
+const IMMEDIATE_PAGES = 3;
 
 interface ThumbnailStripProps {
   pdfBlob: Blob;
@@ -18,9 +23,10 @@ const ThumbnailStrip: React.FC<ThumbnailStripProps> = ({
   onPageSelect,
   className = '',
 }) => {
-  const [pdf, setPdf] = useState<any>(null);
-  const [thumbnails, setThumbnails] = useState<(string | null)[]>([]);
-  const [loading, setLoading] = useState(true);
+  // Rendering, caching and the open document all live in the thumbnail worker
+  const { thumbnails, generateThumbnail, generateBatch, closeDocument, reset } =
+    useThumbnailWorker(THUMBNAIL_OPTIONS);
+  const requestedRef = useRef<Set<number>>(new Set());
   const scrollContainerRef = useRef<HTMLDivElement | null>(null);
   
   const pages = useEditorStore((s) => s.pages || []);
@@ -28,101 +34,51 @@ const ThumbnailStrip: React.FC<ThumbnailStripProps> = ({
   const selectPage = useEditorStore((s) => s.selectPage);
   const deselectPage = useEditorStore((s) => s.deselectPage);
   const currentFile = useEditorStore((s) => s.currentFile);
-  const setCurrentFile = useEditorStore((s) => s.setCurrentFile);
   const reorderPagesStore = useEditorStore((s) => s.reorderPages);
+  const pageCount = pages.length;
 
-  // Load PDF and generate initial thumbnails
+  // Render the first pages in one batch; the worker answers cached pages at once
   useEffect(() => {
-    if (!pdfBlob) {
-      setLoading(false);
-      return;
-    }
-
-    const loadPDF = async () => {
-      try {
-        const arrayBuffer = await pdfBlob.arrayBuffer();
-        const pdfDoc = await pdfjsLib.getDocument({ data: arrayBuffer }).promise;
-        setPdf(pdfDoc);
-        setThumbnails(Array(pdfDoc.numPages).fill(null));
-      } catch (error) {
-        console.error('Error loading PDF for thumbnails:', error);
-        toast.error('Failed to load PDF thumbnails');
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    loadPDF();
-  }, [pdfBlob]);
-
-  // Generate thumbnails with intersection observer (lazy loading)
-  useEffect(() => {
-    if (!pdf) return;
-
-    const renderThumbnail = async (pageIndex: number) => {
-      try {
-        const page = await pdf.getPage(pageIndex + 1);
-        const viewport = page.getViewport({ scale: 0.15 }); // Even smaller for faster loading
-
-        const canvas = document.createElement('canvas');
-        const context = canvas.getContext('2d')!;
+    if (!pdfBlob) return;
 
-        canvas.width = viewport.width;
-        canvas.height = viewport.height;
+    const requested = requestedRef.current;
+    for (let page = 1; page <= IMMEDIATE_PAGES; page++) requested.add(page);
+    generateBatch(pdfBlob, 1, IMMEDIATE_PAGES, { priority: 'visible' });
 
-        await page.render({
-          canvasContext: context,
-          viewport: viewport,
-        }).promise;
-
-        const dataUrl = canvas.toDataURL('image/jpeg', 0.6); // More compression
-        setThumbnails(prev => {
-          const updated = [...prev];
-          updated[pageIndex] = dataUrl;
-          return updated;
-        });
-      } catch (error) {
-        console.error(`Error rendering thumbnail for page ${pageIndex + 1}:`, error);
-      }
+    return () => {
+      reset();
+      requested.clear();
+      // Frees the worker's parsed copy; the IndexedDB cache is kept
+      closeDocument(pdfBlob);
     };
+  }, [pdfBlob, generateBatch, closeDocument, reset]);
 
-    // Render first 3 thumbnails immediately (reduced from 5)
-    const immediatePages = Math.min(3, pdf.numPages);
-    for (let i = 0; i < immediatePages; i++) {
-      renderThumbnail(i);
-    }
+  // Render remaining thumbnails as they scroll into view
+  useEffect(() => {
+    if (!pdfBlob || pageCount === 0) return;
 
-    // Create intersection observer for lazy loading remaining pages
     const observer = new IntersectionObserver(
       (entries) => {
-        entries.forEach(entry => {
-          if (entry.isIntersecting) {
-            const pageIndex = parseInt(entry.target.getAttribute('data-page-index') || '0');
-            if (thumbnails[pageIndex] === null && pageIndex >= immediatePages) {
-              renderThumbnail(pageIndex);
-            }
-          }
+        entries.forEach((entry) => {
+          if (!entry.isIntersecting) return;
+          const pageNumber = parseInt(entry.target.getAttribute('data-page-index') || '0') + 1;
+          if (requestedRef.current.has(pageNumber)) return;
+          requestedRef.current.add(pageNumber);
+          generateThumbnail(pdfBlob, pageNumber);
         });
       },
-      { threshold: 0.1 }
+      { root: scrollContainerRef.current, threshold: 0.1 }
     );
 
     // Observe thumbnail elements
-    const thumbnailElements = document.querySelectorAll('[data-page-index]');
-    thumbnailElements.forEach(el => observer.observe(el));
+    scrollContainerRef.current
+      ?.querySelectorAll('[data-page-index]')
+      .forEach((el) => observer.observe(el));
 
     return () => observer.disconnect();
-  }, [pdf, thumbnails]);
+  }, [pdfBlob, pageCount, generateThumbnail]);
 
-  if (loading) {
-    return (
-      <div className="flex items-center justify-center p-4 bg-gray-50 rounded-lg border border-gray-200">
-        <p className="text-sm text-gray-600">Loading thumbnails...</p>
-      </div>
-    );
-  }
-
-  if (!pdf || pages.length === 0) {
+  if (pages.length === 0) {
     return (
       <div className="flex items-center justify-center p-4 bg-gray-50 rounded-lg border border-gray-200">
         <p className="text-sm text-gray-600">No pages to display</p>
@@ -151,7 +107,7 @@ const ThumbnailStrip: React.FC<ThumbnailStripProps> = ({
     onPageSelect?.(pageNumber);
   };
 
-  const onDragEnd = async (result: DropResult) => {
+  const onDragEnd = (result: DropResult) => {
     if (!result.destination) return;
     const fromIdx = result.source.index;
     const toIdx = result.destination.index;
@@ -170,16 +126,8 @@ const ThumbnailStrip: React.FC<ThumbnailStripProps> = ({
     const newOrder = current.map((p) => p.pageNumber);
     
     try {
-      // Perform actual PDF reordering
-      const reorderedBlob = await reorderPDF(currentFile.blob, newOrder);
-      
-      // Update the current file blob
-      setCurrentFile({
-        ...currentFile,
-        blob: reorderedBlob,
-      });
-
-      // Update state with renumbered pages
+      // Renumbers pages and records the move in the edit plan; the PDF is
+      // rewritten once on preview/export
       reorderPagesStore(newOrder);
       toast.success('✓ Pages reordered');
     } catch (error) {
@@ -256,9 +204,9 @@ const ThumbnailStrip: React.FC<ThumbnailStripProps> = ({
                           }`}
                         >
                           {/* Thumbnail Image */}
-                          {thumbnails[page.pageNumber - 1] ? (
+                          {thumbnails.get(page.pageNumber)?.url ? (
                             <img
-                              src={thumbnails[page.pageNumber - 1]!}
+                              src={thumbnails.get(page.pageNumber)!.url}
                               alt={`Page ${page.pageNumber}`}
                               className="w-full h-full object-cover bg-gray-100"
                             />
@@ -269,9 +217,9 @@ const ThumbnailStrip: React.FC<ThumbnailStripProps> = ({
                           )}
 
                           {/* Rotation Indicator */}
-                          {(page as any).rotation !== 0 && (
+                          {page.rotationDegrees !== 0 && (
                             <div className="absolute top-1 right-1 bg-blue-500 text-white text-xs font-bold px-1.5 py-0.5 rounded">
-                              {(page as any).rotation}°
+                              {page.rotationDegrees}°
                             </div>
                           )}
 
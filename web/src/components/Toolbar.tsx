@@ -1,7 +1,7 @@
-import React, { useState } from 'react';
+import React from 'react';
 import { motion } from 'framer-motion';
 import { useEditorStore } from '../context/editorContext';
-import { rotatePages, deletePages } from '../utils/pdfOperations';
+import { planRotate, planDelete } from '../utils/editPlan';
 import toast from 'react-hot-toast';
 import {
   FaSyncAlt,
@@ -24,22 +24,21 @@ const Toolbar: React.FC<ToolbarProps> = ({ onDownload, onMerge, onSplit, classNa
   const {
     pages,
     selectedPages,
-    setPages,
     currentFile,
-    setCurrentFile,
+    recordEdit,
     undo,
     redo,
     undoStack,
     redoStack,
+    loading: isProcessing,
   } = useEditorStore();
 
-  const [isProcessing, setIsProcessing] = useState(false);
-
   const canUndo = undoStack.length > 0;
   const canRedo = redoStack.length > 0;
   const hasSelection = selectedPages.size > 0;
 
-  const handleRotate = async () => {
+  // Edits are recorded in the editor's plan; the PDF is rewritten on preview/export
+  const handleRotate = () => {
     if (!hasSelection) {
       toast.error('Please select pages to rotate');
       return;
@@ -50,37 +49,20 @@ const Toolbar: React.FC<ToolbarProps> = ({ onDownload, onMerge, onSplit, classNa
       return;
     }
 
-    setIsProcessing(true);
-    try {
-      const selectedPageNumbers = Array.from(selectedPages);
-      
-      // Perform actual PDF rotation
-      const rotatedBlob = await rotatePages(currentFile.blob, selectedPageNumbers, 90);
-      
-      // Update the current file blob
-      setCurrentFile({
-        ...currentFile,
-        blob: rotatedBlob,
-      });
+    const selectedPageNumbers = Array.from(selectedPages);
 
-      // Update page rotation in state for UI
-      const rotatedPagesState = pages.map((page) =>
-        selectedPageNumbers.includes(page.pageNumber)
-          ? { ...page, rotation: (((page as any).rotation || 0) + 90) % 360 }
-          : page
-      );
-      setPages(rotatedPagesState);
+    // Update page rotation in state for UI
+    const rotatedPagesState = pages.map((page) =>
+      selectedPages.has(page.pageNumber)
+        ? { ...page, rotationDegrees: (page.rotationDegrees + 90) % 360 }
+        : page
+    );
+    recordEdit((plan) => planRotate(plan, selectedPageNumbers, 90), rotatedPagesState);
 
-      toast.success(`✓ Rotated ${selectedPageNumbers.length} page(s)`);
-    } catch (error) {
-      toast.error('Failed to rotate pages');
-      console.error(error);
-    } finally {
-      setIsProcessing(false);
-    }
+    toast.success(`✓ Rotated ${selectedPageNumbers.length} page(s)`);
   };
 
-  const handleDelete = async () => {
+  const handleDelete = () => {
     if (!hasSelection) {
       toast.error('Please select pages to delete');
       return;
@@ -94,41 +76,25 @@ const Toolbar: React.FC<ToolbarProps> = ({ onDownload, onMerge, onSplit, classNa
     // Confirm deletion
     if (
       window.confirm(
-        `Are you sure you want to delete ${selectedPages.size} page(s)? This cannot be undone.`
+        `Are you sure you want to delete ${selectedPages.size} page(s)? You can undo this.`
       )
     ) {
-      setIsProcessing(true);
-      try {
-        const selectedPageNumbers = Array.from(selectedPages).sort((a, b) => a - b);
-        
-        // Perform actual PDF page deletion
-        const deletedBlob = await deletePages(currentFile.blob, selectedPageNumbers);
-        
-        // Update the current file blob
-        const newPageCount = pages.length - selectedPageNumbers.length;
-        setCurrentFile({
-          ...currentFile,
-          blob: deletedBlob,
-          pages: newPageCount,
-        });
+      const selectedPageNumbers = Array.from(selectedPages).sort((a, b) => a - b);
+      if (selectedPageNumbers.length >= pages.length) {
+        toast.error('A PDF needs at least one page');
+        return;
+      }
 
-        // Update pages state
-        let updatedPages = pages.filter((p) => !selectedPageNumbers.includes(p.pageNumber));
-        
-        // Renumber pages
-        updatedPages = updatedPages.map((p, i) => ({
-          ...p,
-          pageNumber: i + 1,
-        }));
+      // Update pages state
+      let updatedPages = pages.filter((p) => !selectedPages.has(p.pageNumber));
+      
+      // Renumber pages (untouched pages stay shared with the undo history)
+      updatedPages = updatedPages.map((p, i) =>
+        p.pageNumber === i + 1 ? p : { ...p, pageNumber: i + 1 }
+      );
 
-        setPages(updatedPages);
-        toast.success(`✓ Deleted ${selectedPageNumbers.length} page(s)`);
-      } catch (error) {
-        toast.error('Failed to delete pages');
-        console.error(error);
-      } finally {
-        setIsProcessing(false);
-      }
+      recordEdit((plan) => planDelete(plan, selectedPageNumbers), updatedPages);
+      toast.success(`✓ Deleted ${selectedPageNumbers.length} page(s)`);
     }
   };
 
@@ -1,6 +1,7 @@
 import React, { useRef, useState, useCallback } from 'react';
 import { motion } from 'framer-motion';
 import { useFileStore } from '../context/fileContext';
+import { getPDFPageCount } from '../utils/pdfOperations';
 import toast from 'react-hot-toast';
 import { FaCloud, FaFileArrowUp, FaCircleExclamation } from 'react-icons/fa6';
 
@@ -62,7 +63,7 @@ const UploadZone: React.FC<UploadZoneProps> = ({
             type: file.type,
             uploadedAt: new Date(),
             status: 'uploaded',
-            pages: 0,
+            pages: await getPDFPageCount(file).catch(() => 0),
             blob: file,
           });
 
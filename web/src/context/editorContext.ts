@@ -2,13 +2,31 @@
 
 import { create } from 'zustand';
 import { PDFFile, PDFPage } from '@/types';
+import { EditPlan, createEditPlan, planReorder } from '@/utils/editPlan';
+import { PageOp, applyPageOps } from '@/utils/pageOps';
+import {
+  DEFAULT_HISTORY_BUDGET,
+  HistoryBudget,
+  HistoryEntry,
+  OBJECT_OVERHEAD_BYTES,
+  pushHistory,
+  retainedBytes,
+} from '@/utils/undoHistory';
+
+// Everything one undo step restores
+export interface EditorSnapshot {
+  pages: PDFPage[];
+  editPlan: EditPlan | null;
+}
 
 interface EditorState {
   currentFile: PDFFile | null;
   pages: PDFPage[];
   selectedPages: Set<number>;
-  undoStack: PDFPage[][];
-  redoStack: PDFPage[][];
+  undoStack: HistoryEntry<EditorSnapshot>[];
+  redoStack: HistoryEntry<EditorSnapshot>[];
+  historyBudget: HistoryBudget;
+  editPlan: EditPlan | null; // Pending page edits, materialized on preview/export
   loading: boolean;
   error: string | null;
   
@@ -20,22 +38,72 @@ interface EditorState {
   updatePage: (pageNumber: number, updates: Partial<PDFPage>) => void;
   reorderPages: (newOrder: number[]) => void;
   pushUndo: (pages: PDFPage[]) => void;
+  recordEdit: (edit: (plan: EditPlan) => EditPlan, pages?: PDFPage[]) => void;
+  applyRemoteOps: (ops: PageOp[]) => void;
   undo: () => void;
   redo: () => void;
+  setHistoryBudget: (budget: Partial<HistoryBudget>) => void;
   setLoading: (loading: boolean) => void;
   setError: (error: string | null) => void;
 }
 
+// Estimated size of one page entry; thumbnail URLs are UTF-16 strings
+const pageBytes = (page: PDFPage): number =>
+  OBJECT_OVERHEAD_BYTES + (page.thumbnailUrl?.length ?? 0) * 2;
+
+const handleBytes = (): number => OBJECT_OVERHEAD_BYTES;
+
+/**
+ * History entry for `snapshot`, charged only for what `live` doesn't share
+ */
+function historyEntry(snapshot: EditorSnapshot, live: EditorSnapshot): HistoryEntry<EditorSnapshot> {
+  let bytes = retainedBytes(snapshot.pages, live.pages, pageBytes);
+  if (snapshot.editPlan && snapshot.editPlan.pages !== live.editPlan?.pages) {
+    bytes += retainedBytes(snapshot.editPlan.pages, live.editPlan?.pages ?? [], handleBytes);
+  }
+  return { snapshot, bytes };
+}
+
+/**
+ * State update that makes `next` current and records the previous state for undo
+ * The first edit records the empty plan it started from, so undoing back to
+ * it restores the original document.
+ */
+function commit(state: EditorState, base: EditPlan | null, next: EditorSnapshot): Partial<EditorState> {
+  const previous = { pages: state.pages, editPlan: state.editPlan ?? base };
+  return {
+    ...next,
+    undoStack: pushHistory(state.undoStack, historyEntry(previous, next), state.historyBudget),
+    redoStack: [],
+  };
+}
+
+/**
+ * Plan to record the next edit against, starting one if needed
+ */
+function basePlan(state: EditorState): EditPlan | null {
+  if (state.editPlan) return state.editPlan;
+  return state.currentFile?.blob ? createEditPlan(state.currentFile.blob, state.pages.length) : null;
+}
+
 export const useEditorStore = create<EditorState>((set) => ({
   currentFile: null,
   pages: [],
   selectedPages: new Set(),
   undoStack: [],
   redoStack: [],
+  historyBudget: DEFAULT_HISTORY_BUDGET,
+  editPlan: null,
   loading: false,
   error: null,
   
-  setCurrentFile: (file) => set({ currentFile: file }),
+  setCurrentFile: (file) =>
+    set((state) =>
+      file && file.id === state.currentFile?.id
+        ? { currentFile: file }
+        : // Pending edits and history belong to the file they were made on
+          { currentFile: file, editPlan: null, undoStack: [], redoStack: [] }
+    ),
   
   setPages: (pages) => set({ pages }),
   
@@ -64,48 +132,87 @@ export const useEditorStore = create<EditorState>((set) => ({
 
   reorderPages: (newOrder) =>
     set((state) => {
-      // push current pages to undo stack
-      const prev = state.pages;
+      const byNumber = new Map(state.pages.map((page) => [page.pageNumber, page]));
       const reordered = newOrder.map((pNum, idx) => {
-        const page = prev.find((pg) => pg.pageNumber === pNum);
+        const page = byNumber.get(pNum);
         if (!page) throw new Error('Invalid page number in reorder');
-        return { ...page, pageNumber: idx + 1 } as PDFPage;
+        // Pages that keep their number are shared with the previous state
+        return page.pageNumber === idx + 1 ? page : { ...page, pageNumber: idx + 1 };
       });
 
-      return {
+      const plan = basePlan(state);
+      return commit(state, plan, {
         pages: reordered,
-        undoStack: [...state.undoStack, prev],
-        redoStack: [],
-      };
+        editPlan: plan ? planReorder(plan, newOrder) : null,
+      });
     }),
   
   pushUndo: (pages) =>
     set((state) => ({
-      undoStack: [...state.undoStack, pages],
+      undoStack: pushHistory(
+        state.undoStack,
+        historyEntry({ pages, editPlan: state.editPlan }, { pages: state.pages, editPlan: state.editPlan }),
+        state.historyBudget
+      ),
       redoStack: [],
     })),
   
+  recordEdit: (edit, pages) =>
+    set((state) => {
+      const plan = basePlan(state);
+      if (!plan) return state;
+      return commit(state, plan, { pages: pages ?? state.pages, editPlan: edit(plan) });
+    }),
+
+  // Edits from collaborators: one update (and one undo step) per received batch
+  applyRemoteOps: (ops) =>
+    set((state) => {
+      const plan = basePlan(state);
+      const next = applyPageOps({ pages: state.pages, editPlan: plan }, ops);
+      if (next.pages === state.pages) return state;
+
+      // Selection is by position, which deletes and reorders invalidate
+      const moved = ops.some((op) => op.type !== 'page-rotate');
+      return {
+        ...commit(state, plan, next),
+        ...(moved ? { selectedPages: new Set<number>() } : {}),
+      };
+    }),
+  
   undo: () =>
     set((state) => {
       if (state.undoStack.length === 0) return state;
-      const newUndo = [...state.undoStack];
-      const prevPages = newUndo.pop()!;
+      const { snapshot } = state.undoStack[state.undoStack.length - 1];
+      const current = { pages: state.pages, editPlan: state.editPlan };
       return {
-        pages: prevPages,
-        undoStack: newUndo,
-        redoStack: [...state.redoStack, state.pages],
+        ...snapshot,
+        undoStack: state.undoStack.slice(0, -1),
+        redoStack: pushHistory(state.redoStack, historyEntry(current, snapshot), state.historyBudget),
       };
     }),
   
   redo: () =>
     set((state) => {
       if (state.redoStack.length === 0) return state;
-      const newRedo = [...state.redoStack];
-      const nextPages = newRedo.pop()!;
+      const { snapshot } = state.redoStack[state.redoStack.length - 1];
+      const current = { pages: state.pages, editPlan: state.editPlan };
+      return {
+        ...snapshot,
+        undoStack: pushHistory(state.undoStack, historyEntry(current, snapshot), state.historyBudget),
+        redoStack: state.redoStack.slice(0, -1),
+      };
+    }),
+  
+  setHistoryBudget: (budget) =>
+    set((state) => {
+      const historyBudget = { ...state.historyBudget, ...budget };
+      // Re-apply the budget to what is already recorded
+      const trim = (stack: HistoryEntry<EditorSnapshot>[]) =>
+        stack.length === 0 ? stack : pushHistory(stack.slice(0, -1), stack[stack.length - 1], historyBudget);
       return {
-        pages: nextPages,
-        undoStack: [...state.undoStack, state.pages],
-        redoStack: newRedo,
+        historyBudget,
+        undoStack: trim(state.undoStack),
+        redoStack: trim(state.redoStack),
       };
     }),
   
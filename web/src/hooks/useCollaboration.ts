@@ -2,39 +2,19 @@
  * Collaboration System
  * Real-time collaboration features with Firestore listeners
  * Supports: presence, cursor tracking, live annotations, change broadcasting
+ *
+ * Writes and listeners go through CollabSync, which batches changes and
+ * throttles presence so large sessions stay within a fixed write rate.
+ * Page edits from other participants are applied to the editor store as
+ * they arrive, one store update per received batch.
  */
 
 import { useCallback, useEffect, useRef, useState } from 'react';
-import {
-  collection,
-  doc,
-  setDoc,
-  onSnapshot,
-  query,
-  where,
-  addDoc,
-  Timestamp,
-} from 'firebase/firestore';
+import { collection, doc, setDoc, Timestamp } from 'firebase/firestore';
 import { db } from '../utils/firebase';
-
-interface UserPresence {
-  userId: string;
-  userName: string;
-  userEmail: string;
-  color: string;
-  lastSeen: number;
-  isOnline: boolean;
-  currentPage?: number;
-  cursor?: { x: number; y: number } | null;
-}
-
-interface ChangeEvent {
-  id: string;
-  userId: string;
-  type: 'page-rotate' | 'page-delete' | 'page-reorder' | 'annotation' | 'text-change';
-  data: any;
-  timestamp: number;
-}
+import { ChangeEvent, CollabSync, UserPresence } from '../utils/collabSync';
+import { isPageOp } from '../utils/pageOps';
+import { useEditorStore } from '../context/editorContext';
 
 interface CursorUpdate {
   userId: string;
@@ -44,13 +24,43 @@ interface CursorUpdate {
   timestamp: number;
 }
 
-const PRESENCE_TIMEOUT = 30000; // 30 seconds
 const COLORS = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A', '#98D8C8', '#F7DC6F'];
 
+/**
+ * Other participants' cursors; returns `previous` when nothing moved so
+ * presence updates that don't touch cursors cause no re-render
+ */
+function cursorsFrom(
+  participants: Map<string, UserPresence>,
+  selfId: string,
+  previous: Map<string, CursorUpdate>
+): Map<string, CursorUpdate> {
+  const next = new Map<string, CursorUpdate>();
+  participants.forEach((presence) => {
+    if (presence.userId === selfId || !presence.cursor) return;
+    const prior = previous.get(presence.userId);
+    if (prior && prior.position.x === presence.cursor.x && prior.position.y === presence.cursor.y) {
+      next.set(presence.userId, prior);
+      return;
+    }
+    next.set(presence.userId, {
+      userId: presence.userId,
+      userName: presence.userName,
+      color: presence.color,
+      position: presence.cursor,
+      timestamp: presence.lastSeen,
+    });
+  });
+
+  const unchanged =
+    next.size === previous.size && Array.from(next).every(([id, cursor]) => previous.get(id) === cursor);
+  return unchanged ? previous : next;
+}
+
 export const useCollaboration = (docId: string, userId: string, userName: string) => {
   const [participants, setParticipants] = useState<Map<string, UserPresence>>(new Map());
   const [cursors, setCursors] = useState<Map<string, CursorUpdate>>(new Map());
-  const presenceRef = useRef<string | null>(null);
+  const syncRef = useRef<CollabSync | null>(null);
   const sessionIdRef = useRef<string | null>(null);
 
   // Get consistent color for user
@@ -76,13 +86,8 @@ export const useCollaboration = (docId: string, userId: string, userName: string
         updatedAt: Timestamp.now(),
       });
 
-      // Create presence document
-      const presenceDocRef = doc(
-        collection(db, 'collab_sessions', sessionId, 'participants'),
-        userId
-      );
-
-      await setDoc(presenceDocRef, {
+      // Writes our presence document and starts the session listeners
+      const sync = new CollabSync(sessionId, {
         userId,
         userName,
         userEmail: '', // Would come from auth context
@@ -90,10 +95,22 @@ export const useCollaboration = (docId: string, userId: string, userName: string
         lastSeen: Date.now(),
         isOnline: true,
         currentPage: 1,
-        cursor: undefined,
-      } as UserPresence);
+        cursor: null,
+      });
+
+      sync.onParticipants((online) => {
+        setParticipants(online);
+        setCursors((previous) => cursorsFrom(online, userId, previous));
+      });
+
+      sync.onChanges((changes) => {
+        const ops = changes.filter(isPageOp);
+        if (ops.length > 0) useEditorStore.getState().applyRemoteOps(ops);
+      });
+
+      await sync.start();
 
-      presenceRef.current = presenceDocRef.path;
+      syncRef.current = sync;
       sessionIdRef.current = sessionId;
 
       return sessionId;
@@ -107,203 +124,71 @@ export const useCollaboration = (docId: string, userId: string, userName: string
    * Subscribe to participants
    */
   const subscribeToParticipants = useCallback(
-    (sessionId: string) => {
-      try {
-        const q = query(
-          collection(db, 'collab_sessions', sessionId, 'participants'),
-          where('isOnline', '==', true)
-        );
-
-        const unsubscribe = onSnapshot(q, snapshot => {
-          const updatedParticipants = new Map<string, UserPresence>();
-
-          snapshot.docs.forEach(doc => {
-            const data = doc.data() as UserPresence;
-
-            // Check if presence is stale
-            if (Date.now() - data.lastSeen < PRESENCE_TIMEOUT) {
-              updatedParticipants.set(doc.id, data);
-            }
-          });
-
-          setParticipants(updatedParticipants);
-        });
-
-        return unsubscribe;
-      } catch (error) {
-        console.error('Error subscribing to participants:', error);
-        return () => {};
-      }
-    },
+    (_sessionId: string, onParticipants?: (participants: Map<string, UserPresence>) => void) =>
+      syncRef.current?.onParticipants(onParticipants ?? setParticipants) ?? (() => {}),
     []
   );
 
   /**
-   * Subscribe to changes
+   * Subscribe to changes from other participants
+   * Page edits are already applied to the editor store; the callback sees
+   * every change, including annotations and text changes.
    */
   const subscribeToChanges = useCallback(
-    (sessionId: string, onChangeCallback?: (change: ChangeEvent) => void) => {
-      try {
-        const changesRef = collection(db, 'collab_sessions', sessionId, 'changes');
-
-        const unsubscribe = onSnapshot(changesRef, snapshot => {
-          snapshot.docChanges().forEach(change => {
-            if (change.type === 'added') {
-              const changeData = change.doc.data() as ChangeEvent;
-              onChangeCallback?.(changeData);
-            }
-          });
-        });
-
-        return unsubscribe;
-      } catch (error) {
-        console.error('Error subscribing to changes:', error);
-        return () => {};
-      }
-    },
+    (_sessionId: string, onChangeCallback?: (change: ChangeEvent) => void) =>
+      syncRef.current?.onChanges((changes) => changes.forEach((change) => onChangeCallback?.(change))) ??
+      (() => {}),
     []
   );
 
   /**
-   * Update user presence
+   * Update user presence (coalesced; written on the next presence window)
    */
   const updatePresence = useCallback(
     async (_sessionId: string, updates: Partial<UserPresence>) => {
-      if (!presenceRef.current) return;
-
-      try {
-        const presenceDocRef = doc(db, presenceRef.current);
-        await setDoc(
-          presenceDocRef,
-          {
-            ...updates,
-            lastSeen: Date.now(),
-          },
-          { merge: true }
-        );
-      } catch (error) {
-        console.error('Error updating presence:', error);
-      }
+      syncRef.current?.updatePresence(updates);
     },
     []
   );
 
   /**
-   * Broadcast cursor position
+   * Broadcast cursor position (coalesced like any presence update)
    */
   const broadcastCursor = useCallback(
     async (_sessionId: string, position: { x: number; y: number }) => {
-      if (!presenceRef.current) return;
-
-      try {
-        const presenceDocRef = doc(db, presenceRef.current);
-        await setDoc(
-          presenceDocRef,
-          {
-            cursor: position,
-            lastSeen: Date.now(),
-          },
-          { merge: true }
-        );
-
-        // Update local cursors map
-        setCursors(prev => {
-          const next = new Map(prev);
-          next.set(userId, {
-            userId,
-            userName,
-            color: getUserColor(),
-            position,
-            timestamp: Date.now(),
-          });
-          return next;
-        });
-      } catch (error) {
-        console.error('Error broadcasting cursor:', error);
-      }
+      syncRef.current?.updatePresence({ cursor: position });
     },
-    [userId, userName, getUserColor]
+    []
   );
 
   /**
    * Broadcast a change event
+   * Send the delta (e.g. { type: 'page-rotate', data: { pages, angle } }),
+   * not the resulting document; it is batched with other changes.
    */
   const broadcastChange = useCallback(
-    async (sessionId: string, changeEvent: Omit<ChangeEvent, 'id' | 'userId' | 'timestamp'>) => {
-      try {
-        const changesRef = collection(db, 'collab_sessions', sessionId, 'changes');
-        await addDoc(changesRef, {
-          ...changeEvent,
-          userId,
-          timestamp: Timestamp.now(),
-        });
-      } catch (error) {
-        console.error('Error broadcasting change:', error);
-      }
+    async (_sessionId: string, changeEvent: Omit<ChangeEvent, 'id' | 'userId' | 'timestamp'>) => {
+      syncRef.current?.queueChange(changeEvent);
     },
-    [userId]
+    []
   );
 
   /**
    * Leave session
    */
   const leaveSession = useCallback(async (_sessionId: string) => {
-    if (!presenceRef.current) return;
+    const sync = syncRef.current;
+    if (!sync) return;
+    syncRef.current = null;
 
     try {
-      // Mark as offline instead of deleting
-      const presenceDocRef = doc(db, presenceRef.current);
-      await setDoc(
-        presenceDocRef,
-        {
-          isOnline: false,
-          lastSeen: Date.now(),
-        },
-        { merge: true }
-      );
-
-      presenceRef.current = null;
+      // Flushes pending writes and marks us offline instead of deleting
+      await sync.stop();
     } catch (error) {
       console.error('Error leaving session:', error);
     }
   }, []);
 
-  /**
-   * Subscribe to cursor updates from other participants
-   */
-  useEffect(() => {
-    if (!sessionIdRef.current) return;
-
-    const participantsRef = collection(
-      db,
-      'collab_sessions',
-      sessionIdRef.current,
-      'participants'
-    );
-
-    const unsubscribe = onSnapshot(participantsRef, snapshot => {
-      const updatedCursors = new Map<string, CursorUpdate>();
-
-      snapshot.docs.forEach(participantDoc => {
-        const data = participantDoc.data() as UserPresence;
-
-        if (data.userId !== userId && data.cursor && Date.now() - data.lastSeen < PRESENCE_TIMEOUT) {
-          updatedCursors.set(data.userId, {
-            userId: data.userId,
-            userName: data.userName,
-            color: data.color,
-            position: data.cursor,
-            timestamp: data.lastSeen,
-          });
-        }
-      });
-
-      setCursors(updatedCursors);
-    });
-
-    return unsubscribe;
-  }, [userId]);
-
   /**
    * Cleanup on unmount
    */
@@ -326,6 +211,7 @@ export const useCollaboration = (docId: string, userId: string, userName: string
     participants,
     cursors,
     sessionRef: sessionIdRef.current,
+    getSyncStats: () => syncRef.current?.getStats() ?? null,
   };
 };
 
@@ -2,15 +2,22 @@
  * OCR System Hook
  * Integrates Tesseract.js for optical character recognition on PDFs
  * Lazy loads Tesseract to minimize bundle size
+ *
+ * Pages are spread over a Tesseract scheduler whose worker pool is sized to
+ * the machine, and each page is reported as soon as it is recognized.
+ * Results are cached by page-image hash, so OCR of an already processed
+ * document is served from IndexedDB without starting any workers.
  */
 
 import { useCallback, useRef, useState } from 'react';
+import { getCachedOCR, hashPageImage, putCachedOCR, evictOCRCache } from '@/utils/ocrCache';
 
 interface OCRResult {
   pageNumber: number;
   text: string;
   confidence: number;
   timestamp: number;
+  cached?: boolean; // Served from the OCR cache
 }
 
 interface OCRProgress {
@@ -18,6 +25,23 @@ interface OCRProgress {
   progress: number;
 }
 
+type OCRImage = string | ImageData | HTMLImageElement | Blob;
+
+const OCR_LANGUAGE = 'eng';
+const LANG_PATH = 'https://tessdata.projectnaptha.com/4.0_best_lang_data';
+
+// Each worker holds its own copy of the language model (~10-20MB)
+const MAX_OCR_WORKERS = 8;
+
+/**
+ * Workers worth starting for a job: one per core minus one for the UI,
+ * never more than there are pages
+ */
+export function ocrWorkerCount(pages: number): number {
+  const cores = typeof navigator !== 'undefined' ? navigator.hardwareConcurrency || 2 : 2;
+  return Math.max(1, Math.min(pages, cores - 1, MAX_OCR_WORKERS));
+}
+
 let TesseractWorker: any = null;
 
 /**
@@ -35,29 +59,46 @@ export const useOCR = () => {
   const [isProcessing, setIsProcessing] = useState(false);
   const [progress, setProgress] = useState<OCRProgress | null>(null);
   const [results, setResults] = useState<Map<number, OCRResult>>(new Map());
-  const workerRef = useRef<any>(null);
+  const schedulerRef = useRef<any>(null);
+  const workerCountRef = useRef(0);
+  const growingRef = useRef<Promise<void>>(Promise.resolve());
   const [error, setError] = useState<string | null>(null);
 
   /**
-   * Initialize OCR worker
+   * Create the scheduler on first use and grow its pool to `count` workers
    */
-  const initializeWorker = useCallback(async () => {
-    if (workerRef.current) return workerRef.current;
+  const ensureWorkers = useCallback(async (count: number) => {
+    // Serialize growth so concurrent calls don't overshoot the pool size
+    const grow = growingRef.current.then(async () => {
+      const Tesseract = await loadTesseract();
+      if (!schedulerRef.current) schedulerRef.current = Tesseract.createScheduler();
+
+      const missing = count - workerCountRef.current;
+      if (missing <= 0) return;
+
+      await Promise.all(
+        Array.from({ length: missing }, async () => {
+          const worker = await Tesseract.createWorker({
+            langPath: LANG_PATH,
+            errorHandler: (error: any) => {
+              console.error('Tesseract error:', error);
+              setError(error.message || 'OCR Error');
+            },
+          });
+          await worker.loadLanguage(OCR_LANGUAGE);
+          await worker.initialize(OCR_LANGUAGE);
+          await worker.setParameters({ preserve_interword_spaces: '1' });
+          schedulerRef.current.addWorker(worker);
+          workerCountRef.current++;
+        })
+      );
+    });
+
+    growingRef.current = grow.catch(() => undefined);
 
     try {
-      const Tesseract = await loadTesseract();
-      workerRef.current = Tesseract.createWorker({
-        langPath: 'https://tessdata.projectnaptha.com/4.0_best_lang_data',
-        errorHandler: (error: any) => {
-          console.error('Tesseract error:', error);
-          setError(error.message || 'OCR Error');
-        },
-      });
-
-      await workerRef.current.load();
-      await workerRef.current.initialize('eng');
-
-      return workerRef.current;
+      await grow;
+      return schedulerRef.current;
     } catch (err) {
       const message = err instanceof Error ? err.message : 'Failed to initialize OCR';
       setError(message);
@@ -66,37 +107,79 @@ export const useOCR = () => {
   }, []);
 
   /**
-   * Process single image for OCR
+   * Recognize pages in parallel, calling onPage as each one finishes
+   * Cached pages are reported first; identical page images are recognized once.
    */
-  const processImage = useCallback(
-    async (imageData: string | ImageData | HTMLImageElement, pageNumber: number) => {
-      try {
-        setIsProcessing(true);
-        setError(null);
-
-        const worker = await initializeWorker();
-
-        setProgress({ status: 'Recognizing text...', progress: 0 });
-
-        const result = await worker.recognize(imageData, undefined, {
-          'preserve_interword_spaces': true,
-        });
-
-        const ocrResult: OCRResult = {
-          pageNumber,
-          text: result.data.text,
-          confidence: result.data.confidence,
-          timestamp: Date.now(),
-        };
-
+  const recognize = useCallback(
+    async (
+      pages: Array<{ image: OCRImage; pageNumber: number }>,
+      onPage?: (result: OCRResult) => void
+    ): Promise<OCRResult[]> => {
+      const total = pages.length;
+      let completed = 0;
+
+      const publish = (result: OCRResult) => {
+        completed++;
         setResults(prev => {
           const next = new Map(prev);
-          next.set(pageNumber, ocrResult);
+          next.set(result.pageNumber, result);
           return next;
         });
+        setProgress({
+          status: `Recognized ${completed} of ${total} page${total !== 1 ? 's' : ''}...`,
+          progress: (completed / total) * 100,
+        });
+        onPage?.(result);
+        return result;
+      };
+
+      setProgress({ status: 'Checking for earlier results...', progress: 0 });
+      const hashes = await Promise.all(pages.map(({ image }) => hashPageImage(image)));
+      const cached = await getCachedOCR(hashes, OCR_LANGUAGE);
+
+      const misses = pages.filter((_, i) => !cached.has(hashes[i]));
+      const scheduler = misses.length > 0 ? await ensureWorkers(ocrWorkerCount(misses.length)) : null;
+
+      // One job per distinct page image; the scheduler hands them to idle workers
+      const jobs = new Map<string, Promise<{ text: string; confidence: number }>>();
+      const recognizeOnce = (hash: string, image: OCRImage) => {
+        let job = jobs.get(hash);
+        if (!job) {
+          job = scheduler.addJob('recognize', image).then(({ data }: any) => {
+            const page = { text: data.text, confidence: data.confidence };
+            void putCachedOCR(hash, OCR_LANGUAGE, page);
+            return page;
+          });
+          jobs.set(hash, job);
+        }
+        return job;
+      };
+
+      const ocrResults = await Promise.all(
+        pages.map(async ({ image, pageNumber }, i) => {
+          const hit = cached.get(hashes[i]);
+          const page = hit ?? (await recognizeOnce(hashes[i], image));
+          return publish({ pageNumber, ...page, timestamp: Date.now(), cached: Boolean(hit) });
+        })
+      );
+
+      if (jobs.size > 0) void evictOCRCache().catch(() => undefined);
+      setProgress({ status: 'Complete', progress: 100 });
+      return ocrResults;
+    },
+    [ensureWorkers]
+  );
 
-        setProgress({ status: 'Complete', progress: 100 });
+  /**
+   * Process single image for OCR
+   */
+  const processImage = useCallback(
+    async (imageData: OCRImage, pageNumber: number) => {
+      try {
+        setIsProcessing(true);
+        setError(null);
 
+        const [ocrResult] = await recognize([{ image: imageData, pageNumber }]);
         return ocrResult;
       } catch (err) {
         const message = err instanceof Error ? err.message : 'OCR failed';
@@ -106,51 +189,23 @@ export const useOCR = () => {
         setIsProcessing(false);
       }
     },
-    [initializeWorker]
+    [recognize]
   );
 
   /**
-   * Process multiple pages/images
+   * Process multiple pages/images (page numbers follow array order)
+   * onPage streams each page's result as soon as it is ready.
    */
   const processPages = useCallback(
-    async (images: Array<string | ImageData | HTMLImageElement>) => {
+    async (images: OCRImage[], onPage?: (result: OCRResult) => void) => {
       try {
         setIsProcessing(true);
         setError(null);
 
-        const worker = await initializeWorker();
-        const processedResults: OCRResult[] = [];
-
-        for (let i = 0; i < images.length; i++) {
-          const image = images[i];
-
-          setProgress({
-            status: `Processing page ${i + 1} of ${images.length}...`,
-            progress: (i / images.length) * 100,
-          });
-
-          const result = await worker.recognize(image, undefined, {
-            'preserve_interword_spaces': true,
-          });
-
-          const ocrResult: OCRResult = {
-            pageNumber: i + 1,
-            text: result.data.text,
-            confidence: result.data.confidence,
-            timestamp: Date.now(),
-          };
-
-          processedResults.push(ocrResult);
-
-          setResults(prev => {
-            const next = new Map(prev);
-            next.set(i + 1, ocrResult);
-            return next;
-          });
-        }
-
-        setProgress({ status: 'Complete', progress: 100 });
-        return processedResults;
+        return await recognize(
+          images.map((image, i) => ({ image, pageNumber: i + 1 })),
+          onPage
+        );
       } catch (err) {
         const message = err instanceof Error ? err.message : 'Batch OCR failed';
         setError(message);
@@ -159,7 +214,7 @@ export const useOCR = () => {
         setIsProcessing(false);
       }
     },
-    [initializeWorker]
+    [recognize]
   );
 
   /**
@@ -212,15 +267,18 @@ export const useOCR = () => {
   }, []);
 
   /**
-   * Terminate worker and cleanup
+   * Terminate all workers and cleanup
    */
   const terminate = useCallback(async () => {
-    if (workerRef.current) {
+    if (schedulerRef.current) {
       try {
-        await workerRef.current.terminate();
-        workerRef.current = null;
+        await growingRef.current;
+        await schedulerRef.current.terminate();
       } catch (err) {
-        console.error('Failed to terminate OCR worker:', err);
+        console.error('Failed to terminate OCR workers:', err);
+      } finally {
+        schedulerRef.current = null;
+        workerCountRef.current = 0;
       }
     }
   }, []);
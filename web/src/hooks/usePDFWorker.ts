@@ -1,140 +1,273 @@
 import { useRef, useCallback } from 'react';
+import {
+  DedupStats,
+  PageSpan,
+  SplitOptions,
+  SplitPart,
+  splitPDFStream,
+} from '@/utils/pdfOperations';
+import { workerScheduler, TaskOptions } from '@/utils/workerPool';
+import { SpanRecord, TraceContext, formatTraceparent, recordSpans, startSpan } from '@/utils/tracing';
 
 interface WorkerMessage {
   id: string;
-  type: 'merge' | 'extract' | 'rotate' | 'reorder' | 'delete' | 'split';
+  type: 'merge' | 'mergeStream' | 'extract' | 'rotate' | 'reorder' | 'delete' | 'split';
   payload: any;
+  traceparent?: string;
 }
 
 interface WorkerResponse {
   id: string;
+  type?: 'progress' | 'part';
   success: boolean;
   result?: Blob;
   error?: string;
   progress?: number;
+  bytesWritten?: number;
+  dedup?: DedupStats;
+  spans?: SpanRecord[];
+  part?: SplitPart;
 }
 
 interface UsePDFWorkerOptions {
-  onProgress?: (progress: number) => void;
+  onProgress?: (progress: number, bytesWritten?: number) => void;
+  onDeduplicated?: (stats: DedupStats) => void;
 }
 
-export const usePDFWorker = (options?: UsePDFWorkerOptions) => {
-  const workerRef = useRef<Worker | null>(null);
-  const pendingTasksRef = useRef<Map<string, { resolve: (blob: Blob) => void; reject: (error: Error) => void }>>(new Map());
+// Per-call scheduling options (priority lane, superseding key), plus the
+// trace to record the task under; without one each task starts its own trace
+type PDFTaskOptions = Pick<TaskOptions, 'priority' | 'key'> & { trace?: TraceContext };
 
-  const initWorker = useCallback(() => {
-    if (workerRef.current) return;
+// Blobs (and Files) cross the worker boundary as handles and are read inside
+// the worker; ArrayBuffers are moved, so callers must not reuse them afterwards.
+type PDFInput = Blob | ArrayBuffer;
 
-    try {
-      // Create worker from worker file
-      workerRef.current = new Worker(new URL('../workers/pdfWorker.ts', import.meta.url), {
-        type: 'module',
-      });
+const transferList = (inputs: PDFInput[]): Transferable[] =>
+  inputs.filter((input): input is ArrayBuffer => input instanceof ArrayBuffer);
 
-      workerRef.current.onmessage = (event: MessageEvent<WorkerResponse>) => {
-        const { id, success, result, error, progress } = event.data;
+// PDF workers are spawned by the shared scheduler on demand
+workerScheduler.register(
+  'pdf',
+  () => new Worker(new URL('../workers/pdfWorker.ts', import.meta.url), { type: 'module' }),
+  (data: WorkerResponse) => data.type !== 'progress' && data.type !== 'part'
+);
 
-        // Handle progress updates
-        if (progress !== undefined && options?.onProgress) {
-          options.onProgress(progress);
-          return;
-        }
+// Each split task parses the source once, so runs shouldn't be too short
+const MIN_PARTS_PER_SPLIT_TASK = 4;
 
-        // Handle task completion
-        const task = pendingTasksRef.current.get(id);
-        if (!task) return;
+let nextSplitId = 0;
 
-        if (success && result) {
-          task.resolve(result);
-        } else {
-          task.reject(new Error(error || 'Unknown worker error'));
-        }
+export const usePDFWorker = (options?: UsePDFWorkerOptions) => {
+  // Aborting cancels every task this hook instance has queued
+  const abortRef = useRef<AbortController>(new AbortController());
 
-        pendingTasksRef.current.delete(id);
-      };
-
-      workerRef.current.onerror = (error) => {
-        console.error('PDF Worker error:', error);
-        // Reject all pending tasks
-        pendingTasksRef.current.forEach((task) => {
-          task.reject(new Error('Worker crashed'));
-        });
-        pendingTasksRef.current.clear();
-      };
-    } catch (error) {
-      console.error('Failed to initialize PDF worker:', error);
-      // Worker not supported, operations will fall back to main thread
-    }
-  }, [options]);
+  const runTask = useCallback(
+    async (
+      type: WorkerMessage['type'],
+      payload: any,
+      transfer: Transferable[] = [],
+      taskOptions: PDFTaskOptions = {},
+      onPart?: (part: SplitPart) => void
+    ): Promise<WorkerResponse> => {
+      const priority = taskOptions.priority ?? 'user';
+      const span = startSpan(`pdf.${type}`, taskOptions.trace, { priority });
+      // Ends when the scheduler hands the task to a worker
+      const queued = startSpan('worker.queue', span.context);
 
-  const executeTask = useCallback(
-    async (type: WorkerMessage['type'], payload: any): Promise<Blob> => {
-      initWorker();
+      try {
+        const response = await workerScheduler.run<WorkerResponse>(
+          'pdf',
+          { type, payload, traceparent: formatTraceparent(span.context) },
+          {
+            priority,
+            key: taskOptions.key,
+            transfer,
+            signal: abortRef.current.signal,
+            onDispatch: () => queued.end(),
+            onMessage: (data: WorkerResponse) => {
+              if (data.progress !== undefined) {
+                options?.onProgress?.(data.progress, data.bytesWritten);
+              }
+              if (data.part) onPart?.(data.part);
+            },
+          }
+        );
+        if (response.spans) recordSpans(response.spans);
 
-      // If worker is not available, throw error (caller should handle fallback)
-      if (!workerRef.current) {
-        throw new Error('PDF Worker not available');
+        // Split tasks deliver their parts as messages and finish without a result
+        if (!response.success || (type !== 'split' && !response.result)) {
+          throw new Error(response.error || 'Unknown worker error');
+        }
+        if (response.dedup) options?.onDeduplicated?.(response.dedup);
+        span.end();
+        return response;
+      } catch (error) {
+        queued.end(error);
+        span.end(error);
+        throw error;
       }
+    },
+    [options]
+  );
 
-      const id = `task_${Date.now()}_${Math.random()}`;
-
-      return new Promise<Blob>((resolve, reject) => {
-        pendingTasksRef.current.set(id, { resolve, reject });
+  const executeTask = useCallback(
+    async (
+      type: WorkerMessage['type'],
+      payload: any,
+      transfer: Transferable[] = [],
+      taskOptions: PDFTaskOptions = {}
+    ): Promise<Blob> => (await runTask(type, payload, transfer, taskOptions)).result!,
+    [runTask]
+  );
 
-        const message: WorkerMessage = { id, type, payload };
-        workerRef.current!.postMessage(message);
-      });
+  const mergePDFs = useCallback(
+    async (files: PDFInput[], taskOptions?: PDFTaskOptions): Promise<Blob> => {
+      return executeTask('merge', { fileBuffers: files }, transferList(files), taskOptions);
     },
-    [initWorker]
+    [executeTask]
   );
 
-  const mergePDFs = useCallback(
-    async (fileBlobs: Blob[]): Promise<Blob> => {
-      const fileBuffers = await Promise.all(
-        fileBlobs.map((blob) => blob.arrayBuffer())
-      );
-      return executeTask('merge', { fileBuffers });
+  const mergePDFsStreaming = useCallback(
+    async (fileBlobs: Blob[], deduplicate = false, taskOptions?: PDFTaskOptions): Promise<Blob> => {
+      // Blobs are posted as handles; the worker reads them one at a time
+      return executeTask('mergeStream', { fileBlobs, deduplicate }, [], taskOptions);
     },
     [executeTask]
   );
 
   const extractPages = useCallback(
-    async (blob: Blob, pageNumbers: number[]): Promise<Blob> => {
-      const buffer = await blob.arrayBuffer();
-      return executeTask('extract', { buffer, pageNumbers });
+    async (file: PDFInput, pageNumbers: number[], taskOptions?: PDFTaskOptions): Promise<Blob> => {
+      return executeTask('extract', { buffer: file, pageNumbers }, transferList([file]), taskOptions);
     },
     [executeTask]
   );
 
   const reorderPages = useCallback(
-    async (blob: Blob, newOrder: number[]): Promise<Blob> => {
-      const buffer = await blob.arrayBuffer();
-      return executeTask('reorder', { buffer, newOrder });
+    async (file: PDFInput, newOrder: number[], taskOptions?: PDFTaskOptions): Promise<Blob> => {
+      return executeTask('reorder', { buffer: file, newOrder }, transferList([file]), taskOptions);
     },
     [executeTask]
   );
 
   const deletePages = useCallback(
-    async (blob: Blob, pageNumbers: number[]): Promise<Blob> => {
-      const buffer = await blob.arrayBuffer();
-      return executeTask('delete', { buffer, pageNumbers });
+    async (file: PDFInput, pageNumbers: number[], taskOptions?: PDFTaskOptions): Promise<Blob> => {
+      return executeTask('delete', { buffer: file, pageNumbers }, transferList([file]), taskOptions);
     },
     [executeTask]
   );
 
+  /**
+   * Split a PDF into ranges on several workers, yielding parts as they are saved
+   *
+   * Ranges go out in runs; each task parses the source once and builds its
+   * run. New runs start only while few finished parts are waiting to be
+   * consumed, so at most about two runs per worker are held in memory. Parts
+   * arrive in completion order (use part.index). Without workers this is
+   * splitPDFStream on the main thread.
+   */
+  const splitPDFStreaming = useCallback(
+    (
+      file: Blob,
+      ranges: PageSpan[],
+      splitOptions: SplitOptions = {},
+      taskOptions: Omit<PDFTaskOptions, 'key'> = {}
+    ): AsyncGenerator<SplitPart> => {
+      if (typeof Worker === 'undefined') return splitPDFStream(file, ranges, splitOptions);
+
+      const splitId = ++nextSplitId;
+      const workers = workerScheduler.maxConcurrency;
+      const runLength = Math.max(
+        MIN_PARTS_PER_SPLIT_TASK,
+        Math.ceil(ranges.length / (workers * 4))
+      );
+      const maxWaiting = workers * runLength;
+
+      return (async function* () {
+        const waiting: SplitPart[] = [];
+        const keys: string[] = [];
+        let next = 0;
+        let inFlight = 0;
+        let failure: unknown = null;
+        let wake: (() => void) | null = null;
+        const notify = () => {
+          wake?.();
+          wake = null;
+        };
+
+        const launch = () => {
+          while (
+            !failure &&
+            next < ranges.length &&
+            inFlight < workers &&
+            waiting.length < maxWaiting
+          ) {
+            const indexOffset = next;
+            const key = `split_${splitId}_${indexOffset}`;
+            next += runLength;
+            inFlight++;
+            keys.push(key);
+
+            const payload = {
+              blob: file,
+              ranges: ranges.slice(indexOffset, indexOffset + runLength),
+              indexOffset,
+              total: ranges.length,
+              ...splitOptions,
+            };
+            runTask('split', payload, [], { ...taskOptions, key }, (part) => {
+              waiting.push(part);
+              notify();
+            })
+              .catch((error) => {
+                failure ??= error;
+              })
+              .finally(() => {
+                inFlight--;
+                notify();
+              });
+          }
+        };
+
+        try {
+          for (;;) {
+            launch();
+            if (waiting.length > 0) {
+              yield waiting.shift()!;
+              continue;
+            }
+            if (failure) throw failure;
+            if (inFlight === 0 && next >= ranges.length) return;
+            await new Promise<void>((resolve) => {
+              wake = resolve;
+            });
+          }
+        } finally {
+          // Stop the remaining runs if the caller stops early or a run failed
+          keys.forEach((key) => workerScheduler.cancel(key));
+        }
+      })();
+    },
+    [runTask]
+  );
+
+  // Cancel queued/running tasks that share a key
+  const cancel = useCallback((key: string) => {
+    workerScheduler.cancel(key);
+  }, []);
+
   const cleanup = useCallback(() => {
-    if (workerRef.current) {
-      workerRef.current.terminate();
-      workerRef.current = null;
-    }
-    pendingTasksRef.current.clear();
+    abortRef.current.abort();
+    abortRef.current = new AbortController();
   }, []);
 
   return {
     mergePDFs,
+    mergePDFsStreaming,
     extractPages,
     reorderPages,
     deletePages,
+    splitPDFStreaming,
+    cancel,
     cleanup,
     isWorkerSupported: typeof Worker !== 'undefined',
   };
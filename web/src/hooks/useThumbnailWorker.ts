@@ -1,9 +1,14 @@
 /**
  * useThumbnailWorker Hook
  * React hook for generating PDF thumbnails using the worker
+ *
+ * Thumbnail workers are owned by the shared scheduler (utils/workerPool), so
+ * they count against the same concurrency budget as PDF operations.
  */
 
 import { useEffect, useRef, useState, useCallback } from 'react';
+import { workerScheduler, TaskPriority, TaskCancelledError } from '@/utils/workerPool';
+import { clearThumbnailCache } from '@/utils/thumbnailCache';
 
 interface UseThumbnailWorkerOptions {
   width?: number;
@@ -12,107 +17,67 @@ interface UseThumbnailWorkerOptions {
 
 interface ThumbnailData {
   pageNumber: number;
-  imageData?: ImageData;
+  url?: string; // Object URL of the rendered JPEG
   error?: string;
   cached?: boolean;
 }
 
-export const useThumbnailWorker = (options: UseThumbnailWorkerOptions = {}) => {
-  const workerRef = useRef<Worker | null>(null);
-  const [thumbnails, setThumbnails] = useState<Map<number, ThumbnailData>>(new Map());
-  const [isWorkerReady, setIsWorkerReady] = useState(false);
-
-  // Initialize worker
-  useEffect(() => {
-    try {
-      workerRef.current = new Worker(
-        new URL('../workers/thumbnailWorker.ts', import.meta.url),
-        { type: 'module' }
-      );
-
-      const handleMessage = (event: MessageEvent) => {
-        const { type, result, results } = event.data;
-
-        if (type === 'thumbnail_ready' && result) {
-          setThumbnails(prev => {
-            const next = new Map(prev);
-            next.set(result.pageNumber, {
-              pageNumber: result.pageNumber,
-              imageData: result.thumbnail,
-              error: result.error,
-              cached: result.cached,
-            });
-            return next;
-          });
-        } else if (type === 'batch_ready' && results) {
-          setThumbnails(prev => {
-            const next = new Map(prev);
-            results.forEach((result: any) => {
-              next.set(result.pageNumber, {
-                pageNumber: result.pageNumber,
-                imageData: result.thumbnail,
-                error: result.error,
-                cached: result.cached,
-              });
-            });
-            return next;
-          });
-        }
-      };
-
-      const handleError = (error: ErrorEvent) => {
-        console.error('Worker error:', error);
-      };
-
-      workerRef.current.addEventListener('message', handleMessage);
-      workerRef.current.addEventListener('error', handleError);
-      setIsWorkerReady(true);
-
-      return () => {
-        if (workerRef.current) {
-          workerRef.current.removeEventListener('message', handleMessage);
-          workerRef.current.removeEventListener('error', handleError);
-          workerRef.current.terminate();
-        }
-      };
-    } catch (error) {
-      console.error('Failed to initialize thumbnail worker:', error);
-    }
-  }, []);
+interface ThumbnailTaskOptions {
+  priority?: TaskPriority;
+  key?: string; // A newer request with the same key cancels this one
+}
 
-  // Generate single thumbnail
-  const generateThumbnail = useCallback(
-    (pdfBlob: Blob, pageNumber: number) => {
-      if (!workerRef.current || !isWorkerReady) {
-        console.warn('Worker not ready');
-        return;
-      }
+interface ThumbnailResult {
+  pageNumber: number;
+  image?: Blob;
+  error?: string;
+  cached?: boolean;
+}
 
-      workerRef.current.postMessage({
-        type: 'generate_thumbnail',
-        payload: {
-          id: `thumb-${Date.now()}-${pageNumber}`,
-          pdfBlob,
-          pageNumber,
-          width: options.width || 200,
-          height: options.height || 280,
-        },
-      });
-    },
-    [isWorkerReady, options]
-  );
+// Stable per-file keys so the worker can keep each document open between requests
+const fileKeys = new WeakMap<Blob, string>();
+let nextFileKey = 0;
+
+const getFileKey = (blob: Blob): string => {
+  let key = fileKeys.get(blob);
+  if (!key) {
+    key = `file-${++nextFileKey}`;
+    fileKeys.set(blob, key);
+  }
+  return key;
+};
 
-  // Generate batch of thumbnails
-  const generateBatch = useCallback(
-    (pdfBlob: Blob, startPage: number, endPage: number) => {
-      if (!workerRef.current || !isWorkerReady) {
-        console.warn('Worker not ready');
-        return;
-      }
+// Thumbnail workers are spawned by the shared scheduler on demand
+workerScheduler.register(
+  'thumbnail',
+  () => new Worker(new URL('../workers/thumbnailWorker.ts', import.meta.url), { type: 'module' }),
+  (data) => ['batch_complete', 'cache_cleared', 'stats', 'error'].includes(data.type)
+);
 
-      workerRef.current.postMessage({
+/**
+ * Render a page range through the pool and collect the results
+ * Usable outside React (e.g. file import); the parsed document stays open in
+ * whichever worker rendered it, and later requests for the file go there.
+ */
+export function requestThumbnails(
+  pdfBlob: Blob,
+  startPage: number,
+  endPage: number,
+  options: UseThumbnailWorkerOptions & ThumbnailTaskOptions & {
+    signal?: AbortSignal;
+    onThumbnails?: (results: ThumbnailResult[]) => void;
+  } = {}
+): Promise<{ numPages?: number; thumbnails: ThumbnailResult[] }> {
+  const fileKey = getFileKey(pdfBlob);
+  const thumbnails: ThumbnailResult[] = [];
+
+  return workerScheduler
+    .run(
+      'thumbnail',
+      {
         type: 'generate_batch',
         payload: {
+          fileKey,
           pdfBlob,
           startPage,
           endPage,
@@ -121,17 +86,132 @@ export const useThumbnailWorker = (options: UseThumbnailWorkerOptions = {}) => {
             height: options.height || 280,
           },
         },
+      },
+      {
+        priority: options.priority ?? 'prefetch',
+        key: options.key,
+        affinity: fileKey,
+        signal: options.signal,
+        onMessage: (data) => {
+          const results: ThumbnailResult[] =
+            data.type === 'thumbnail_ready' ? [data.result] : data.type === 'batch_ready' ? data.results : [];
+          if (results.length === 0) return;
+          thumbnails.push(...results);
+          options.onThumbnails?.(results);
+        },
+      }
+    )
+    .then((data) => {
+      if (data.type === 'error') throw new Error(data.error);
+      return { numPages: data.numPages, thumbnails };
+    });
+}
+
+const toThumbnailData = (result: ThumbnailResult): ThumbnailData => ({
+  pageNumber: result.pageNumber,
+  url: result.image ? URL.createObjectURL(result.image) : undefined,
+  error: result.error,
+  cached: result.cached,
+});
+
+export const useThumbnailWorker = (options: UseThumbnailWorkerOptions = {}) => {
+  const [thumbnails, setThumbnails] = useState<Map<number, ThumbnailData>>(new Map());
+  const urlsRef = useRef<Set<string>>(new Set());
+  // Aborting cancels every request this hook instance has queued
+  const abortRef = useRef<AbortController>(new AbortController());
+
+  // Replace entries, revoking object URLs that are no longer shown
+  const storeThumbnails = useCallback((results: ThumbnailResult[]) => {
+    setThumbnails(prev => {
+      const next = new Map(prev);
+      results.forEach((result) => {
+        const previousUrl = next.get(result.pageNumber)?.url;
+        if (previousUrl) {
+          URL.revokeObjectURL(previousUrl);
+          urlsRef.current.delete(previousUrl);
+        }
+        const data = toThumbnailData(result);
+        if (data.url) urlsRef.current.add(data.url);
+        next.set(result.pageNumber, data);
+      });
+      return next;
+    });
+  }, []);
+
+  useEffect(() => {
+    if (abortRef.current.signal.aborted) abortRef.current = new AbortController();
+    const urls = urlsRef.current;
+    return () => {
+      abortRef.current.abort();
+      urls.forEach((url) => URL.revokeObjectURL(url));
+      urls.clear();
+    };
+  }, []);
+
+  const render = useCallback(
+    (
+      pdfBlob: Blob,
+      startPage: number,
+      endPage: number,
+      priority: TaskPriority,
+      taskOptions: ThumbnailTaskOptions
+    ) => {
+      requestThumbnails(pdfBlob, startPage, endPage, {
+        ...options,
+        priority: taskOptions.priority ?? priority,
+        key: taskOptions.key,
+        signal: abortRef.current.signal,
+        onThumbnails: storeThumbnails,
+      }).catch((error) => {
+        if (!(error instanceof TaskCancelledError)) {
+          console.error('Thumbnail generation failed:', error);
+        }
       });
     },
-    [isWorkerReady, options]
+    [options, storeThumbnails]
   );
 
+  // Generate single thumbnail (on screen, so it jumps the queue by default)
+  const generateThumbnail = useCallback(
+    (pdfBlob: Blob, pageNumber: number, taskOptions: ThumbnailTaskOptions = {}) => {
+      render(pdfBlob, pageNumber, pageNumber, 'visible', taskOptions);
+    },
+    [render]
+  );
+
+  // Generate batch of thumbnails (prefetch by default)
+  const generateBatch = useCallback(
+    (pdfBlob: Blob, startPage: number, endPage: number, taskOptions: ThumbnailTaskOptions = {}) => {
+      render(pdfBlob, startPage, endPage, 'prefetch', taskOptions);
+    },
+    [render]
+  );
+
+  // Release the workers' parsed copies of a file
+  const closeDocument = useCallback((pdfBlob: Blob) => {
+    workerScheduler.broadcast('thumbnail', {
+      type: 'close_document',
+      payload: { fileKey: getFileKey(pdfBlob) },
+    });
+  }, []);
+
+  // Cancel outstanding requests and drop every thumbnail shown so far,
+  // e.g. when switching files; the persistent cache is kept
+  const reset = useCallback(() => {
+    abortRef.current.abort();
+    abortRef.current = new AbortController();
+    urlsRef.current.forEach((url) => URL.revokeObjectURL(url));
+    urlsRef.current.clear();
+    setThumbnails(new Map());
+  }, []);
+
   // Clear cache
   const clearCache = useCallback(() => {
-    if (workerRef.current) {
-      workerRef.current.postMessage({ type: 'clear_cache' });
-      setThumbnails(new Map());
-    }
+    workerScheduler.broadcast('thumbnail', { type: 'close_all' });
+    clearThumbnailCache().catch((error) => console.warn('Failed to clear thumbnail cache:', error));
+    urlsRef.current.forEach((url) => URL.revokeObjectURL(url));
+    urlsRef.current.clear();
+    setThumbnails(new Map());
   }, []);
 
   // Get specific thumbnail
@@ -147,8 +227,10 @@ export const useThumbnailWorker = (options: UseThumbnailWorkerOptions = {}) => {
     generateBatch,
     getThumbnail,
     thumbnails,
+    closeDocument,
+    reset,
     clearCache,
-    isWorkerReady,
+    isWorkerReady: typeof Worker !== 'undefined',
   };
 };
 
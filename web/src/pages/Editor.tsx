@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import Header from '@/components/Header';
 import PDFViewer from '@/components/PDFViewer';
@@ -11,14 +11,18 @@ import EnhancedLoadingScreen from '@/components/EnhancedLoadingScreen';
 import { useEditorStore } from '@/context/editorContext';
 import { useFileStore } from '@/context/fileContext';
 import { useKeyboardShortcuts } from '@/hooks/useKeyboardShortcuts';
+import { applyEditPlan, EditPlan } from '@/utils/editPlan';
 import toast from 'react-hot-toast';
 import { motion } from 'framer-motion';
 import { FaDownload } from 'react-icons/fa';
 
+// Quiet period before pending edits are applied to the preview
+const PREVIEW_DELAY_MS = 600;
+
 const EditorPage: React.FC = () => {
   const { fileId } = useParams();
   const navigate = useNavigate();
-  const { currentFile, setCurrentFile, pages } = useEditorStore();
+  const { currentFile, setCurrentFile, pages, editPlan, setLoading } = useEditorStore();
   const { files } = useFileStore();
   const [layout, setLayout] = useState<'vertical' | 'horizontal'>('vertical');
   const [showKeyboardHelp, setShowKeyboardHelp] = useState(false);
@@ -26,6 +30,8 @@ const EditorPage: React.FC = () => {
   const [showSplitModal, setShowSplitModal] = useState(false);
   const [isMobile, setIsMobile] = useState(false);
   const [showThumbnails, setShowThumbnails] = useState(true);
+  // Plan whose result is currently shown as currentFile.blob
+  const materializedPlanRef = useRef<EditPlan | null>(null);
 
   // Detect mobile viewport
   useEffect(() => {
@@ -53,6 +59,36 @@ const EditorPage: React.FC = () => {
     setCurrentFile(file);
   }, [fileId, files, navigate, setCurrentFile]);
 
+  // Apply the latest edit plan to the preview once edits pause
+  const materialize = async (plan: EditPlan): Promise<Blob | undefined> => {
+    const file = useEditorStore.getState().currentFile;
+    if (!file) return undefined;
+    if (materializedPlanRef.current === plan) return file.blob;
+
+    setLoading(true);
+    try {
+      const blob = await applyEditPlan(plan);
+      // A newer edit may have arrived while this one was saving
+      if (useEditorStore.getState().editPlan !== plan) return undefined;
+      materializedPlanRef.current = plan;
+      setCurrentFile({ ...file, blob, size: blob.size, pages: plan.pages.length });
+      return blob;
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  useEffect(() => {
+    if (!editPlan || materializedPlanRef.current === editPlan) return;
+    const timer = setTimeout(() => {
+      materialize(editPlan).catch((error) => {
+        toast.error('Failed to apply edits');
+        console.error(error);
+      });
+    }, PREVIEW_DELAY_MS);
+    return () => clearTimeout(timer);
+  }, [editPlan]);
+
   // Keyboard shortcuts
   useKeyboardShortcuts({
     onRotate: () => {
@@ -81,8 +117,11 @@ const EditorPage: React.FC = () => {
     }
 
     try {
+      // Pending edits are applied before export
+      const blob = (editPlan && (await materialize(editPlan))) || currentFile.blob;
+
       // Create download link
-      const url = URL.createObjectURL(currentFile.blob);
+      const url = URL.createObjectURL(blob);
       const link = document.createElement('a');
       link.href = url;
       link.download = `${currentFile.name.replace('.pdf', '')}-edited.pdf`;
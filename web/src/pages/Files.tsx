@@ -181,7 +181,10 @@ const Files: React.FC = () => {
                   </h3>
 
                   <div className={`text-sm mb-3 space-y-1 ${isDarkMode ? 'text-gray-400' : 'text-gray-600'}`}>
-                    <p>{formatFileSize(file.size)}</p>
+                    <p>
+                      {formatFileSize(file.size)}
+                      {file.pages ? ` · ${file.pages} page${file.pages !== 1 ? 's' : ''}` : ''}
+                    </p>
                     <p className="flex items-center gap-2">
                       <FiClock size={14} />
                       {formatDate(file.uploadedAt)}
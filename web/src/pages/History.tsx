@@ -7,6 +7,7 @@ import toast from 'react-hot-toast';
 import { useAuthStore } from '@/context/authContext';
 import { collection, query, where, orderBy, limit, getDocs } from 'firebase/firestore';
 import { db } from '@/utils/firebase';
+import { flushActionLogs } from '@/utils/actionLogger';
 
 interface HistoryItem {
   id: string;
@@ -33,6 +34,9 @@ const History: React.FC = () => {
       if (!user?.uid) return;
       
       try {
+        // Write any buffered actions first so the list includes them
+        await flushActionLogs();
+
         const q = query(
           collection(db, 'audit_logs'),
           where('userId', '==', user.uid),
@@ -17,19 +17,20 @@ import {
   FiArrowLeft,
 } from 'react-icons/fi';
 import { PDFDocument, degrees } from 'pdf-lib';
-import * as pdfjsLib from 'pdfjs-dist';
 import Navbar from '@/components/Navbar';
 import Sidebar from '@/components/Sidebar';
 import toast from 'react-hot-toast';
+import { requestThumbnails } from '@/hooks/useThumbnailWorker';
 
-// Setup PDF.js worker
-pdfjsLib.GlobalWorkerOptions.workerSrc = `//cdnjs.cloudflare.com/ajax/libs/pdf.js/${pdfjsLib.version}/pdf.worker.min.js`;
+// Preview render box (US Letter at 72 DPI; never upscaled)
+const PREVIEW_WIDTH = 612;
+const PREVIEW_HEIGHT = 792;
 
 interface MergeFile {
   id: string;
   file: File;
   pages: number;
-  preview?: string;
+  preview?: string; // Object URL, revoked when the file is removed
   rotations: { [pageNum: number]: number }; // page number -> rotation in degrees
 }
 
@@ -43,76 +44,51 @@ const MergeAdvanced: React.FC = () => {
   const [isProcessing, setIsProcessing] = useState(false);
   const [mergeProgress, setMergeProgress] = useState(0);
 
-  // Get PDF page count
-  const getPdfPageCount = async (file: File): Promise<number> => {
-    return new Promise((resolve, reject) => {
-      const fileReader = new FileReader();
-      fileReader.onload = async (e) => {
-        try {
-          const pdf = await pdfjsLib.getDocument(e.target?.result as ArrayBuffer).promise;
-          resolve(pdf.numPages);
-        } catch (error) {
-          reject(error);
-        }
-      };
-      fileReader.readAsArrayBuffer(file);
-    });
-  };
-
-  // Generate preview for first page
-  const generatePreview = async (file: File): Promise<string> => {
-    return new Promise((resolve, reject) => {
-      const fileReader = new FileReader();
-      fileReader.onload = async (e) => {
-        try {
-          const pdf = await pdfjsLib.getDocument(e.target?.result as ArrayBuffer).promise;
-          const page = await pdf.getPage(1);
-          const canvas = document.createElement('canvas');
-          const context = canvas.getContext('2d');
-          const viewport = page.getViewport({ scale: 1 });
-          canvas.width = viewport.width;
-          canvas.height = viewport.height;
-
-          await page.render({ canvasContext: context!, viewport }).promise;
-          resolve(canvas.toDataURL());
-        } catch (error) {
-          reject(error);
-        }
-      };
-      fileReader.readAsArrayBuffer(file);
+  // Page count and first-page preview in one pass, on the shared worker pool
+  const inspectFile = async (file: File): Promise<{ pages: number; preview?: string }> => {
+    const { numPages, thumbnails } = await requestThumbnails(file, 1, 1, {
+      width: PREVIEW_WIDTH,
+      height: PREVIEW_HEIGHT,
+      priority: 'user',
     });
+    if (!numPages) {
+      throw new Error(thumbnails[0]?.error || 'Failed to read PDF');
+    }
+    const image = thumbnails[0]?.image;
+    return { pages: numPages, preview: image ? URL.createObjectURL(image) : undefined };
   };
 
   // Handle file selection
   const handleFileSelect = async (selectedFiles: FileList | null) => {
     if (!selectedFiles) return;
 
-    const newFiles: MergeFile[] = [];
-
-    for (let i = 0; i < selectedFiles.length; i++) {
-      const file = selectedFiles[i];
-      if (file.type !== 'application/pdf') {
-        toast.error(`${file.name} is not a PDF`);
-        continue;
-      }
-
-      try {
-        const pageCount = await getPdfPageCount(file);
-        const preview = await generatePreview(file);
+    const batchId = Date.now();
+    // Files are inspected concurrently, bounded by the worker pool
+    const results = await Promise.all(
+      Array.from(selectedFiles).map(async (file, i): Promise<MergeFile | null> => {
+        if (file.type !== 'application/pdf') {
+          toast.error(`${file.name} is not a PDF`);
+          return null;
+        }
 
-        newFiles.push({
-          id: `${Date.now()}-${i}`,
-          file,
-          pages: pageCount,
-          preview,
-          rotations: {},
-        });
-      } catch (error) {
-        toast.error(`Failed to process ${file.name}`);
-      }
-    }
+        try {
+          const { pages, preview } = await inspectFile(file);
+          return {
+            id: `${batchId}-${i}`,
+            file,
+            pages,
+            preview,
+            rotations: {},
+          };
+        } catch (error) {
+          toast.error(`Failed to process ${file.name}`);
+          return null;
+        }
+      })
+    );
+    const newFiles = results.filter((file): file is MergeFile => file !== null);
 
-    setFiles([...files, ...newFiles]);
+    setFiles((prev) => [...prev, ...newFiles]);
     if (newFiles.length > 0 && !selectedFileId) {
       setSelectedFileId(newFiles[0].id);
     }
@@ -139,6 +115,8 @@ const MergeAdvanced: React.FC = () => {
   // Remove file
   const removeFile = (index: number) => {
     const newFiles = files.filter((_, i) => i !== index);
+    const { preview } = files[index];
+    if (preview) URL.revokeObjectURL(preview);
     setFiles(newFiles);
     if (selectedFileId === files[index].id) {
       setSelectedFileId(newFiles[0]?.id || null);
@@ -201,6 +179,7 @@ const MergeAdvanced: React.FC = () => {
 
       toast.success('PDFs merged and downloaded successfully!');
       setMergeProgress(0);
+      files.forEach((mergeFile) => mergeFile.preview && URL.revokeObjectURL(mergeFile.preview));
       setFiles([]);
       setSelectedFileId(null);
     } catch (error: any) {
@@ -13,6 +13,7 @@ import Sidebar from '@/components/Sidebar';
 import toast from 'react-hot-toast';
 import { PDFDocument } from 'pdf-lib';
 import * as pdfjsLib from 'pdfjs-dist';
+import { usePDFWorker } from '@/hooks/usePDFWorker';
 import { logSplitAction } from '@/utils/actionLogger';
 import { useAuthStore } from '@/context/authContext';
 
@@ -50,6 +51,7 @@ const Split: React.FC = () => {
   const [splitBySize, setSplitBySize] = useState<number>(5); // MB
   const [isDarkMode, setIsDarkMode] = useState(true);
   const [isSplitting, setIsSplitting] = useState(false);
+  const pdfWorker = usePDFWorker();
   const [isLoadingPreviews, setIsLoadingPreviews] = useState(false);
 
   // Load PDF and get page count + previews
@@ -221,8 +223,8 @@ const Split: React.FC = () => {
     const startTime = Date.now();
 
     try {
-      const arrayBuffer = await selectedFile.arrayBuffer();
-      const originalPdf = await PDFDocument.load(arrayBuffer);
+      // Single-output modes parse the source here; splits parse it in the workers
+      const loadOriginal = async () => PDFDocument.load(await selectedFile.arrayBuffer());
 
       // Check if user manually selected pages
       const selectedPages = pagePreviews.filter((p) => p.selected);
@@ -230,6 +232,7 @@ const Split: React.FC = () => {
 
       if (hasManualSelection) {
         // Manual selection mode - extract selected pages only
+        const originalPdf = await loadOriginal();
         const selectedPdf = await PDFDocument.create();
         const selectedPageIndices = selectedPages.map((p) => p.pageNumber - 1);
         const copiedPages = await selectedPdf.copyPages(originalPdf, selectedPageIndices);
@@ -281,6 +284,7 @@ const Split: React.FC = () => {
 
       if (mergeRanges && splitMode === 'range') {
         // Merge all ranges into one PDF
+        const originalPdf = await loadOriginal();
         const mergedPdf = await PDFDocument.create();
         
         for (const range of ranges) {
@@ -318,27 +322,15 @@ const Split: React.FC = () => {
         // Split into separate PDFs
         let totalOutputSize = 0;
 
-        for (let i = 0; i < ranges.length; i++) {
-          const range = ranges[i];
-          const splitPdf = await PDFDocument.create();
-
-          const pageIndices = Array.from(
-            { length: range.to - range.from + 1 },
-            (_, idx) => range.from - 1 + idx
-          );
-
-          const pages = await splitPdf.copyPages(originalPdf, pageIndices);
-          pages.forEach((page) => splitPdf.addPage(page));
-
-          const pdfBytes = await splitPdf.save();
-          const blob = new Blob([pdfBytes as BlobPart], { type: 'application/pdf' });
-          totalOutputSize += blob.size;
+        // Parts are built on several workers and downloaded as each one is saved
+        for await (const part of pdfWorker.splitPDFStreaming(selectedFile, ranges)) {
+          totalOutputSize += part.blob.size;
 
           // Download each split
-          const url = URL.createObjectURL(blob);
+          const url = URL.createObjectURL(part.blob);
           const link = document.createElement('a');
           link.href = url;
-          link.download = `${selectedFile.name.replace('.pdf', '')}_part_${i + 1}_pages_${range.from}-${range.to}.pdf`;
+          link.download = `${selectedFile.name.replace('.pdf', '')}_part_${part.index + 1}_pages_${part.from}-${part.to}.pdf`;
           link.click();
           URL.revokeObjectURL(url);
 
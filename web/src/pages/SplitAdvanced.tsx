@@ -17,8 +17,9 @@ import {
   FiPlus,
   FiMinus,
 } from 'react-icons/fi';
-import { PDFDocument, degrees } from 'pdf-lib';
 import * as pdfjsLib from 'pdfjs-dist';
+import { PageSpan } from '@/utils/pdfOperations';
+import { usePDFWorker } from '@/hooks/usePDFWorker';
 import Navbar from '@/components/Navbar';
 import Sidebar from '@/components/Sidebar';
 import toast from 'react-hot-toast';
@@ -44,6 +45,7 @@ const SplitAdvanced: React.FC = () => {
   const [pagePreviewUrl, setPagePreviewUrl] = useState<string | null>(null);
   const [isProcessing, setIsProcessing] = useState(false);
   const [splitProgress, setSplitProgress] = useState(0);
+  const pdfWorker = usePDFWorker();
 
   const [config, setConfig] = useState<SplitConfig>({
     mode: 'extract',
@@ -160,8 +162,6 @@ const SplitAdvanced: React.FC = () => {
     setSplitProgress(0);
 
     try {
-      const fileArrayBuffer = await file.arrayBuffer();
-      const sourcePdf = await PDFDocument.load(fileArrayBuffer);
       let pagesToExtract: number[] = [];
 
       if (config.mode === 'extract') {
@@ -178,55 +178,37 @@ const SplitAdvanced: React.FC = () => {
         return;
       }
 
-      // Create PDFs for each group
-      let currentIndex = 0;
+      // Determine page range for each group
       const totalGroups = config.mode === 'extract' ? 1 : Math.ceil(pageCount / config.splitEvery);
+      const ranges: PageSpan[] = [];
 
       for (let groupIndex = 0; groupIndex < totalGroups; groupIndex++) {
-        const newPdf = await PDFDocument.create();
-
-        // Determine page range for this group
-        let startPage: number;
-        let endPage: number;
-
         if (config.mode === 'extract') {
-          startPage = pagesToExtract[0];
-          endPage = pagesToExtract[pagesToExtract.length - 1];
+          ranges.push({ from: pagesToExtract[0], to: pagesToExtract[pagesToExtract.length - 1] });
         } else {
-          startPage = groupIndex * config.splitEvery + 1;
-          endPage = Math.min((groupIndex + 1) * config.splitEvery, pageCount);
+          ranges.push({
+            from: groupIndex * config.splitEvery + 1,
+            to: Math.min((groupIndex + 1) * config.splitEvery, pageCount),
+          });
         }
+      }
 
-        const indicesToCopy: number[] = [];
-        for (let i = startPage; i <= endPage; i++) {
-          indicesToCopy.push(i - 1); // PDF indices are 0-based
-        }
+      // Parts are built on several workers and downloaded as each one is saved
+      const parts = pdfWorker.splitPDFStreaming(file, ranges, { rotations: config.rotations });
+      let partsDone = 0;
 
-        const copiedPages = await newPdf.copyPages(sourcePdf, indicesToCopy);
-
-        copiedPages.forEach((page, idx) => {
-          const pageNum = indicesToCopy[idx] + 1;
-          const rotation = config.rotations[pageNum] || 0;
-          if (rotation !== 0) {
-            page.setRotation(degrees(rotation));
-          }
-          newPdf.addPage(page);
-        });
-
-        // Download this PDF
-        const pdfBytes = await newPdf.save();
-        const blob = new Blob([new Uint8Array(pdfBytes)], { type: 'application/pdf' });
-        const url = URL.createObjectURL(blob);
+      for await (const part of parts) {
+        const url = URL.createObjectURL(part.blob);
         const link = document.createElement('a');
         link.href = url;
-        link.download = `split_${groupIndex + 1}_${Date.now()}.pdf`;
+        link.download = `split_${part.index + 1}_${Date.now()}.pdf`;
         document.body.appendChild(link);
         link.click();
         document.body.removeChild(link);
         URL.revokeObjectURL(url);
 
-        currentIndex++;
-        setSplitProgress((currentIndex / totalGroups) * 100);
+        // Parts can finish out of order
+        setSplitProgress((++partsDone / part.total) * 100);
       }
 
       toast.success(`Successfully split PDF into ${totalGroups} file(s)!`);
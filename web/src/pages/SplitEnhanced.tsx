@@ -17,13 +17,13 @@ import {
   FiZap,
   FiFilter,
 } from 'react-icons/fi';
-import { PDFDocument, degrees } from 'pdf-lib';
 import * as pdfjsLib from 'pdfjs-dist';
 import Navbar from '@/components/Navbar';
 import Sidebar from '@/components/Sidebar';
 import toast from 'react-hot-toast';
 import { logSplitAction } from '@/utils/actionLogger';
 import { useAuthStore } from '@/context/authContext';
+import { usePDFWorker } from '@/hooks/usePDFWorker';
 
 // Setup PDF.js worker
 pdfjsLib.GlobalWorkerOptions.workerSrc = `//cdnjs.cloudflare.com/ajax/libs/pdf.js/${pdfjsLib.version}/pdf.worker.min.js`;
@@ -46,6 +46,7 @@ const SplitEnhanced: React.FC = () => {
   const [isProcessing, setIsProcessing] = useState(false);
   const [splitProgress, setSplitProgress] = useState(0);
   const [isDragging, setIsDragging] = useState(false);
+  const pdfWorker = usePDFWorker();
 
   // Advanced Split Options
   const [splitMode, setSplitMode] = useState<'manual' | 'size' | 'even-odd' | 'auto'>('manual');
@@ -199,27 +200,25 @@ const SplitEnhanced: React.FC = () => {
     const startTime = Date.now();
 
     try {
-      const fileArrayBuffer = await file.arrayBuffer();
-      const sourcePdf = await PDFDocument.load(fileArrayBuffer);
       const inputSize = file.size;
 
-      // Create PDF with selected pages
-      const newPdf = await PDFDocument.create();
-      const selectedPageIndices = selectedPages.map((p) => p.pageNumber - 1);
-      const copiedPages = await newPdf.copyPages(sourcePdf, selectedPageIndices);
+      // One part with the selected pages, built by the same split engine
+      const pageNumbers = selectedPages.map((p) => p.pageNumber);
+      const rotations = Object.fromEntries(selectedPages.map((p) => [p.pageNumber, p.rotation]));
+      const parts = pdfWorker.splitPDFStreaming(
+        file,
+        [{ from: Math.min(...pageNumbers), to: Math.max(...pageNumbers), pages: pageNumbers }],
+        { rotations }
+      );
 
-      copiedPages.forEach((page, index) => {
-        newPdf.addPage(page);
-        const pageRotation = selectedPages[index].rotation;
-        if (pageRotation !== 0) {
-          page.setRotation(degrees(pageRotation));
-        }
-        setSplitProgress(((index + 1) / selectedPages.length) * 100);
-      });
+      let blob: Blob | undefined;
+      for await (const part of parts) {
+        blob = part.blob;
+      }
+      if (!blob) throw new Error('Split produced no output');
+      setSplitProgress(100);
 
       // Download PDF
-      const pdfBytes = await newPdf.save();
-      const blob = new Blob([new Uint8Array(pdfBytes)], { type: 'application/pdf' });
       const outputSize = blob.size;
       const duration = Date.now() - startTime;
 
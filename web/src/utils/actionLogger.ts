@@ -2,10 +2,10 @@
  * Action Logger - Firestore Integration
  * Logs user PDF operations with metadata only (no file contents)
  * Data Logged: Session ID, Action, Timestamp, File Stats, Duration
+ * Entries are buffered and written in batches (see logBuffer)
  */
 
-import { collection, addDoc, serverTimestamp } from 'firebase/firestore';
-import { db } from './firebase';
+import { getLogBuffer, LogBufferStats } from './logBuffer';
 
 // Generate anonymous session ID
 const getSessionId = (): string => {
@@ -20,7 +20,7 @@ const getSessionId = (): string => {
 export interface ActionLog {
   userId: string; // Now stores sessionId for anonymous users
   action: 'merge' | 'split' | 'convert' | 'download' | 'page_remove';
-  timestamp: any; // Firestore serverTimestamp
+  timestamp: any; // Client time of the action, set when the entry is flushed
   status: 'success' | 'error';
   pages?: number;
   inputSize?: number; // bytes
@@ -33,7 +33,7 @@ export interface ActionLog {
 }
 
 /**
- * Log action to Firestore
+ * Queue an action log for the next batched Firestore write
  * @param userId - Current user ID (optional, will use session ID if not provided)
  * @param action - Type of action performed
  * @param data - Action metadata
@@ -46,16 +46,14 @@ export const logAction = async (
   try {
     const sessionId = userId || getSessionId();
     
-    const logEntry: ActionLog = {
+    const logEntry: Omit<ActionLog, 'timestamp'> = {
       userId: sessionId,
       action,
-      timestamp: serverTimestamp(),
       ...data,
     };
 
-    // Add to Firestore audit_logs collection
-    await addDoc(collection(db, 'audit_logs'), logEntry);
-    console.log(`✓ Action logged: ${action} for session ${sessionId}`);
+    // Buffered for the audit_logs collection
+    getLogBuffer().add('audit_logs', logEntry);
   } catch (error) {
     console.error('Failed to log action:', error);
     // Don't throw - logging should not break the app
@@ -175,3 +173,13 @@ export const logPageRemoveAction = async (
     errorMessage,
   });
 };
+
+/**
+ * Flushed, dropped and waiting log counts
+ */
+export const getActionLogStats = (): LogBufferStats => getLogBuffer().getStats();
+
+/**
+ * Write buffered logs now (e.g. before sign-out)
+ */
+export const flushActionLogs = (): Promise<void> => getLogBuffer().flush();
@@ -1,10 +1,16 @@
 /**
  * Cloud Function Utilities
  * Client-side helpers for calling server-side conversion functions
+ *
+ * Every call is traced: the traceparent goes out with the payload and the
+ * function's spans come back in the response (see tracing.ts).
  */
 
 import { httpsCallable } from 'firebase/functions';
-import { functions } from './firebase';
+import { collection, doc, onSnapshot } from 'firebase/firestore';
+import { getBlob, ref, uploadBytesResumable } from 'firebase/storage';
+import { db, functions, storage } from './firebase';
+import { SpanRecord, TraceContext, formatTraceparent, recordSpans, withSpan } from './tracing';
 
 interface ConversionResponse {
   success: boolean;
@@ -14,6 +20,34 @@ interface ConversionResponse {
   error?: string;
 }
 
+/**
+ * Call a function inside a span, passing the trace along and keeping the
+ * spans the function sends back
+ */
+async function callTraced<T extends { spans?: SpanRecord[] }>(
+  name: string,
+  data: Record<string, unknown>,
+  trace: TraceContext,
+  timeout?: number
+): Promise<T> {
+  return withSpan(`function.${name}`, trace, async (span) => {
+    const callable = httpsCallable(functions, name, timeout ? { timeout } : undefined);
+    const result = await callable({ ...data, traceparent: formatTraceparent(span.context) });
+    const response = result.data as T;
+    if (response.spans) recordSpans(response.spans);
+    return response;
+  });
+}
+
+export interface BatchItemUpdate {
+  index: number;
+  status: 'queued' | 'processing' | 'retrying' | 'completed' | 'failed';
+  fileName: string;
+  attempts: number;
+  pdfUrl?: string;
+  error?: string;
+}
+
 /**
  * Convert a single file to PDF
  * Calls the convertToPDF cloud function
@@ -21,18 +55,21 @@ interface ConversionResponse {
 export async function convertFileToPDF(
   sourceFileUrl: string,
   sourceFileName: string,
-  sourceFileType: string
+  sourceFileType: string,
+  trace?: TraceContext
 ): Promise<ConversionResponse> {
   try {
-    const convertToPDF = httpsCallable(functions, 'convertToPDF');
-
-    const result = await convertToPDF({
-      sourceFileUrl,
-      sourceFileName,
-      sourceFileType,
-    });
-
-    return result.data as ConversionResponse;
+    return await withSpan(
+      'convert.file',
+      trace,
+      (span) =>
+        callTraced<ConversionResponse>(
+          'convertToPDF',
+          { sourceFileUrl, sourceFileName, sourceFileType },
+          span.context
+        ),
+      { fileName: sourceFileName }
+    );
   } catch (error) {
     console.error('Conversion error:', error);
     return {
@@ -44,26 +81,58 @@ export async function convertFileToPDF(
 
 /**
  * Convert multiple files to PDF in batch
- * Calls the batchConvertToPDF cloud function
+ * Calls the batchConvertToPDF cloud function; onItem fires as each file
+ * changes status on the server, so results can be shown before the batch ends
  */
 export async function batchConvertToPDF(
   conversions: Array<{
     sourceFileUrl: string;
     sourceFileName: string;
     sourceFileType: string;
-  }>
+  }>,
+  onItem?: (item: BatchItemUpdate) => void,
+  trace?: TraceContext
 ): Promise<ConversionResponse[]> {
-  try {
-    const batchConvertToPDF = httpsCallable(functions, 'batchConvertToPDF');
+  // Pick the batch ID up front so we can listen before the call returns
+  const batchId = doc(collection(db, 'conversionBatches')).id;
+  const seen = new Map<number, string>();
+
+  const unsubscribe = onItem
+    ? onSnapshot(
+        doc(db, 'conversionBatches', batchId),
+        (snapshot) => {
+          const items = (snapshot.data()?.items ?? {}) as Record<string, BatchItemUpdate>;
+          Object.values(items).forEach((item) => {
+            const key = `${item.status}:${item.attempts}`;
+            if (seen.get(item.index) === key) return;
+            seen.set(item.index, key);
+            onItem(item);
+          });
+        },
+        (error) => console.warn('Batch progress listener failed:', error)
+      )
+    : undefined;
 
-    const result = await batchConvertToPDF({
-      conversions: conversions.map(c => ({
-        ...c,
-        userId: '', // Will be set by cloud function via context.auth
-      })),
-    });
+  try {
+    const response = await withSpan(
+      'convert.batch',
+      trace,
+      (span) =>
+        callTraced<{ results: ConversionResponse[]; spans?: SpanRecord[] }>(
+          'batchConvertToPDF',
+          {
+            batchId,
+            conversions: conversions.map(c => ({
+              ...c,
+              userId: '', // Will be set by cloud function via context.auth
+            })),
+          },
+          span.context,
+          540_000
+        ),
+      { batchId, files: conversions.length }
+    );
 
-    const response = result.data as { results: ConversionResponse[] };
     return response.results;
   } catch (error) {
     console.error('Batch conversion error:', error);
@@ -73,9 +142,78 @@ export async function batchConvertToPDF(
         error: error instanceof Error ? error.message : 'Batch conversion failed',
       },
     ];
+  } finally {
+    unsubscribe?.();
   }
 }
 
+interface StoredConversionResponse {
+  success: boolean;
+  storagePath: string;
+  fileName: string;
+  inputSize: number;
+  outputSize: number;
+  spans?: SpanRecord[];
+}
+
+// Largest file convertStoredDocument accepts; storage.rules enforces the same
+// limit on uploads/temp, so larger files are rejected before uploading
+export const MAX_OFFICE_CONVERSION_BYTES = 100 * 1024 * 1024;
+
+/**
+ * Convert an Office document with the convertStoredDocument function
+ * The file is uploaded to Storage as binary and the PDF is fetched back as a
+ * Blob, so nothing is base64-encoded in either direction. Files larger than
+ * MAX_OFFICE_CONVERSION_BYTES are rejected.
+ */
+export async function convertOfficeDocument(
+  file: File,
+  userId: string,
+  onUploadProgress?: (progress: number) => void,
+  trace?: TraceContext
+): Promise<{ blob: Blob; fileName: string }> {
+  if (file.size > MAX_OFFICE_CONVERSION_BYTES) {
+    throw new Error(
+      `${file.name} is larger than the ${MAX_OFFICE_CONVERSION_BYTES / (1024 * 1024)}MB conversion limit`
+    );
+  }
+
+  return withSpan(
+    'convert.office',
+    trace,
+    async (span) => {
+      const sourceRef = ref(storage, `uploads/temp/${userId}/${Date.now()}_${file.name}`);
+      await withSpan(
+        'storage.upload',
+        span.context,
+        async () => {
+          const upload = uploadBytesResumable(sourceRef, file, { contentType: file.type });
+          upload.on('state_changed', (snapshot) => {
+            onUploadProgress?.((snapshot.bytesTransferred / snapshot.totalBytes) * 100);
+          });
+          await upload;
+        },
+        { bytes: file.size }
+      );
+
+      const response = await callTraced<StoredConversionResponse>(
+        'convertStoredDocument',
+        { storagePath: sourceRef.fullPath, fileName: file.name },
+        span.context,
+        300_000
+      );
+
+      const blob = await withSpan('storage.download', span.context, async (download) => {
+        const pdf = await getBlob(ref(storage, response.storagePath));
+        download.setAttributes({ bytes: pdf.size });
+        return pdf;
+      });
+      return { blob, fileName: response.fileName };
+    },
+    { fileName: file.name }
+  );
+}
+
 /**
  * Determine if a file requires server-side conversion
  */
@@ -159,6 +297,7 @@ export async function monitorConversionProgress(
 export default {
   convertFileToPDF,
   batchConvertToPDF,
+  convertOfficeDocument,
   requiresServerConversion,
   getConversionStatusMessage,
   cancelConversion,
@@ -0,0 +1,334 @@
+/**
+ * Collaboration Sync
+ * Keeps one collaboration session's presence and edits in sync through
+ * Firestore at a bounded write rate
+ *
+ * - Edits go out as compact deltas (see pageOps.ts); everything queued
+ *   within one flush interval is written as a single changes document
+ * - Presence (cursor, current page) is coalesced: only the latest value is
+ *   written, at most once per presence interval, plus an idle heartbeat
+ * - Whatever is due at a flush is committed in one writeBatch, so a flush
+ *   writes at most two documents
+ * - Both intervals stretch with the participant count, keeping the whole
+ *   session within sessionWritesPerSecond however many people join
+ * - One listener for participants and one for changes; remote changes are
+ *   delivered once per snapshot, so a burst arrives as one update
+ */
+
+import {
+  collection,
+  doc,
+  onSnapshot,
+  orderBy,
+  query,
+  serverTimestamp,
+  setDoc,
+  writeBatch,
+  Timestamp,
+  Unsubscribe,
+} from 'firebase/firestore';
+import { db } from './firebase';
+
+export interface UserPresence {
+  userId: string;
+  userName: string;
+  userEmail: string;
+  color: string;
+  lastSeen: number;
+  isOnline: boolean;
+  currentPage?: number;
+  cursor?: { x: number; y: number } | null;
+}
+
+export interface ChangeEvent {
+  id: string;
+  userId: string;
+  type: 'page-rotate' | 'page-delete' | 'page-reorder' | 'annotation' | 'text-change';
+  data: any;
+  timestamp: number;
+}
+
+export type ChangeDelta = Omit<ChangeEvent, 'id' | 'userId' | 'timestamp'>;
+
+export interface CollabSyncOptions {
+  flushIntervalMs: number; // Minimum gap between this client's writes
+  presenceIntervalMs: number; // Minimum gap between presence writes
+  heartbeatMs: number; // Idle clients refresh lastSeen this often
+  sessionWritesPerSecond: number; // Shared by every participant in the session
+}
+
+export const DEFAULT_COLLAB_SYNC_OPTIONS: CollabSyncOptions = {
+  flushIntervalMs: 200,
+  presenceIntervalMs: 1000,
+  heartbeatMs: 10_000,
+  sessionWritesPerSecond: 20,
+};
+
+export interface CollabSyncStats {
+  changesQueued: number;
+  changeWrites: number; // Changes documents written
+  presenceWrites: number;
+  presenceCoalesced: number; // Presence updates replaced before being written
+  changesReceived: number;
+  failedFlushes: number;
+}
+
+interface ChangeBatch {
+  userId: string;
+  clientId: string;
+  changes: ChangeDelta[];
+  at: Timestamp | null; // Null locally until the server assigns it
+}
+
+export const PRESENCE_TIMEOUT = 30000; // 30 seconds
+
+// Keeps a changes document far below Firestore's 1MB limit
+const MAX_CHANGES_PER_WRITE = 200;
+
+type Listener<T> = (value: T) => void;
+
+export class CollabSync {
+  readonly options: CollabSyncOptions;
+  private readonly clientId = doc(collection(db, 'collab_sessions')).id;
+  private pendingChanges: ChangeDelta[] = [];
+  private pendingPresence: Partial<UserPresence> | null = null;
+  private lastChangeWrite = 0;
+  private lastPresenceWrite = 0;
+  private timer: ReturnType<typeof setTimeout> | null = null;
+  private heartbeat: ReturnType<typeof setInterval> | null = null;
+  private flushing: Promise<void> | null = null;
+  private stopped = false;
+  private participants = new Map<string, UserPresence>();
+  private unsubscribers: Unsubscribe[] = [];
+  private participantListeners = new Set<Listener<Map<string, UserPresence>>>();
+  private changeListeners = new Set<Listener<ChangeEvent[]>>();
+  private counters = {
+    changesQueued: 0,
+    changeWrites: 0,
+    presenceWrites: 0,
+    presenceCoalesced: 0,
+    changesReceived: 0,
+    failedFlushes: 0,
+  };
+
+  constructor(
+    readonly sessionId: string,
+    private readonly self: UserPresence,
+    options: Partial<CollabSyncOptions> = {}
+  ) {
+    this.options = { ...DEFAULT_COLLAB_SYNC_OPTIONS, ...options };
+  }
+
+  /**
+   * Write our presence and start listening to the session
+   */
+  async start(): Promise<void> {
+    await setDoc(this.presenceDoc(), { ...this.self, isOnline: true, lastSeen: Date.now() });
+    this.lastPresenceWrite = Date.now();
+    this.counters.presenceWrites++;
+
+    this.unsubscribers.push(
+      onSnapshot(collection(db, 'collab_sessions', this.sessionId, 'participants'), (snapshot) => {
+        const changes = snapshot.docChanges();
+        if (changes.length === 0) return;
+        changes.forEach((change) => {
+          if (change.type === 'removed') this.participants.delete(change.doc.id);
+          else this.participants.set(change.doc.id, change.doc.data() as UserPresence);
+        });
+        const online = this.onlineParticipants();
+        this.participantListeners.forEach((listener) => listener(online));
+      })
+    );
+
+    const changesQuery = query(collection(db, 'collab_sessions', this.sessionId, 'changes'), orderBy('at'));
+    this.unsubscribers.push(
+      onSnapshot(changesQuery, (snapshot) => {
+        const received: ChangeEvent[] = [];
+        snapshot.docChanges().forEach((change) => {
+          if (change.type !== 'added') return;
+          const batch = change.doc.data() as ChangeBatch;
+          // Our own changes were applied locally when they were queued
+          if (batch.clientId === this.clientId) return;
+          batch.changes.forEach((delta, index) => {
+            received.push({
+              ...delta,
+              id: `${change.doc.id}:${index}`,
+              userId: batch.userId,
+              timestamp: batch.at?.toMillis() ?? Date.now(),
+            });
+          });
+        });
+        if (received.length === 0) return;
+        this.counters.changesReceived += received.length;
+        this.changeListeners.forEach((listener) => listener(received));
+      })
+    );
+
+    this.heartbeat = setInterval(() => {
+      if (!this.pendingPresence && Date.now() - this.lastPresenceWrite >= this.options.heartbeatMs) {
+        this.updatePresence({});
+      }
+    }, this.options.heartbeatMs);
+  }
+
+  /**
+   * Called with the online participants whenever presence changes
+   */
+  onParticipants(listener: Listener<Map<string, UserPresence>>): () => void {
+    this.participantListeners.add(listener);
+    return () => this.participantListeners.delete(listener);
+  }
+
+  /**
+   * Called with each snapshot's worth of changes from other clients
+   */
+  onChanges(listener: Listener<ChangeEvent[]>): () => void {
+    this.changeListeners.add(listener);
+    return () => this.changeListeners.delete(listener);
+  }
+
+  /**
+   * Queue a change for the next flush
+   */
+  queueChange(change: ChangeDelta): void {
+    this.pendingChanges.push(change);
+    this.counters.changesQueued++;
+    this.schedule();
+  }
+
+  /**
+   * Merge a presence update into the pending one; only the latest is written
+   */
+  updatePresence(updates: Partial<UserPresence>): void {
+    if (this.pendingPresence) this.counters.presenceCoalesced++;
+    this.pendingPresence = { ...this.pendingPresence, ...updates };
+    this.schedule();
+  }
+
+  /**
+   * Write whatever is due; concurrent calls share the same flush
+   */
+  flush(force = false): Promise<void> {
+    if (!this.flushing) {
+      this.flushing = this.writeDue(force).finally(() => {
+        this.flushing = null;
+      });
+    }
+    return this.flushing;
+  }
+
+  /**
+   * Send anything pending, mark ourselves offline and stop listening
+   */
+  async stop(): Promise<void> {
+    this.stopped = true;
+    if (this.timer) clearTimeout(this.timer);
+    if (this.heartbeat) clearInterval(this.heartbeat);
+    this.timer = null;
+    this.heartbeat = null;
+    this.unsubscribers.forEach((unsubscribe) => unsubscribe());
+    this.unsubscribers = [];
+    this.participantListeners.clear();
+    this.changeListeners.clear();
+
+    await this.flushing;
+    this.pendingPresence = { ...this.pendingPresence, isOnline: false };
+    // Changes go out MAX_CHANGES_PER_WRITE at a time; give up on a failed write
+    while (this.pendingChanges.length > 0 || this.pendingPresence) {
+      const failures = this.counters.failedFlushes;
+      await this.flush(true);
+      if (this.counters.failedFlushes > failures) break;
+    }
+  }
+
+  getStats(): CollabSyncStats {
+    return { ...this.counters };
+  }
+
+  /**
+   * Gap between writes from this client; grows with the session so that
+   * participants x (2 writes / interval) stays within the session budget
+   */
+  private flushInterval(): number {
+    const participants = Math.max(1, this.onlineParticipants().size);
+    return Math.max(this.options.flushIntervalMs, (participants * 2 * 1000) / this.options.sessionWritesPerSecond);
+  }
+
+  private presenceInterval(): number {
+    return Math.max(this.options.presenceIntervalMs, this.flushInterval());
+  }
+
+  private schedule(): void {
+    if (this.timer || this.stopped) return;
+
+    const now = Date.now();
+    const due: number[] = [];
+    if (this.pendingChanges.length > 0) due.push(this.lastChangeWrite + this.flushInterval());
+    if (this.pendingPresence) due.push(this.lastPresenceWrite + this.presenceInterval());
+    if (due.length === 0) return;
+
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      void this.flush();
+    }, Math.max(0, Math.min(...due) - now));
+  }
+
+  private async writeDue(force: boolean): Promise<void> {
+    const now = Date.now();
+    const batch = writeBatch(db);
+    let changes: ChangeDelta[] = [];
+    let presence: Partial<UserPresence> | null = null;
+
+    if (this.pendingChanges.length > 0 && (force || now - this.lastChangeWrite >= this.flushInterval())) {
+      changes = this.pendingChanges.splice(0, MAX_CHANGES_PER_WRITE);
+      batch.set(doc(collection(db, 'collab_sessions', this.sessionId, 'changes')), {
+        userId: this.self.userId,
+        clientId: this.clientId,
+        changes,
+        at: serverTimestamp(),
+      });
+    }
+
+    if (this.pendingPresence && (force || now - this.lastPresenceWrite >= this.presenceInterval())) {
+      presence = this.pendingPresence;
+      this.pendingPresence = null;
+      batch.set(this.presenceDoc(), { ...presence, lastSeen: now }, { merge: true });
+    }
+
+    if (changes.length > 0 || presence) {
+      try {
+        await batch.commit();
+        if (changes.length > 0) {
+          this.lastChangeWrite = now;
+          this.counters.changeWrites++;
+        }
+        if (presence) {
+          this.lastPresenceWrite = now;
+          this.counters.presenceWrites++;
+        }
+      } catch (error) {
+        // Put everything back (newer presence wins) and retry on the next flush
+        this.counters.failedFlushes++;
+        console.warn('Collaboration sync failed:', error);
+        this.pendingChanges.unshift(...changes);
+        if (presence) this.pendingPresence = { ...presence, ...this.pendingPresence };
+        this.lastChangeWrite = this.lastPresenceWrite = now;
+      }
+    }
+
+    this.schedule();
+  }
+
+  private onlineParticipants(): Map<string, UserPresence> {
+    const now = Date.now();
+    return new Map(
+      Array.from(this.participants).filter(
+        ([, presence]) => presence.isOnline && now - presence.lastSeen < PRESENCE_TIMEOUT
+      )
+    );
+  }
+
+  private presenceDoc() {
+    return doc(db, 'collab_sessions', this.sessionId, 'participants', this.self.userId);
+  }
+}
@@ -0,0 +1,134 @@
+/**
+ * Edit Plan
+ * Records page edits (rotate, delete, reorder, watermark) against a list of
+ * page handles instead of rewriting the PDF on every change
+ *
+ * Plans are immutable: each edit returns a new plan and only touches page
+ * handles, so it costs nothing compared to a load/save. The document is
+ * loaded and saved once, when applyEditPlan materializes the plan for
+ * preview or export.
+ *
+ * Page numbers passed to the plan functions are 1-based positions in the
+ * plan's current output, i.e. what the user sees after earlier edits.
+ */
+
+import { PDFDocument, degrees } from 'pdf-lib';
+import { loadPDF, drawWatermark, WatermarkOptions } from './pdfOperations';
+
+export interface PageHandle {
+  source: number; // 0-based page index in the source document
+  rotation: number; // Extra rotation on top of the page's own, 0/90/180/270
+}
+
+export interface EditPlan {
+  source: Blob;
+  pages: readonly PageHandle[];
+  watermark?: { text: string; options?: WatermarkOptions };
+}
+
+const normalizeRotation = (angle: number): number => ((angle % 360) + 360) % 360;
+
+/**
+ * Start an empty plan for a document
+ */
+export function createEditPlan(source: Blob, pageCount: number): EditPlan {
+  return {
+    source,
+    pages: Array.from({ length: pageCount }, (_, i) => ({ source: i, rotation: 0 })),
+  };
+}
+
+/**
+ * Rotate pages; opposite rotations cancel out
+ */
+export function planRotate(plan: EditPlan, pageNumbers: number[], angle: number): EditPlan {
+  const targets = new Set(pageNumbers);
+  return {
+    ...plan,
+    pages: plan.pages.map((page, i) =>
+      targets.has(i + 1) ? { ...page, rotation: normalizeRotation(page.rotation + angle) } : page
+    ),
+  };
+}
+
+/**
+ * Delete pages; later positions shift down as they would in the output
+ */
+export function planDelete(plan: EditPlan, pageNumbers: number[]): EditPlan {
+  const targets = new Set(pageNumbers);
+  return { ...plan, pages: plan.pages.filter((_, i) => !targets.has(i + 1)) };
+}
+
+/**
+ * Reorder pages; newOrder lists every current position exactly once
+ */
+export function planReorder(plan: EditPlan, newOrder: number[]): EditPlan {
+  const total = plan.pages.length;
+  if (
+    newOrder.length !== total ||
+    new Set(newOrder).size !== total ||
+    !newOrder.every((p) => p >= 1 && p <= total)
+  ) {
+    throw new Error('Invalid page order');
+  }
+  return { ...plan, pages: newOrder.map((p) => plan.pages[p - 1]) };
+}
+
+/**
+ * Watermark every output page (replaces any earlier watermark edit)
+ */
+export function planWatermark(plan: EditPlan, text: string, options?: WatermarkOptions): EditPlan {
+  return { ...plan, watermark: { text, options } };
+}
+
+/**
+ * Whether the plan would reproduce its source unchanged
+ */
+export function isEmptyPlan(plan: EditPlan, sourcePageCount: number): boolean {
+  return (
+    !plan.watermark &&
+    plan.pages.length === sourcePageCount &&
+    plan.pages.every((page, i) => page.source === i && page.rotation === 0)
+  );
+}
+
+/**
+ * Materialize a plan: one load of the source, one save of the result
+ */
+export async function applyEditPlan(plan: EditPlan): Promise<Blob> {
+  if (plan.pages.length === 0) {
+    throw new Error('Cannot produce a PDF with no pages');
+  }
+
+  const doc = await loadPDF(plan.source);
+  const sourcePageCount = doc.getPageCount();
+  if (isEmptyPlan(plan, sourcePageCount)) return plan.source;
+
+  // Rotations and the watermark alone can be applied in place
+  const sameOrder =
+    plan.pages.length === sourcePageCount && plan.pages.every((page, i) => page.source === i);
+
+  let output = doc;
+  if (!sameOrder) {
+    output = await PDFDocument.create();
+    const copied = await output.copyPages(
+      doc,
+      plan.pages.map((page) => page.source)
+    );
+    copied.forEach((page) => output.addPage(page));
+  }
+
+  output.getPages().forEach((page, i) => {
+    const { rotation } = plan.pages[i];
+    if (rotation !== 0) {
+      page.setRotation(degrees(normalizeRotation(page.getRotation().angle + rotation)));
+    }
+  });
+
+  if (plan.watermark) {
+    drawWatermark(output, plan.watermark.text, plan.watermark.options);
+  }
+
+  const bytes = await output.save();
+  return new Blob([bytes as BlobPart], { type: 'application/pdf' });
+}
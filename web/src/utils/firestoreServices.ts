@@ -19,6 +19,7 @@ import {
   writeBatch,
 } from 'firebase/firestore';
 import { db } from './firebase';
+import { getLogBuffer } from './logBuffer';
 
 /**
  * User Profile Operations
@@ -408,13 +409,12 @@ export const AuditService = {
     resourceId: string,
     changes?: any
   ) {
-    await setDoc(doc(collection(db, 'audit_logs')), {
+    getLogBuffer().add('audit_logs', {
       userId,
       action,
       resource,
       resourceId,
       changes: changes || {},
-      timestamp: Timestamp.now(),
       status: 'success',
     });
   },
@@ -427,11 +427,10 @@ export const AuditService = {
     action: string,
     error: Error
   ) {
-    await setDoc(doc(collection(db, 'audit_logs')), {
+    getLogBuffer().add('audit_logs', {
       userId,
       action,
       error: error.message,
-      timestamp: Timestamp.now(),
       status: 'failed',
     });
   },
@@ -0,0 +1,245 @@
+/**
+ * Log Buffer
+ * Collects log entries on the client and writes them to Firestore in batches
+ *
+ * Entries are flushed as one writeBatch when maxBatch entries are waiting,
+ * after flushIntervalMs, and whenever the page is hidden. Anything not yet
+ * written is kept in localStorage, so a reload or crash does not lose it.
+ * Identical entries waiting in the buffer are coalesced into one document
+ * with a `count` field.
+ *
+ * A batch that fails for a transient reason (offline, quota, timeout) stays
+ * buffered and is retried with exponential backoff. A batch Firestore
+ * rejects outright (e.g. permission-denied) is discarded, so one entry the
+ * rules will never accept can't block logging for good.
+ */
+
+import { collection, doc, writeBatch, FirestoreError, Timestamp } from 'firebase/firestore';
+import { db } from './firebase';
+
+export interface LogBufferOptions {
+  maxBatch: number; // Flush as soon as this many entries are waiting (max 500 per writeBatch)
+  flushIntervalMs: number; // Otherwise flush this long after the first entry arrives
+  maxBuffered: number; // Oldest entries are dropped beyond this
+  storageKey: string; // localStorage key for unflushed entries
+  maxRetryDelayMs: number; // Cap for the backoff after failed flushes
+}
+
+export const DEFAULT_LOG_BUFFER_OPTIONS: LogBufferOptions = {
+  maxBatch: 20,
+  flushIntervalMs: 10_000,
+  maxBuffered: 500,
+  storageKey: 'pdf_log_buffer',
+  maxRetryDelayMs: 5 * 60_000,
+};
+
+export interface LogBufferStats {
+  buffered: number;
+  flushed: number; // Entries written to Firestore
+  coalesced: number; // Entries folded into an identical waiting entry
+  dropped: number; // Entries discarded because the buffer was full or Firestore rejected them
+  failedFlushes: number;
+}
+
+interface BufferedEntry {
+  collection: string;
+  data: Record<string, unknown>;
+  key: string; // Entries with the same key are coalesced
+  at: number; // Client time of the first occurrence (ms)
+  count: number;
+}
+
+// Firestore allows at most 500 writes per batch
+const MAX_WRITES_PER_BATCH = 500;
+
+// Failures worth retrying; any other Firestore error will fail the same way again
+const RETRYABLE_CODES = new Set([
+  'aborted',
+  'cancelled',
+  'deadline-exceeded',
+  'internal',
+  'resource-exhausted',
+  'unauthenticated', // Token refresh in progress
+  'unavailable',
+  'unknown',
+]);
+
+const isRetryable = (error: unknown): boolean =>
+  !(error instanceof FirestoreError) || RETRYABLE_CODES.has(error.code);
+
+export class LogBuffer {
+  readonly options: LogBufferOptions;
+  private entries: BufferedEntry[] = [];
+  private timer: ReturnType<typeof setTimeout> | null = null;
+  private flushing: Promise<void> | null = null;
+  private inFlight = new Set<BufferedEntry>();
+  private retries = 0; // Consecutive transient failures, for backoff
+  private counters = { flushed: 0, coalesced: 0, dropped: 0, failedFlushes: 0 };
+
+  constructor(options: Partial<LogBufferOptions> = {}) {
+    this.options = { ...DEFAULT_LOG_BUFFER_OPTIONS, ...options };
+    this.restore();
+
+    if (typeof document !== 'undefined') {
+      document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'hidden') void this.flush();
+      });
+      window.addEventListener('pagehide', () => void this.flush());
+    }
+
+    if (this.entries.length > 0) this.schedule();
+  }
+
+  /**
+   * Queue an entry for collectionName; the document is written on the next flush
+   */
+  add(collectionName: string, data: object): void {
+    // JSON round trip drops undefined fields (Firestore rejects them) and
+    // keeps entries storable in localStorage
+    const plain = JSON.parse(JSON.stringify(data)) as Record<string, unknown>;
+    const key = `${collectionName}:${JSON.stringify(plain)}`;
+
+    // Entries already being written can't take more occurrences
+    const existing = this.entries.find((entry) => entry.key === key && !this.inFlight.has(entry));
+    if (existing) {
+      existing.count++;
+      this.counters.coalesced++;
+    } else {
+      this.entries.push({ collection: collectionName, data: plain, key, at: Date.now(), count: 1 });
+      this.trim();
+    }
+
+    this.persist();
+
+    // While backing off, a full batch waits for the retry timer
+    if (this.entries.length >= this.options.maxBatch && this.retries === 0) {
+      void this.flush();
+    } else {
+      this.schedule();
+    }
+  }
+
+  /**
+   * Write everything waiting; concurrent calls share the same flush
+   */
+  flush(): Promise<void> {
+    if (!this.flushing) {
+      this.flushing = this.writeAll().finally(() => {
+        this.flushing = null;
+      });
+    }
+    return this.flushing;
+  }
+
+  getStats(): LogBufferStats {
+    return { buffered: this.entries.length, ...this.counters };
+  }
+
+  private async writeAll(): Promise<void> {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+
+    while (this.entries.length > 0) {
+      const pending = this.entries.slice(0, Math.min(this.options.maxBatch, MAX_WRITES_PER_BATCH));
+      const batch = writeBatch(db);
+      this.inFlight = new Set(pending);
+
+      for (const entry of pending) {
+        batch.set(doc(collection(db, entry.collection)), {
+          ...entry.data,
+          timestamp: Timestamp.fromMillis(entry.at),
+          ...(entry.count > 1 ? { count: entry.count } : {}),
+        });
+      }
+
+      try {
+        await batch.commit();
+        this.retries = 0;
+        this.counters.flushed += pending.reduce((sum, entry) => sum + entry.count, 0);
+      } catch (error) {
+        this.counters.failedFlushes++;
+
+        if (isRetryable(error)) {
+          // Entries stay buffered (and persisted) for the next attempt
+          console.warn('Failed to flush logs, will retry:', error);
+          this.inFlight.clear();
+          this.retries++;
+          this.schedule(this.retryDelay());
+          return;
+        }
+
+        console.warn('Logs rejected by Firestore, discarding the batch:', error);
+        this.counters.dropped += pending.reduce((sum, entry) => sum + entry.count, 0);
+      }
+
+      // Entries added while the batch was in flight are still in the buffer
+      this.entries = this.entries.filter((entry) => !this.inFlight.has(entry));
+      this.inFlight.clear();
+      this.persist();
+    }
+  }
+
+  private schedule(delayMs = this.options.flushIntervalMs): void {
+    if (!this.timer) {
+      this.timer = setTimeout(() => {
+        this.timer = null;
+        void this.flush();
+      }, delayMs);
+    }
+  }
+
+  /**
+   * Exponential backoff from flushIntervalMs, with jitter so tabs don't retry in step
+   */
+  private retryDelay(): number {
+    const base = Math.min(
+      this.options.maxRetryDelayMs,
+      this.options.flushIntervalMs * 2 ** (this.retries - 1)
+    );
+    return base / 2 + Math.random() * (base / 2);
+  }
+
+  private trim(): void {
+    const excess = this.entries.length - this.options.maxBuffered;
+    if (excess > 0) {
+      const dropped = this.entries.splice(0, excess);
+      this.counters.dropped += dropped.reduce((sum, entry) => sum + entry.count, 0);
+    }
+  }
+
+  private persist(): void {
+    try {
+      if (this.entries.length === 0) {
+        localStorage.removeItem(this.options.storageKey);
+      } else {
+        localStorage.setItem(this.options.storageKey, JSON.stringify(this.entries));
+      }
+    } catch {
+      // Storage full or unavailable; entries are still held in memory
+    }
+  }
+
+  private restore(): void {
+    try {
+      const saved = localStorage.getItem(this.options.storageKey);
+      if (saved) {
+        this.entries = JSON.parse(saved) as BufferedEntry[];
+        this.trim();
+      }
+    } catch {
+      this.entries = [];
+    }
+  }
+}
+
+let sharedBuffer: LogBuffer | null = null;
+
+/**
+ * Buffer shared by the action logger and AuditService (created on first use)
+ */
+export function getLogBuffer(): LogBuffer {
+  if (!sharedBuffer) sharedBuffer = new LogBuffer();
+  return sharedBuffer;
+}
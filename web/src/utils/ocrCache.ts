@@ -0,0 +1,152 @@
+/**
+ * OCR Cache
+ * Persists recognized page text in IndexedDB across sessions
+ * Keyed by page-image hash + language, evicted LRU beyond a record budget
+ */
+
+import { hashContent } from './thumbnailCache';
+
+const DB_NAME = 'pdf-merger-ocr';
+const DB_VERSION = 1;
+const STORE = 'pages';
+
+// Page text is small; the budget just keeps the store from growing forever
+export const DEFAULT_OCR_CACHE_ENTRIES = 5000;
+
+export interface CachedOCRPage {
+  text: string;
+  confidence: number;
+}
+
+interface OCRRecord extends CachedOCRPage {
+  key: [string, string]; // [imageHash, language]
+  lastAccess: number;
+}
+
+let dbPromise: Promise<IDBDatabase> | null = null;
+
+function openDB(): Promise<IDBDatabase> {
+  if (!dbPromise) {
+    dbPromise = new Promise((resolve, reject) => {
+      const request = indexedDB.open(DB_NAME, DB_VERSION);
+      request.onupgradeneeded = () => {
+        const store = request.result.createObjectStore(STORE, { keyPath: 'key' });
+        store.createIndex('lastAccess', 'lastAccess');
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => {
+        dbPromise = null;
+        reject(request.error);
+      };
+    });
+  }
+  return dbPromise;
+}
+
+function done(tx: IDBTransaction): Promise<void> {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve();
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error);
+  });
+}
+
+/**
+ * SHA-256 of a page image's content
+ * URLs and <img> elements are keyed by their address, not their pixels.
+ */
+export async function hashPageImage(image: string | ImageData | HTMLImageElement | Blob): Promise<string> {
+  if (image instanceof Blob) return hashContent(image);
+  if (typeof ImageData !== 'undefined' && image instanceof ImageData) {
+    return hashContent(new Blob([image.data as BlobPart]));
+  }
+  if (typeof image === 'string') return hashContent(new Blob([image]));
+  const element = image as HTMLImageElement;
+  return hashContent(new Blob([element.currentSrc || element.src]));
+}
+
+/**
+ * Look up several pages in one transaction; returns hash -> cached result
+ */
+export async function getCachedOCR(hashes: string[], language: string): Promise<Map<string, CachedOCRPage>> {
+  const result = new Map<string, CachedOCRPage>();
+  if (hashes.length === 0) return result;
+
+  try {
+    const db = await openDB();
+    const tx = db.transaction(STORE, 'readwrite');
+    const store = tx.objectStore(STORE);
+    const now = Date.now();
+
+    for (const hash of new Set(hashes)) {
+      const request = store.get([hash, language]);
+      request.onsuccess = () => {
+        const record = request.result as OCRRecord | undefined;
+        if (!record) return;
+        result.set(hash, { text: record.text, confidence: record.confidence });
+        store.put({ ...record, lastAccess: now });
+      };
+    }
+
+    await done(tx);
+  } catch (error) {
+    console.warn('OCR cache read failed:', error);
+  }
+
+  return result;
+}
+
+/**
+ * Store the result for one page image
+ */
+export async function putCachedOCR(hash: string, language: string, page: CachedOCRPage): Promise<void> {
+  try {
+    const db = await openDB();
+    const tx = db.transaction(STORE, 'readwrite');
+    const record: OCRRecord = { key: [hash, language], ...page, lastAccess: Date.now() };
+    tx.objectStore(STORE).put(record);
+    await done(tx);
+  } catch (error) {
+    console.warn('OCR cache write failed:', error);
+  }
+}
+
+/**
+ * Delete least recently used pages until at most maxEntries remain
+ */
+export async function evictOCRCache(maxEntries = DEFAULT_OCR_CACHE_ENTRIES): Promise<number> {
+  const db = await openDB();
+  const tx = db.transaction(STORE, 'readwrite');
+  const store = tx.objectStore(STORE);
+  let evicted = 0;
+
+  const countRequest = store.count();
+  countRequest.onsuccess = () => {
+    let excess = countRequest.result - maxEntries;
+    if (excess <= 0) return;
+
+    // Index order is oldest access first
+    const request = store.index('lastAccess').openCursor();
+    request.onsuccess = () => {
+      const cursor = request.result;
+      if (!cursor || excess <= 0) return;
+      cursor.delete();
+      excess--;
+      evicted++;
+      cursor.continue();
+    };
+  };
+
+  await done(tx);
+  return evicted;
+}
+
+/**
+ * Remove every cached page
+ */
+export async function clearOCRCache(): Promise<void> {
+  const db = await openDB();
+  const tx = db.transaction(STORE, 'readwrite');
+  tx.objectStore(STORE).clear();
+  await done(tx);
+}
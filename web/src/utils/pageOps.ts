@@ -0,0 +1,77 @@
+/**
+ * Page Ops
+ * Compact page-edit deltas exchanged by collaboration sessions, and the fold
+ * that applies them to editor pages and the edit plan
+ *
+ * An op names the positions it touches, never the resulting page list, so a
+ * rotate on a 500-page document is a few bytes on the wire. Applying ops
+ * keeps untouched page objects as they were, so only changed rows re-render.
+ */
+
+import { PDFPage } from '@/types';
+import { EditPlan, planDelete, planReorder, planRotate } from './editPlan';
+
+export type PageOp =
+  | { type: 'page-rotate'; data: { pages: number[]; angle: number } }
+  | { type: 'page-delete'; data: { pages: number[] } }
+  | { type: 'page-reorder'; data: { order: number[] } };
+
+export interface PageState {
+  pages: PDFPage[];
+  editPlan: EditPlan | null;
+}
+
+const PAGE_OP_TYPES = new Set<string>(['page-rotate', 'page-delete', 'page-reorder']);
+
+export const isPageOp = <T extends { type: string }>(change: T): change is T & PageOp =>
+  PAGE_OP_TYPES.has(change.type);
+
+// Positions are 1-based and match pageNumber after every edit
+const renumber = (pages: PDFPage[]): PDFPage[] =>
+  pages.map((page, i) => (page.pageNumber === i + 1 ? page : { ...page, pageNumber: i + 1 }));
+
+function applyPageOp(state: PageState, op: PageOp): PageState {
+  const { pages, editPlan } = state;
+
+  switch (op.type) {
+    case 'page-rotate': {
+      const targets = new Set(op.data.pages);
+      return {
+        pages: pages.map((page) =>
+          targets.has(page.pageNumber)
+            ? { ...page, rotationDegrees: (((page.rotationDegrees + op.data.angle) % 360) + 360) % 360 }
+            : page
+        ),
+        editPlan: editPlan ? planRotate(editPlan, op.data.pages, op.data.angle) : null,
+      };
+    }
+    case 'page-delete': {
+      const targets = new Set(op.data.pages);
+      const kept = pages.filter((page) => !targets.has(page.pageNumber));
+      // A PDF needs at least one page; the sender checks this too
+      if (kept.length === 0 || kept.length === pages.length) return state;
+      return {
+        pages: renumber(kept),
+        editPlan: editPlan ? planDelete(editPlan, op.data.pages) : null,
+      };
+    }
+    case 'page-reorder': {
+      const { order } = op.data;
+      if (order.length !== pages.length || new Set(order).size !== pages.length) return state;
+      const reordered = order.map((pageNumber) => pages[pageNumber - 1]);
+      if (reordered.some((page) => !page)) return state;
+      return {
+        pages: renumber(reordered),
+        editPlan: editPlan ? planReorder(editPlan, order) : null,
+      };
+    }
+  }
+}
+
+/**
+ * Apply ops in order; ops that no longer fit the document (e.g. a reorder
+ * made against a page count that has since changed) are skipped
+ */
+export function applyPageOps(state: PageState, ops: PageOp[]): PageState {
+  return ops.reduce(applyPageOp, state);
+}
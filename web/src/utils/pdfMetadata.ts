@@ -0,0 +1,35 @@
+/**
+ * PDF Metadata Index (browser)
+ * Reads page count, page sizes, encryption flag and producer from a Blob
+ * without loading the whole file; the reader itself is @shared/pdfMetadata
+ */
+
+import { bytesSource, ByteSource, readPDFMetadataFrom } from '@shared/pdfMetadata';
+import type { PDFMetadata } from '@shared/pdfMetadata';
+
+export type { PageSize, PDFMetadata } from '@shared/pdfMetadata';
+
+async function inflate(data: Uint8Array): Promise<Uint8Array> {
+  const stream = new Blob([data as BlobPart]).stream().pipeThrough(new DecompressionStream('deflate'));
+  return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
+// Slices are cheap; only the bytes the reader asks for are loaded
+function blobSource(blob: Blob): ByteSource {
+  return {
+    size: blob.size,
+    read: async (start, end) => new Uint8Array(await blob.slice(start, end).arrayBuffer()),
+  };
+}
+
+/**
+ * Read page count, page sizes, encryption flag and producer
+ * Uses the xref and page tree only, and falls back to a full parse if needed.
+ */
+export async function readPDFMetadata(source: Blob | ArrayBuffer | Uint8Array): Promise<PDFMetadata> {
+  const bytes =
+    source instanceof Blob
+      ? blobSource(source)
+      : bytesSource(source instanceof Uint8Array ? source : new Uint8Array(source));
+  return readPDFMetadataFrom(bytes, inflate);
+}
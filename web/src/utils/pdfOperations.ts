@@ -1,6 +1,21 @@
 // PDF operation utilities
 
-import { PDFDocument, rgb } from 'pdf-lib';
+import {
+  PDFDocument,
+  PDFObject,
+  PDFRef,
+  PDFDict,
+  PDFArray,
+  PDFName,
+  PDFStream,
+  PDFCrossRefSection,
+  PDFTrailer,
+  PDFTrailerDict,
+  rgb,
+  degrees as toDegrees,
+} from 'pdf-lib';
+import { readPDFMetadata } from './pdfMetadata';
+import { TraceContext, withSpan } from './tracing';
 
 /**
  * Load PDF from blob
@@ -26,6 +41,314 @@ export async function mergePDFs(fileBlobs: Blob[]): Promise<Blob> {
   return new Blob([mergedBytes as BlobPart], { type: 'application/pdf' });
 }
 
+/**
+ * Merge PDFs one input at a time and serialize the result incrementally.
+ *
+ * Each input is read and parsed only while its pages are copied, so peak
+ * memory is the largest single input plus the output, not the sum of all
+ * inputs. Progress runs 0-50 while copying and 50-100 while writing.
+ */
+export async function mergePDFsStreaming(
+  fileBlobs: Blob[],
+  onProgress?: (progress: number, bytesWritten?: number) => void,
+  options: {
+    deduplicate?: boolean; // Off by default; see deduplicateResources
+    onDeduplicated?: (stats: DedupStats) => void;
+    trace?: TraceContext; // Parent for parse, copy, dedup and save spans
+  } = {}
+): Promise<Blob> {
+  const { trace } = options;
+  const merged = await PDFDocument.create();
+
+  for (let i = 0; i < fileBlobs.length; i++) {
+    const doc = await withSpan(
+      'pdf.parse',
+      trace,
+      async (span) => {
+        const parsed = await loadPDF(fileBlobs[i]);
+        span.setAttributes({ pages: parsed.getPageCount() });
+        return parsed;
+      },
+      { bytes: fileBlobs[i].size }
+    );
+    await withSpan(
+      'pdf.copyPages',
+      trace,
+      async () => {
+        const pages = await merged.copyPages(doc, doc.getPageIndices());
+        pages.forEach((page) => merged.addPage(page));
+      },
+      { pages: doc.getPageCount() }
+    );
+
+    onProgress?.(((i + 1) / fileBlobs.length) * 50);
+  }
+
+  if (options.deduplicate) {
+    const stats = await withSpan('pdf.deduplicate', trace, () => deduplicateResources(merged));
+    options.onDeduplicated?.(stats);
+  }
+
+  return withSpan(
+    'pdf.save',
+    trace,
+    async (span) => {
+      const blob = await saveIncrementally(merged, (bytesWritten, objectsWritten, totalObjects) => {
+        onProgress?.(50 + (objectsWritten / totalObjects) * 50, bytesWritten);
+      });
+      span.setAttributes({ bytes: blob.size });
+      return blob;
+    },
+    { pages: merged.getPageCount() }
+  );
+}
+
+// Serialized bytes are moved into Blob storage every few MB
+const INCREMENTAL_FLUSH_BYTES = 8 * 1024 * 1024;
+const OBJECTS_PER_TICK = 50;
+
+const encodeAscii = (text: string): Uint8Array => new TextEncoder().encode(text);
+
+/**
+ * Serialize a document to a Blob one indirect object at a time.
+ *
+ * Unlike doc.save(), output is flushed to Blob storage in chunks and each
+ * object is dropped from the document once written, so the object graph and
+ * the serialized file are never both fully in memory. The document must not
+ * be used afterwards. Output uses a classic xref table, not object streams.
+ */
+export async function saveIncrementally(
+  doc: PDFDocument,
+  onProgress?: (bytesWritten: number, objectsWritten: number, totalObjects: number) => void
+): Promise<Blob> {
+  await doc.flush();
+  const { context } = doc;
+
+  let output: Blob = new Blob([], { type: 'application/pdf' });
+  let pending: Uint8Array[] = [];
+  let pendingBytes = 0;
+  let bytesWritten = 0;
+
+  const write = (bytes: Uint8Array) => {
+    pending.push(bytes);
+    pendingBytes += bytes.length;
+    bytesWritten += bytes.length;
+
+    if (pendingBytes >= INCREMENTAL_FLUSH_BYTES) {
+      output = new Blob([output, ...(pending as BlobPart[])], { type: 'application/pdf' });
+      pending = [];
+      pendingBytes = 0;
+    }
+  };
+
+  const header = new Uint8Array(context.header.sizeInBytes() + 2);
+  context.header.copyBytesInto(header, 0);
+  header.set(encodeAscii('\n\n'), header.length - 2);
+  write(header);
+
+  const xref = PDFCrossRefSection.create();
+  const objects = context.enumerateIndirectObjects();
+
+  for (let i = 0; i < objects.length; i++) {
+    const [ref, object] = objects[i];
+    xref.addEntry(ref, bytesWritten);
+
+    const prefix = encodeAscii(`${ref.objectNumber} ${ref.generationNumber} obj\n`);
+    const suffix = encodeAscii('\nendobj\n\n');
+    const bytes = new Uint8Array(prefix.length + object.sizeInBytes() + suffix.length);
+    bytes.set(prefix, 0);
+    const end = prefix.length + object.copyBytesInto(bytes, prefix.length);
+    bytes.set(suffix, end);
+    write(bytes);
+
+    // The object is no longer needed once its bytes are written
+    context.delete(ref);
+
+    if ((i + 1) % OBJECTS_PER_TICK === 0 || i === objects.length - 1) {
+      onProgress?.(bytesWritten, i + 1, objects.length);
+      await new Promise((resolve) => setTimeout(resolve, 0));
+    }
+  }
+
+  const xrefOffset = bytesWritten;
+  const trailerDict = PDFTrailerDict.of(
+    context.obj({
+      Size: context.largestObjectNumber + 1,
+      Root: context.trailerInfo.Root,
+      Encrypt: context.trailerInfo.Encrypt,
+      Info: context.trailerInfo.Info,
+      ID: context.trailerInfo.ID,
+    })
+  );
+  const trailer = PDFTrailer.forLastCrossRefSectionOffset(xrefOffset);
+
+  const tail = new Uint8Array(xref.sizeInBytes() + 1 + trailerDict.sizeInBytes() + 2 + trailer.sizeInBytes());
+  let offset = xref.copyBytesInto(tail, 0);
+  tail.set(encodeAscii('\n'), offset++);
+  offset += trailerDict.copyBytesInto(tail, offset);
+  tail.set(encodeAscii('\n\n'), offset);
+  offset += 2;
+  trailer.copyBytesInto(tail, offset);
+  write(tail);
+
+  return new Blob([output, ...(pending as BlobPart[])], { type: 'application/pdf' });
+}
+
+/**
+ * Result of a deduplicateResources pass
+ */
+export interface DedupStats {
+  objectsRemoved: number;
+  bytesSaved: number;
+}
+
+const toHex = (buffer: ArrayBuffer): string =>
+  Array.from(new Uint8Array(buffer), (b) => b.toString(16).padStart(2, '0')).join('');
+
+const bytesEqual = (a: Uint8Array, b: Uint8Array): boolean => {
+  if (a.length !== b.length) return false;
+  for (let i = 0; i < a.length; i++) {
+    if (a[i] !== b[i]) return false;
+  }
+  return true;
+};
+
+/**
+ * Replace references to duplicate objects, recursing into direct dicts and arrays
+ */
+function remapRefs(object: PDFObject, duplicates: Map<string, PDFRef>): void {
+  const dict = object instanceof PDFStream ? object.dict : object;
+
+  if (dict instanceof PDFDict) {
+    for (const [key, value] of dict.entries()) {
+      const canonical = value instanceof PDFRef ? duplicates.get(value.toString()) : undefined;
+      if (canonical) {
+        dict.set(key, canonical);
+      } else {
+        remapRefs(value, duplicates);
+      }
+    }
+  } else if (dict instanceof PDFArray) {
+    for (let i = 0; i < dict.size(); i++) {
+      const value = dict.get(i);
+      const canonical = value instanceof PDFRef ? duplicates.get(value.toString()) : undefined;
+      if (canonical) {
+        dict.set(i, canonical);
+      } else {
+        remapRefs(value, duplicates);
+      }
+    }
+  }
+}
+
+const FONT_FILE_KEYS = ['FontFile', 'FontFile2', 'FontFile3'].map((key) => PDFName.of(key));
+const ICC_BASED = PDFName.of('ICCBased');
+const SUBTYPE = PDFName.of('Subtype');
+const IMAGE = PDFName.of('Image');
+
+/**
+ * Refs of the streams worth sharing: embedded font programs, image XObjects
+ * (soft masks included) and ICC profiles. Page content streams and forms are
+ * left out; they are rarely identical and would dominate the hashing.
+ */
+function shareableStreamRefs(doc: PDFDocument): Set<string> {
+  const refs = new Set<string>();
+
+  const visit = (object: PDFObject): void => {
+    const dict = object instanceof PDFStream ? object.dict : object;
+
+    if (dict instanceof PDFDict) {
+      for (const key of FONT_FILE_KEYS) {
+        const fontFile = dict.get(key);
+        if (fontFile instanceof PDFRef) refs.add(fontFile.toString());
+      }
+      for (const [, value] of dict.entries()) {
+        if (!(value instanceof PDFRef)) visit(value);
+      }
+    } else if (dict instanceof PDFArray) {
+      // [/ICCBased <profile stream>]
+      const profile = dict.size() === 2 && dict.get(0) === ICC_BASED ? dict.get(1) : undefined;
+      if (profile instanceof PDFRef) refs.add(profile.toString());
+      for (let i = 0; i < dict.size(); i++) {
+        const value = dict.get(i);
+        if (!(value instanceof PDFRef)) visit(value);
+      }
+    }
+  };
+
+  for (const [ref, object] of doc.context.enumerateIndirectObjects()) {
+    if (object instanceof PDFStream && object.dict.get(SUBTYPE) === IMAGE) refs.add(ref.toString());
+    visit(object);
+  }
+
+  return refs;
+}
+
+/**
+ * Collapse byte-identical font, image and ICC profile streams into a single
+ * shared object.
+ *
+ * Documents exported from the same template each carry their own copy of
+ * these resources, so merged output repeats them once per input. Passes
+ * repeat until nothing changes, because collapsing e.g. a soft mask makes
+ * the images pointing at it identical too. Stream contents never change
+ * between passes, so each is hashed once. Costly on large documents; run it
+ * in the PDF worker.
+ */
+export async function deduplicateResources(doc: PDFDocument): Promise<DedupStats> {
+  const { context } = doc;
+  const stats: DedupStats = { objectsRemoved: 0, bytesSaved: 0 };
+  const shareable = shareableStreamRefs(doc);
+  const contentHashes = new Map<string, string>();
+
+  for (;;) {
+    const canonicalByKey = new Map<string, Array<{ ref: PDFRef; stream: PDFStream }>>();
+    const duplicates = new Map<string, PDFRef>();
+    const duplicateRefs: PDFRef[] = [];
+
+    for (const [ref, object] of context.enumerateIndirectObjects()) {
+      const refKey = ref.toString();
+      if (!(object instanceof PDFStream) || !shareable.has(refKey)) continue;
+
+      const contents = object.getContents();
+      let contentHash = contentHashes.get(refKey);
+      if (!contentHash) {
+        contentHash = toHex(await crypto.subtle.digest('SHA-256', contents));
+        contentHashes.set(refKey, contentHash);
+      }
+
+      // The dictionary is part of the identity: same bytes with a different
+      // /Filter or /ColorSpace is a different resource. It is compared as
+      // text because earlier passes may have rewritten its references.
+      const dictString = object.dict.toString();
+      const key = `${contentHash} ${dictString}`;
+      const candidates = canonicalByKey.get(key) ?? [];
+
+      // Confirm the hash match byte for byte before collapsing
+      const match = candidates.find((candidate) => bytesEqual(candidate.stream.getContents(), contents));
+
+      if (match) {
+        duplicates.set(refKey, match.ref);
+        duplicateRefs.push(ref);
+        stats.objectsRemoved++;
+        stats.bytesSaved += object.sizeInBytes();
+      } else {
+        candidates.push({ ref, stream: object });
+        canonicalByKey.set(key, candidates);
+      }
+    }
+
+    if (duplicates.size === 0) break;
+
+    for (const [, object] of context.enumerateIndirectObjects()) {
+      remapRefs(object, duplicates);
+    }
+    duplicateRefs.forEach((ref) => context.delete(ref));
+  }
+
+  return stats;
+}
+
 /**
  * Extract specific pages from PDF
  */
@@ -51,28 +374,101 @@ export async function extractPages(blob: Blob, pageNumbers: number[]): Promise<B
 }
 
 /**
- * Split PDF at specific page numbers
+ * A 1-based, inclusive page range
  */
-export async function splitPDF(blob: Blob, splitPoints: number[]): Promise<Blob[]> {
-  const doc = await loadPDF(blob);
-  const totalPages = doc.getPageCount();
-  const results: Blob[] = [];
+export interface PageSpan {
+  from: number;
+  to: number;
+  pages?: number[]; // Explicit pages, in output order, instead of from..to
+}
+
+/**
+ * Options for splitPDFStream; plain data, so they can be posted to a worker
+ */
+export interface SplitOptions {
+  rotations?: Record<number, number>; // Source page number -> rotation in degrees
+  deduplicate?: boolean; // Off by default; see deduplicateResources
+}
 
+/**
+ * One output file produced by splitPDFStream
+ */
+export interface SplitPart extends PageSpan {
+  index: number;
+  total: number;
+  blob: Blob;
+  dedup?: DedupStats;
+}
+
+/**
+ * Convert split points into the page ranges splitPDF produces
+ */
+export function splitPointsToRanges(splitPoints: number[], totalPages: number): PageSpan[] {
   // Add 0 at start and end if not present
   const points = [0, ...splitPoints.filter((p) => p > 0 && p < totalPages), totalPages];
   const unique = Array.from(new Set(points)).sort((a, b) => a - b);
 
+  const ranges: PageSpan[] = [];
   for (let i = 0; i < unique.length - 1; i++) {
-    const start = unique[i];
-    const end = unique[i + 1];
-    const pageIndices = Array.from({ length: end - start }, (_, idx) => start + idx);
+    ranges.push({ from: unique[i] + 1, to: unique[i + 1] });
+  }
+  return ranges;
+}
+
+/**
+ * Split PDF into page ranges, yielding each part as soon as it is saved.
+ *
+ * The source is parsed once and every part copies from that one document,
+ * so callers can download the first part while later ones are still being
+ * built, and only the current part's bytes are held at a time. This is the
+ * serial engine; usePDFWorker().splitPDFStreaming runs it on several
+ * workers at once, each building its own run of ranges.
+ */
+export async function* splitPDFStream(
+  source: Blob | PDFDocument,
+  ranges: PageSpan[],
+  options: SplitOptions = {}
+): AsyncGenerator<SplitPart> {
+  const doc = source instanceof PDFDocument ? source : await loadPDF(source);
+  const totalPages = doc.getPageCount();
+
+  for (let index = 0; index < ranges.length; index++) {
+    const from = Math.max(1, ranges[index].from);
+    const to = Math.min(totalPages, ranges[index].to);
+    const pageNumbers = (
+      ranges[index].pages ?? Array.from({ length: Math.max(0, to - from + 1) }, (_, idx) => from + idx)
+    ).filter((pageNum) => pageNum >= 1 && pageNum <= totalPages);
 
     const part = await PDFDocument.create();
-    const copiedPages = await part.copyPages(doc, pageIndices);
-    copiedPages.forEach((page) => part.addPage(page));
+    const copiedPages = await part.copyPages(doc, pageNumbers.map((pageNum) => pageNum - 1));
+    copiedPages.forEach((page, idx) => {
+      const rotation = options.rotations?.[pageNumbers[idx]] ?? 0;
+      if (rotation !== 0) page.setRotation(toDegrees(rotation));
+      part.addPage(page);
+    });
 
+    const dedup = options.deduplicate ? await deduplicateResources(part) : undefined;
     const bytes = await part.save();
-    results.push(new Blob([bytes as BlobPart], { type: 'application/pdf' }));
+    yield {
+      index,
+      total: ranges.length,
+      from,
+      to,
+      blob: new Blob([bytes as BlobPart], { type: 'application/pdf' }),
+      dedup,
+    };
+  }
+}
+
+/**
+ * Split PDF at specific page numbers
+ */
+export async function splitPDF(blob: Blob, splitPoints: number[]): Promise<Blob[]> {
+  const doc = await loadPDF(blob);
+  const results: Blob[] = [];
+
+  for await (const part of splitPDFStream(doc, splitPointsToRanges(splitPoints, doc.getPageCount()))) {
+    results.push(part.blob);
   }
 
   return results;
@@ -143,25 +539,20 @@ export async function deletePages(blob: Blob, pageNumbers: number[]): Promise<Bl
   return new Blob([deletedBytes as BlobPart], { type: 'application/pdf' });
 }
 
+export interface WatermarkOptions {
+  opacity?: number;
+  rotation?: number;
+  fontSize?: number;
+  color?: [number, number, number]; // RGB components from 0 to 1
+}
+
 /**
- * Add watermark text to PDF
+ * Draw a text watermark on every page of a loaded document
  */
-export async function addWatermark(
-  blob: Blob,
-  text: string,
-  options: {
-    opacity?: number;
-    rotation?: number;
-    fontSize?: number;
-    color?: [number, number, number];
-  } = {}
-): Promise<Blob> {
-  const doc = await loadPDF(blob);
-  const { opacity = 0.3, rotation = -45, fontSize = 60, color = [200, 200, 200] } = options;
-
-  const pages = doc.getPages();
+export function drawWatermark(doc: PDFDocument, text: string, options: WatermarkOptions = {}): void {
+  const { opacity = 0.3, rotation = -45, fontSize = 60, color = [0.78, 0.78, 0.78] } = options;
 
-  for (const page of pages) {
+  for (const page of doc.getPages()) {
     const { width, height } = page.getSize();
 
     page.drawText(text, {
@@ -170,20 +561,31 @@ export async function addWatermark(
       size: fontSize,
       color: rgb(...color),
       opacity,
-      rotate: rotation as any,
+      rotate: toDegrees(rotation),
     });
   }
+}
+
+/**
+ * Add watermark text to PDF
+ */
+export async function addWatermark(
+  blob: Blob,
+  text: string,
+  options: WatermarkOptions = {}
+): Promise<Blob> {
+  const doc = await loadPDF(blob);
+  drawWatermark(doc, text, options);
 
   const watermarkedBytes = await doc.save();
   return new Blob([watermarkedBytes as BlobPart], { type: 'application/pdf' });
 }
 
 /**
- * Get PDF page count
+ * Get PDF page count (reads the page tree only, see pdfMetadata)
  */
 export async function getPDFPageCount(blob: Blob): Promise<number> {
-  const doc = await loadPDF(blob);
-  return doc.getPageCount();
+  return (await readPDFMetadata(blob)).pageCount;
 }
 
 /**
@@ -9,21 +9,30 @@ import {
   UploadTask,
 } from 'firebase/storage';
 import { storage } from './firebase';
+import { TraceContext, formatTraceparent, startSpan } from './tracing';
 
 /**
  * Upload file to Cloud Storage
+ * The upload is traced, and its traceparent is stored in the object's
+ * metadata so onFileUpload continues the same trace.
  */
 export async function uploadFile(
   userId: string,
   fileId: string,
   blob: Blob,
-  metadata?: Record<string, string>
+  metadata?: Record<string, string>,
+  trace?: TraceContext
 ) {
   const storageRef = ref(storage, `users/${userId}/files/${fileId}`);
+  const span = startSpan('storage.upload', trace, { bytes: blob.size, fileId });
 
   const uploadTask = uploadBytesResumable(storageRef, blob, {
-    customMetadata: metadata,
+    customMetadata: { ...metadata, traceparent: formatTraceparent(span.context) },
   });
+  uploadTask.then(
+    () => span.end(),
+    (error) => span.end(error)
+  );
 
   return uploadTask;
 }
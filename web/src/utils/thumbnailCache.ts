@@ -0,0 +1,237 @@
+/**
+ * Thumbnail Cache
+ * Persists rendered page thumbnails in IndexedDB across sessions
+ * Keyed by content hash + render size + page, evicted LRU within a byte budget
+ *
+ * Works on the main thread and inside workers.
+ */
+
+const DB_NAME = 'pdf-merger-thumbnails';
+const DB_VERSION = 2;
+const STORE = 'thumbnails';
+// [lastAccess, bytes]: key cursors over it read sizes in LRU order without loading images
+const USAGE_INDEX = 'usage';
+
+// Default budget for all cached thumbnails across every file
+export const DEFAULT_THUMBNAIL_BUDGET = 50 * 1024 * 1024; // 50MB
+
+interface ThumbnailRecord {
+  key: [string, string, number]; // [contentHash, size, pageNumber]
+  image: Blob;
+  bytes: number;
+  lastAccess: number;
+}
+
+let dbPromise: Promise<IDBDatabase> | null = null;
+
+/**
+ * Open (and create on first use) the thumbnail database
+ */
+function openDB(): Promise<IDBDatabase> {
+  if (!dbPromise) {
+    dbPromise = new Promise((resolve, reject) => {
+      const request = indexedDB.open(DB_NAME, DB_VERSION);
+      request.onupgradeneeded = (event) => {
+        const store =
+          event.oldVersion < 1
+            ? request.result.createObjectStore(STORE, { keyPath: 'key' })
+            : request.transaction!.objectStore(STORE);
+        // Version 1 indexed lastAccess alone, so reading sizes loaded every image
+        if (store.indexNames.contains('lastAccess')) store.deleteIndex('lastAccess');
+        store.createIndex(USAGE_INDEX, ['lastAccess', 'bytes']);
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => {
+        dbPromise = null;
+        reject(request.error);
+      };
+    });
+  }
+  return dbPromise;
+}
+
+/**
+ * Resolve once a transaction commits
+ */
+function done(tx: IDBTransaction): Promise<void> {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve();
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error);
+  });
+}
+
+/**
+ * Cache key component for a render size
+ */
+export function sizeKey(width: number, height: number): string {
+  return `${Math.round(width)}x${Math.round(height)}`;
+}
+
+// Bytes read from each end of a file by fingerprintContent
+const FINGERPRINT_SLICE_BYTES = 256 * 1024;
+
+/**
+ * Recognize the same file across sessions without reading all of it
+ * SHA-256 over the size plus the first and last 256KB. A PDF's tail holds
+ * its xref and trailer (usually with a document /ID), and any incremental
+ * save changes it, so edits show up there.
+ */
+export async function fingerprintContent(blob: Blob): Promise<string> {
+  if (blob.size <= 2 * FINGERPRINT_SLICE_BYTES) return hashContent(blob);
+  return hashContent(
+    new Blob([
+      String(blob.size),
+      blob.slice(0, FINGERPRINT_SLICE_BYTES),
+      blob.slice(blob.size - FINGERPRINT_SLICE_BYTES),
+    ])
+  );
+}
+
+/**
+ * SHA-256 of the content, used to recognize the same data across sessions
+ */
+export async function hashContent(data: ArrayBuffer | Blob): Promise<string> {
+  const buffer = data instanceof Blob ? await data.arrayBuffer() : data;
+  const digest = await crypto.subtle.digest('SHA-256', buffer);
+  return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, '0')).join('');
+}
+
+/**
+ * Load the cached thumbnails of pages start..end of one file at one size in
+ * a single transaction
+ * Returns a map of pageNumber -> image Blob and marks only those entries as
+ * used, so scrolling through a long document doesn't rewrite every page.
+ */
+export async function getCachedThumbnails(
+  contentHash: string,
+  size: string,
+  start: number,
+  end: number
+): Promise<Map<number, Blob>> {
+  const result = new Map<number, Blob>();
+  if (end < start) return result;
+
+  try {
+    const db = await openDB();
+    const tx = db.transaction(STORE, 'readwrite');
+    const store = tx.objectStore(STORE);
+    const range = IDBKeyRange.bound([contentHash, size, start], [contentHash, size, end]);
+    const now = Date.now();
+
+    const request = store.openCursor(range);
+    request.onsuccess = () => {
+      const cursor = request.result;
+      if (!cursor) return;
+      const record = cursor.value as ThumbnailRecord;
+      result.set(record.key[2], record.image);
+      cursor.update({ ...record, lastAccess: now });
+      cursor.continue();
+    };
+
+    await done(tx);
+  } catch (error) {
+    console.warn('Thumbnail cache read failed:', error);
+  }
+
+  return result;
+}
+
+/**
+ * Store rendered thumbnails for one file
+ */
+export async function putCachedThumbnails(
+  contentHash: string,
+  size: string,
+  thumbnails: Array<{ pageNumber: number; image: Blob }>
+): Promise<void> {
+  if (thumbnails.length === 0) return;
+
+  try {
+    const db = await openDB();
+    const tx = db.transaction(STORE, 'readwrite');
+    const store = tx.objectStore(STORE);
+    const now = Date.now();
+
+    for (const { pageNumber, image } of thumbnails) {
+      const record: ThumbnailRecord = {
+        key: [contentHash, size, pageNumber],
+        image,
+        bytes: image.size,
+        lastAccess: now,
+      };
+      store.put(record);
+    }
+
+    await done(tx);
+  } catch (error) {
+    console.warn('Thumbnail cache write failed:', error);
+  }
+}
+
+/**
+ * Sizes of every cached thumbnail, least recently used first
+ * Walks the usage index with a key cursor, so image blobs are never loaded.
+ */
+async function readUsage(db: IDBDatabase): Promise<Array<{ key: IDBValidKey; bytes: number }>> {
+  const entries: Array<{ key: IDBValidKey; bytes: number }> = [];
+  const tx = db.transaction(STORE, 'readonly');
+  const request = tx.objectStore(STORE).index(USAGE_INDEX).openKeyCursor();
+  request.onsuccess = () => {
+    const cursor = request.result;
+    if (!cursor) return;
+    const [, bytes] = cursor.key as [number, number];
+    entries.push({ key: cursor.primaryKey, bytes });
+    cursor.continue();
+  };
+  await done(tx);
+  return entries;
+}
+
+/**
+ * Delete least recently used thumbnails until the cache fits in maxBytes
+ */
+export async function evictThumbnails(maxBytes = DEFAULT_THUMBNAIL_BUDGET): Promise<number> {
+  const db = await openDB();
+  const entries = await readUsage(db);
+
+  let total = entries.reduce((sum, entry) => sum + entry.bytes, 0);
+  if (total <= maxBytes) return 0;
+
+  const tx = db.transaction(STORE, 'readwrite');
+  const store = tx.objectStore(STORE);
+  let evicted = 0;
+
+  // Entries are ordered oldest access first
+  for (const entry of entries) {
+    if (total <= maxBytes) break;
+    store.delete(entry.key);
+    total -= entry.bytes;
+    evicted++;
+  }
+
+  await done(tx);
+  return evicted;
+}
+
+/**
+ * Remove every cached thumbnail
+ */
+export async function clearThumbnailCache(): Promise<void> {
+  const db = await openDB();
+  const tx = db.transaction(STORE, 'readwrite');
+  tx.objectStore(STORE).clear();
+  await done(tx);
+}
+
+/**
+ * Get cache statistics
+ */
+export async function getThumbnailCacheStats(): Promise<{ items: number; bytes: number; budget: number }> {
+  const entries = await readUsage(await openDB());
+  return {
+    items: entries.length,
+    bytes: entries.reduce((sum, entry) => sum + entry.bytes, 0),
+    budget: DEFAULT_THUMBNAIL_BUDGET,
+  };
+}
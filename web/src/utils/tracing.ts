@@ -0,0 +1,37 @@
+/**
+ * Tracing (browser)
+ * The span model lives in @shared/tracing; this adds exporting the spans
+ * the page has collected. Spans export as plain JSON or as OTLP/JSON, which
+ * an OpenTelemetry collector accepts on /v1/traces or through its
+ * otlpjsonfile receiver.
+ */
+
+import { configureTracing, getSpans, toOTLP } from '@shared/tracing';
+
+export * from '@shared/tracing';
+
+configureTracing({
+  service: typeof window === 'undefined' ? 'pdf-merger-worker' : 'pdf-merger-web',
+});
+
+/**
+ * Serialize recorded spans (optionally one trace) as OTLP/JSON or plain JSON
+ */
+export function exportSpans(format: 'otlp' | 'json' = 'otlp', traceId?: string): string {
+  const spans = getSpans(traceId);
+  // OTLP stays on one line, as file receivers read one request per line
+  return format === 'otlp' ? JSON.stringify(toOTLP(spans)) : JSON.stringify(spans, null, 2);
+}
+
+/**
+ * Save recorded spans to a local file
+ */
+export function downloadSpans(format: 'otlp' | 'json' = 'otlp', traceId?: string): void {
+  const blob = new Blob([exportSpans(format, traceId)], { type: 'application/json' });
+  const url = URL.createObjectURL(blob);
+  const link = document.createElement('a');
+  link.href = url;
+  link.download = `trace-${traceId ?? Date.now()}.${format}.json`;
+  link.click();
+  URL.revokeObjectURL(url);
+}
@@ -0,0 +1,76 @@
+/**
+ * Undo History
+ * Bounded undo/redo stacks for immutable snapshots
+ *
+ * Snapshots share structure with each other (unchanged objects are reused,
+ * not copied), so each entry is charged only for what it keeps alive beyond
+ * the state it was replaced by. The oldest entries are evicted once either
+ * the entry count or the estimated byte total exceeds the budget.
+ */
+
+export interface HistoryBudget {
+  maxEntries: number;
+  maxBytes: number;
+}
+
+export const DEFAULT_HISTORY_BUDGET: HistoryBudget = {
+  maxEntries: 50,
+  maxBytes: 16 * 1024 * 1024, // 16MB
+};
+
+export interface HistoryEntry<T> {
+  snapshot: T;
+  bytes: number; // Estimated memory retained by this entry alone
+}
+
+// Rough per-object and per-slot costs for the estimate
+export const OBJECT_OVERHEAD_BYTES = 64;
+export const REFERENCE_BYTES = 8;
+
+/**
+ * Estimated bytes an array of objects keeps alive beyond `live`
+ * Objects also referenced by `live` are shared and cost only their slot.
+ */
+export function retainedBytes<T extends object>(
+  items: readonly T[],
+  live: readonly T[],
+  sizeOf: (item: T) => number
+): number {
+  const shared = new Set<T>(live);
+  let bytes = items.length * REFERENCE_BYTES;
+  for (const item of items) {
+    if (!shared.has(item)) bytes += sizeOf(item);
+  }
+  return bytes;
+}
+
+/**
+ * Total estimated bytes held by a stack
+ */
+export function historyBytes<T>(stack: readonly HistoryEntry<T>[]): number {
+  return stack.reduce((sum, entry) => sum + entry.bytes, 0);
+}
+
+/**
+ * Push an entry (newest last), evicting the oldest until the budget fits
+ * The newest entry is always kept so at least one step can be undone.
+ */
+export function pushHistory<T>(
+  stack: readonly HistoryEntry<T>[],
+  entry: HistoryEntry<T>,
+  budget: HistoryBudget = DEFAULT_HISTORY_BUDGET
+): HistoryEntry<T>[] {
+  const next = [...stack, entry];
+  let bytes = historyBytes(next);
+  let drop = 0;
+
+  while (
+    next.length - drop > 1 &&
+    (next.length - drop > budget.maxEntries || bytes > budget.maxBytes)
+  ) {
+    bytes -= next[drop].bytes;
+    drop++;
+  }
+
+  return drop > 0 ? next.slice(drop) : next;
+}
@@ -0,0 +1,282 @@
+/**
+ * Worker Pool Scheduler
+ * Shares a fixed budget of Web Workers between PDF operations and thumbnails
+ *
+ * - Up to N tasks run at once (hardwareConcurrency - 1, capped)
+ * - Priority lanes: visible thumbnails, then user operations, then prefetch
+ * - Tasks with the same key supersede each other (older ones are cancelled)
+ * - Transferable buffers are handed off instead of structured-cloned
+ *
+ * Worker protocol: every task message carries an `id`, and every message a
+ * worker posts for that task echoes it. Each worker kind says which message
+ * ends a task; anything before that (e.g. progress) goes to onMessage.
+ */
+
+export type TaskPriority = 'visible' | 'user' | 'prefetch';
+
+const PRIORITY_ORDER: TaskPriority[] = ['visible', 'user', 'prefetch'];
+
+export interface TaskOptions {
+  priority?: TaskPriority;
+  transfer?: Transferable[];
+  key?: string; // Newer tasks with the same key cancel older ones
+  affinity?: string; // Prefer the worker that last ran this affinity (e.g. same file)
+  signal?: AbortSignal;
+  onMessage?: (data: any) => void;
+  onDispatch?: () => void; // Called when the task leaves the queue for a worker
+}
+
+interface WorkerKind {
+  create: () => Worker;
+  isComplete: (data: any) => boolean;
+}
+
+interface PoolTask {
+  id: string;
+  kind: string;
+  message: Record<string, unknown>;
+  options: TaskOptions;
+  resolve: (data: any) => void;
+  reject: (error: Error) => void;
+  settled: boolean;
+  onAbort?: () => void; // Removed from options.signal once the task settles
+}
+
+interface PooledWorker {
+  kind: string;
+  worker: Worker;
+  taskId: string | null;
+  affinities: Set<string>;
+}
+
+export class TaskCancelledError extends Error {
+  constructor(message = 'Task cancelled') {
+    super(message);
+    this.name = 'TaskCancelledError';
+  }
+}
+
+const defaultPoolSize = (): number => {
+  const cores = typeof navigator !== 'undefined' ? navigator.hardwareConcurrency || 2 : 2;
+  return Math.max(1, Math.min(6, cores - 1));
+};
+
+export class WorkerScheduler {
+  readonly maxConcurrency: number;
+  private kinds = new Map<string, WorkerKind>();
+  private workers: PooledWorker[] = [];
+  private queues: Record<TaskPriority, PoolTask[]> = { visible: [], user: [], prefetch: [] };
+  private tasks = new Map<string, PoolTask>();
+  private nextId = 0;
+
+  constructor(maxConcurrency = defaultPoolSize()) {
+    this.maxConcurrency = maxConcurrency;
+  }
+
+  /**
+   * Register a worker kind; workers are spawned lazily on demand
+   */
+  register(kind: string, create: () => Worker, isComplete: (data: any) => boolean): void {
+    if (!this.kinds.has(kind)) {
+      this.kinds.set(kind, { create, isComplete });
+    }
+  }
+
+  /**
+   * Queue a task and resolve with the message that completes it
+   */
+  run<T = any>(kind: string, message: Record<string, unknown>, options: TaskOptions = {}): Promise<T> {
+    if (!this.kinds.has(kind)) {
+      return Promise.reject(new Error(`Unknown worker kind: ${kind}`));
+    }
+    if (options.signal?.aborted) {
+      return Promise.reject(new TaskCancelledError());
+    }
+    if (options.key) {
+      this.cancel(options.key);
+    }
+
+    return new Promise<T>((resolve, reject) => {
+      const task: PoolTask = {
+        id: `${kind}_${++this.nextId}`,
+        kind,
+        message,
+        options,
+        resolve,
+        reject,
+        settled: false,
+      };
+
+      if (options.signal) {
+        task.onAbort = () => this.cancelTask(task);
+        options.signal.addEventListener('abort', task.onAbort, { once: true });
+      }
+
+      this.tasks.set(task.id, task);
+      this.queues[options.priority ?? 'user'].push(task);
+      this.dispatch();
+    });
+  }
+
+  /**
+   * Send a message to every live worker of a kind, outside the queue
+   */
+  broadcast(kind: string, message: Record<string, unknown>): void {
+    this.workers
+      .filter((pooled) => pooled.kind === kind)
+      .forEach((pooled) => pooled.worker.postMessage(message));
+  }
+
+  /**
+   * Cancel every queued or running task with the given key
+   */
+  cancel(key: string): void {
+    this.tasks.forEach((task) => {
+      if (task.options.key === key) this.cancelTask(task);
+    });
+  }
+
+  /**
+   * Stop all workers of a kind (or all kinds) and reject their tasks
+   */
+  terminate(kind?: string): void {
+    this.tasks.forEach((task) => {
+      if (!kind || task.kind === kind) this.cancelTask(task);
+    });
+    this.workers = this.workers.filter((pooled) => {
+      if (kind && pooled.kind !== kind) return true;
+      pooled.worker.terminate();
+      return false;
+    });
+  }
+
+  get stats() {
+    return {
+      workers: this.workers.length,
+      running: this.workers.filter((pooled) => pooled.taskId !== null).length,
+      queued: PRIORITY_ORDER.reduce((sum, lane) => sum + this.queues[lane].length, 0),
+      maxConcurrency: this.maxConcurrency,
+    };
+  }
+
+  private cancelTask(task: PoolTask): void {
+    if (task.settled) return;
+    task.settled = true;
+    this.release(task);
+
+    // Queued tasks are dropped; running ones finish in the worker but are ignored
+    const queue = this.queues[task.options.priority ?? 'user'];
+    const index = queue.indexOf(task);
+    if (index !== -1) {
+      queue.splice(index, 1);
+      this.tasks.delete(task.id);
+    }
+    task.reject(new TaskCancelledError());
+  }
+
+  private dispatch(): void {
+    for (const lane of PRIORITY_ORDER) {
+      const queue = this.queues[lane];
+
+      for (let i = 0; i < queue.length; ) {
+        if (this.runningCount() >= this.maxConcurrency) return;
+
+        const task = queue[i];
+        const pooled = this.acquireWorker(task);
+        if (!pooled) {
+          i++;
+          continue;
+        }
+
+        queue.splice(i, 1);
+        pooled.taskId = task.id;
+        if (task.options.affinity) pooled.affinities.add(task.options.affinity);
+
+        try {
+          task.options.onDispatch?.();
+          pooled.worker.postMessage({ ...task.message, id: task.id }, task.options.transfer ?? []);
+        } catch (error) {
+          pooled.taskId = null;
+          this.finish(task, undefined, error instanceof Error ? error : new Error(String(error)));
+        }
+      }
+    }
+  }
+
+  private runningCount(): number {
+    return this.workers.filter((pooled) => pooled.taskId !== null).length;
+  }
+
+  private acquireWorker(task: PoolTask): PooledWorker | null {
+    const idle = this.workers.filter((pooled) => pooled.kind === task.kind && pooled.taskId === null);
+    const affinity = task.options.affinity;
+    const preferred = affinity ? idle.find((pooled) => pooled.affinities.has(affinity)) : undefined;
+    if (preferred || idle.length > 0) return preferred ?? idle[0];
+
+    const ofKind = this.workers.filter((pooled) => pooled.kind === task.kind).length;
+    if (ofKind >= this.maxConcurrency) return null;
+    return this.spawn(task.kind);
+  }
+
+  private spawn(kind: string): PooledWorker | null {
+    const definition = this.kinds.get(kind)!;
+    let worker: Worker;
+    try {
+      worker = definition.create();
+    } catch (error) {
+      console.error(`Failed to start ${kind} worker:`, error);
+      return null;
+    }
+
+    const pooled: PooledWorker = { kind, worker, taskId: null, affinities: new Set() };
+
+    worker.onmessage = (event: MessageEvent) => {
+      const data = event.data;
+      const task = data?.id ? this.tasks.get(data.id) : undefined;
+      const complete = definition.isComplete(data);
+
+      if (complete && data?.id === pooled.taskId) {
+        pooled.taskId = null;
+        if (task) this.finish(task, data);
+        this.dispatch();
+      } else if (task && !task.settled) {
+        task.options.onMessage?.(data);
+      }
+    };
+
+    worker.onerror = (event: ErrorEvent) => {
+      console.error(`${kind} worker error:`, event);
+      const task = pooled.taskId ? this.tasks.get(pooled.taskId) : undefined;
+      worker.terminate();
+      this.workers = this.workers.filter((other) => other !== pooled);
+      if (task) this.finish(task, undefined, new Error('Worker crashed'));
+      this.dispatch();
+    };
+
+    this.workers.push(pooled);
+    return pooled;
+  }
+
+  private finish(task: PoolTask, data?: any, error?: Error): void {
+    this.tasks.delete(task.id);
+    if (task.settled) return;
+    task.settled = true;
+    this.release(task);
+    if (error) task.reject(error);
+    else task.resolve(data);
+  }
+
+  /**
+   * Detach a settled task from its signal; a long-lived signal would
+   * otherwise keep every finished task and its payload reachable
+   */
+  private release(task: PoolTask): void {
+    if (task.onAbort) {
+      task.options.signal?.removeEventListener('abort', task.onAbort);
+      task.onAbort = undefined;
+    }
+  }
+}
+
+// One scheduler for the whole app so every worker kind shares the same budget
+export const workerScheduler = new WorkerScheduler();
@@ -1,10 +1,37 @@
 // PDF Worker for offloading heavy PDF operations
+//
+// Inputs arrive either as Blob handles (read here, so the main thread never
+// holds a copy) or as ArrayBuffers moved in with a transfer list. Results go
+// back as Blobs, which are posted by reference rather than cloned.
+//
+// Each task runs under the traceparent it was sent with; its spans (parse,
+// page copy, save) are returned with the result.
+//
+// A split task builds a run of parts from one parse of the source and posts
+// each one as a 'part' message as soon as it is saved; the final response
+// carries no result.
 import { PDFDocument } from 'pdf-lib';
+import {
+  mergePDFsStreaming,
+  splitPDFStream,
+  DedupStats,
+  PageSpan,
+  SplitPart,
+} from '../utils/pdfOperations';
+import {
+  SpanRecord,
+  TraceContext,
+  parseTraceparent,
+  startSpan,
+  takeSpans,
+  withSpan,
+} from '../utils/tracing';
 
 interface WorkerMessage {
   id: string;
-  type: 'merge' | 'extract' | 'rotate' | 'reorder' | 'delete' | 'split';
+  type: 'merge' | 'mergeStream' | 'extract' | 'rotate' | 'reorder' | 'delete' | 'split';
   payload: any;
+  traceparent?: string;
 }
 
 interface WorkerResponse {
@@ -13,62 +40,104 @@ interface WorkerResponse {
   result?: Blob;
   error?: string;
   progress?: number;
+  bytesWritten?: number;
+  dedup?: DedupStats;
+  spans?: SpanRecord[];
 }
 
-// Helper to load PDF from array buffer
-async function loadPDF(arrayBuffer: ArrayBuffer): Promise<PDFDocument> {
-  return PDFDocument.load(arrayBuffer);
+interface SplitPayload {
+  blob: Blob;
+  ranges: PageSpan[];
+  indexOffset: number; // Index of ranges[0] in the whole split
+  total: number; // Parts in the whole split
+  rotations?: Record<number, number>;
+  deduplicate?: boolean;
+}
+
+type PDFInput = ArrayBuffer | Blob;
+
+// Helper to load PDF from a transferred buffer or a Blob handle
+async function loadPDF(input: PDFInput, trace: TraceContext): Promise<PDFDocument> {
+  return withSpan('pdf.parse', trace, async (span) => {
+    const bytes = input instanceof Blob ? await input.arrayBuffer() : input;
+    const doc = await PDFDocument.load(bytes);
+    span.setAttributes({ bytes: bytes.byteLength, pages: doc.getPageCount() });
+    return doc;
+  });
+}
+
+// Copy pages from source into target, in the given order
+async function copyInto(
+  target: PDFDocument,
+  source: PDFDocument,
+  indices: number[],
+  trace: TraceContext
+): Promise<void> {
+  await withSpan(
+    'pdf.copyPages',
+    trace,
+    async () => {
+      const pages = await target.copyPages(source, indices);
+      pages.forEach((page) => target.addPage(page));
+    },
+    { pages: indices.length }
+  );
+}
+
+// Serialize a document into a Blob
+async function saveToBlob(doc: PDFDocument, trace: TraceContext): Promise<Blob> {
+  return withSpan('pdf.save', trace, async (span) => {
+    const bytes = await doc.save();
+    span.setAttributes({ bytes: bytes.byteLength, pages: doc.getPageCount() });
+    return new Blob([bytes as BlobPart], { type: 'application/pdf' });
+  });
 }
 
 // Merge multiple PDFs
-async function mergePDFs(fileBuffers: ArrayBuffer[]): Promise<Blob> {
+async function mergePDFs(
+  fileBuffers: PDFInput[],
+  onProgress: (progress: number) => void,
+  trace: TraceContext
+): Promise<Blob> {
   const merged = await PDFDocument.create();
 
   for (let i = 0; i < fileBuffers.length; i++) {
-    const doc = await loadPDF(fileBuffers[i]);
-    const pages = await merged.copyPages(doc, doc.getPageIndices());
-    pages.forEach((page) => merged.addPage(page));
+    const doc = await loadPDF(fileBuffers[i], trace);
+    await copyInto(merged, doc, doc.getPageIndices(), trace);
+    // Drop the source bytes as soon as its pages are copied
+    fileBuffers[i] = new ArrayBuffer(0);
 
     // Send progress update
-    self.postMessage({
-      type: 'progress',
-      progress: ((i + 1) / fileBuffers.length) * 100,
-    });
+    onProgress(((i + 1) / fileBuffers.length) * 100);
   }
 
-  const mergedBytes = await merged.save();
-  return new Blob([mergedBytes as BlobPart], { type: 'application/pdf' });
+  return saveToBlob(merged, trace);
 }
 
 // Extract specific pages
-async function extractPages(buffer: ArrayBuffer, pageNumbers: number[]): Promise<Blob> {
-  const doc = await loadPDF(buffer);
+async function extractPages(buffer: PDFInput, pageNumbers: number[], trace: TraceContext): Promise<Blob> {
+  const doc = await loadPDF(buffer, trace);
   const extracted = await PDFDocument.create();
 
   const validPages = pageNumbers.filter((p) => p >= 1 && p <= doc.getPageCount());
-  const pagesToCopy = await extracted.copyPages(doc, validPages.map((p) => p - 1));
-  pagesToCopy.forEach((page) => extracted.addPage(page));
+  await copyInto(extracted, doc, validPages.map((p) => p - 1), trace);
 
-  const extractedBytes = await extracted.save();
-  return new Blob([extractedBytes as BlobPart], { type: 'application/pdf' });
+  return saveToBlob(extracted, trace);
 }
 
 // Reorder pages
-async function reorderPages(buffer: ArrayBuffer, newOrder: number[]): Promise<Blob> {
-  const doc = await loadPDF(buffer);
+async function reorderPages(buffer: PDFInput, newOrder: number[], trace: TraceContext): Promise<Blob> {
+  const doc = await loadPDF(buffer, trace);
   const reordered = await PDFDocument.create();
 
-  const pageIndices = newOrder.map((p) => p - 1);
-  const copiedPages = await reordered.copyPages(doc, pageIndices);
-  copiedPages.forEach((page) => reordered.addPage(page));
+  await copyInto(reordered, doc, newOrder.map((p) => p - 1), trace);
 
-  const reorderedBytes = await reordered.save();
-  return new Blob([reorderedBytes as BlobPart], { type: 'application/pdf' });
+  return saveToBlob(reordered, trace);
 }
 
 // Delete pages
-async function deletePages(buffer: ArrayBuffer, pageNumbers: number[]): Promise<Blob> {
-  const doc = await loadPDF(buffer);
+async function deletePages(buffer: PDFInput, pageNumbers: number[], trace: TraceContext): Promise<Blob> {
+  const doc = await loadPDF(buffer, trace);
   const totalPages = doc.getPageCount();
 
   const pagesToDelete = pageNumbers
@@ -79,46 +148,95 @@ async function deletePages(buffer: ArrayBuffer, pageNumbers: number[]): Promise<
     doc.removePage(pageNum - 1);
   }
 
-  const deletedBytes = await doc.save();
-  return new Blob([deletedBytes as BlobPart], { type: 'application/pdf' });
+  return saveToBlob(doc, trace);
+}
+
+// Build a run of split parts, posting each one as soon as it is saved
+async function splitRun(
+  payload: SplitPayload,
+  onPart: (part: SplitPart) => void,
+  trace: TraceContext
+): Promise<void> {
+  const { blob, ranges, indexOffset, total, rotations, deduplicate } = payload;
+  const doc = await loadPDF(blob, trace);
+
+  await withSpan(
+    'pdf.split',
+    trace,
+    async () => {
+      for await (const part of splitPDFStream(doc, ranges, { rotations, deduplicate })) {
+        onPart({ ...part, index: indexOffset + part.index, total });
+      }
+    },
+    { parts: ranges.length }
+  );
 }
 
 // Main message handler
 self.addEventListener('message', async (event: MessageEvent<WorkerMessage>) => {
-  const { id, type, payload } = event.data;
+  const { id, type, payload, traceparent } = event.data;
+  const span = startSpan(`worker.${type}`, parseTraceparent(traceparent));
+  const trace = span.context;
 
   try {
     let result: Blob | undefined;
+    let dedup: DedupStats | undefined;
 
     switch (type) {
       case 'merge':
-        result = await mergePDFs(payload.fileBuffers);
+        result = await mergePDFs(payload.fileBuffers, (progress) => {
+          self.postMessage({ id, type: 'progress', progress });
+        }, trace);
+        break;
+      case 'mergeStream':
+        // Blobs are read one at a time inside the worker
+        result = await mergePDFsStreaming(
+          payload.fileBlobs,
+          (progress, bytesWritten) => {
+            self.postMessage({ id, type: 'progress', progress, bytesWritten });
+          },
+          {
+            deduplicate: payload.deduplicate,
+            onDeduplicated: (stats) => {
+              dedup = stats;
+            },
+            trace,
+          }
+        );
         break;
       case 'extract':
-        result = await extractPages(payload.buffer, payload.pageNumbers);
+        result = await extractPages(payload.buffer, payload.pageNumbers, trace);
         break;
       case 'reorder':
-        result = await reorderPages(payload.buffer, payload.newOrder);
+        result = await reorderPages(payload.buffer, payload.newOrder, trace);
         break;
       case 'delete':
-        result = await deletePages(payload.buffer, payload.pageNumbers);
+        result = await deletePages(payload.buffer, payload.pageNumbers, trace);
+        break;
+      case 'split':
+        await splitRun(payload, (part) => self.postMessage({ id, type: 'part', part }), trace);
         break;
       default:
         throw new Error(`Unknown operation type: ${type}`);
     }
 
+    span.end();
     const response: WorkerResponse = {
       id,
       success: true,
       result,
+      dedup,
+      spans: takeSpans(trace.traceId),
     };
 
     self.postMessage(response);
   } catch (error) {
+    span.end(error);
     const response: WorkerResponse = {
       id,
       success: false,
       error: error instanceof Error ? error.message : 'Unknown error',
+      spans: takeSpans(trace.traceId),
     };
 
     self.postMessage(response);
@@ -2,15 +2,33 @@
  * Thumbnail Worker
  * Generates PDF page thumbnails using OffscreenCanvas in a Web Worker
  * Runs asynchronously to prevent UI blocking
+ *
+ * Each file is parsed once and kept open while its pages are requested.
+ * Rendered thumbnails are persisted in IndexedDB (see utils/thumbnailCache),
+ * so re-opening a file only renders pages that were never seen before. The
+ * file is recognized by a fingerprint of its ends and its page count comes
+ * from the metadata reader, so a fully cached file is never parsed.
  */
 
 import * as pdfjsLib from 'pdfjs-dist';
+import {
+  DEFAULT_THUMBNAIL_BUDGET,
+  clearThumbnailCache,
+  evictThumbnails,
+  fingerprintContent,
+  getCachedThumbnails,
+  getThumbnailCacheStats,
+  putCachedThumbnails,
+  sizeKey,
+} from '../utils/thumbnailCache';
+import { readPDFMetadata } from '../utils/pdfMetadata';
 
 // Set up PDF.js worker
 pdfjsLib.GlobalWorkerOptions.workerSrc = `//cdnjs.cloudflare.com/ajax/libs/pdf.js/${pdfjsLib.version}/pdf.worker.min.js`;
 
 interface ThumbnailRequest {
   id: string;
+  fileKey: string; // Stable per file for the lifetime of the page
   pdfBlob: Blob;
   pageNumber: number;
   width?: number;
@@ -18,203 +36,268 @@ interface ThumbnailRequest {
   quality?: number;
 }
 
+interface ThumbnailBatchRequest {
+  fileKey: string;
+  pdfBlob: Blob;
+  startPage: number;
+  endPage: number;
+  options?: { width?: number; height?: number; quality?: number };
+}
+
 interface ThumbnailResponse {
   id: string;
   pageNumber: number;
-  thumbnail?: ImageData;
-  canvas?: OffscreenCanvas;
+  image?: Blob;
   error?: string;
   cached?: boolean;
 }
 
-// In-memory cache for recently generated thumbnails
-const thumbnailCache = new Map<string, ImageData>();
-const CACHE_SIZE = 50; // Keep last 50 thumbnails in memory
+interface OpenDocument {
+  contentHash: string;
+  numPages: number;
+  pdf: Promise<pdfjsLib.PDFDocumentProxy> | null; // Parsed on the first cache miss
+}
 
-/**
- * Generate thumbnail for a PDF page using OffscreenCanvas
- */
-async function generateThumbnail(request: ThumbnailRequest): Promise<ThumbnailResponse> {
-  const { id, pdfBlob, pageNumber, width = 200, height = 280 } = request;
+// Parsed documents kept open, least recently used first
+const openDocuments = new Map<string, Promise<OpenDocument>>();
+const MAX_OPEN_DOCUMENTS = 3;
 
-  try {
-    // Check cache first
-    const cacheKey = `${id}-page-${pageNumber}`;
-    if (thumbnailCache.has(cacheKey)) {
-      return {
-        id,
-        pageNumber,
-        thumbnail: thumbnailCache.get(cacheKey),
-        cached: true,
-      };
-    }
+// Evict at most once per burst of writes
+let evictionTimer: ReturnType<typeof setTimeout> | null = null;
 
-    // Load PDF document
-    const arrayBuffer = await blobToArrayBuffer(pdfBlob);
-    const pdf = await pdfjsLib.getDocument({ data: arrayBuffer }).promise;
+/**
+ * Get the parsed document for a file, loading it on first use
+ */
+function openDocument(fileKey: string, pdfBlob: Blob): Promise<OpenDocument> {
+  const existing = openDocuments.get(fileKey);
+  if (existing) {
+    // Refresh LRU position
+    openDocuments.delete(fileKey);
+    openDocuments.set(fileKey, existing);
+    return existing;
+  }
 
-    // Get specific page
-    const page = await pdf.getPage(pageNumber);
-    const viewport = page.getViewport({ scale: 1 });
+  const loading = (async (): Promise<OpenDocument> => {
+    const [contentHash, metadata] = await Promise.all([
+      fingerprintContent(pdfBlob),
+      readPDFMetadata(pdfBlob),
+    ]);
+    return { contentHash, numPages: metadata.pageCount, pdf: null };
+  })();
 
-    // Calculate scale to fit width/height
-    const scaleX = width / viewport.width;
-    const scaleY = height / viewport.height;
-    const scale = Math.min(scaleX, scaleY, 1); // Don't upscale
+  openDocuments.set(fileKey, loading);
+  loading.catch(() => openDocuments.delete(fileKey));
 
-    const scaledViewport = page.getViewport({ scale });
+  while (openDocuments.size > MAX_OPEN_DOCUMENTS) {
+    const oldestKey = openDocuments.keys().next().value as string;
+    closeDocument(oldestKey);
+  }
 
-    // Create OffscreenCanvas for rendering
-    const canvas = new OffscreenCanvas(scaledViewport.width, scaledViewport.height);
-    const context = canvas.getContext('2d');
+  return loading;
+}
 
-    if (!context) {
-      throw new Error('Failed to get canvas context');
-    }
+/**
+ * Parse the document with PDF.js, once, when a page has to be rendered
+ */
+function parseDocument(doc: OpenDocument, pdfBlob: Blob): Promise<pdfjsLib.PDFDocumentProxy> {
+  if (!doc.pdf) {
+    doc.pdf = pdfBlob.arrayBuffer().then((data) => pdfjsLib.getDocument({ data }).promise);
+    doc.pdf.catch(() => {
+      doc.pdf = null;
+    });
+  }
+  return doc.pdf;
+}
 
-    // Render page to canvas
-    const renderContext = {
-      canvasContext: context as any,
-      viewport: scaledViewport,
-    };
+/**
+ * Release a parsed document
+ */
+function closeDocument(fileKey: string): void {
+  const doc = openDocuments.get(fileKey);
+  if (!doc) return;
+  openDocuments.delete(fileKey);
+  doc
+    .then(({ pdf }) => pdf?.then((parsed) => parsed.destroy()))
+    .catch(() => undefined);
+}
 
-    await page.render(renderContext).promise;
+/**
+ * Render one page to a JPEG blob using OffscreenCanvas
+ */
+async function renderPage(
+  pdf: pdfjsLib.PDFDocumentProxy,
+  pageNumber: number,
+  width: number,
+  height: number,
+  quality: number
+): Promise<Blob> {
+  const page = await pdf.getPage(pageNumber);
+  const viewport = page.getViewport({ scale: 1 });
+
+  // Calculate scale to fit width/height
+  const scaleX = width / viewport.width;
+  const scaleY = height / viewport.height;
+  const scale = Math.min(scaleX, scaleY, 1); // Don't upscale
+
+  const scaledViewport = page.getViewport({ scale });
+
+  // Create OffscreenCanvas for rendering
+  const canvas = new OffscreenCanvas(scaledViewport.width, scaledViewport.height);
+  const context = canvas.getContext('2d');
+
+  if (!context) {
+    throw new Error('Failed to get canvas context');
+  }
 
-    // Get image data from canvas
-    const imageData = context.getImageData(0, 0, canvas.width, canvas.height);
+  await page.render({
+    canvasContext: context as any,
+    viewport: scaledViewport,
+  }).promise;
+  page.cleanup();
 
-    // Cache the thumbnail
-    if (thumbnailCache.size >= CACHE_SIZE) {
-      const firstKey = thumbnailCache.keys().next().value;
-      if (firstKey) thumbnailCache.delete(firstKey);
-    }
-    thumbnailCache.set(cacheKey, imageData);
-
-    return {
-      id,
-      pageNumber,
-      thumbnail: imageData,
-      cached: false,
-    };
-  } catch (error) {
-    return {
-      id,
-      pageNumber,
-      error: error instanceof Error ? error.message : 'Unknown error',
-    };
-  }
+  return canvas.convertToBlob({ type: 'image/jpeg', quality });
 }
 
 /**
- * Generate multiple thumbnails for a range of pages
+ * Render a range of pages from one open document
+ * Cache hits are reported first in one message; renders stream in as they
+ * finish, and batch_complete (with the page count) ends the task.
  */
-async function generateThumbnailBatch(
-  pdfBlob: Blob,
-  startPage: number,
-  endPage: number,
-  options: { width?: number; height?: number; quality?: number } = {}
-): Promise<ThumbnailResponse[]> {
-  const results: ThumbnailResponse[] = [];
+async function generateThumbnailBatch(request: ThumbnailBatchRequest, batchId: string): Promise<void> {
+  const { fileKey, pdfBlob, startPage, endPage, options = {} } = request;
+  const { width = 200, height = 280, quality = 0.7 } = options;
+  let numPages: number | undefined;
 
   try {
-    const arrayBuffer = await blobToArrayBuffer(pdfBlob);
-    const pdf = await pdfjsLib.getDocument({ data: arrayBuffer }).promise;
-    const totalPages = pdf.numPages;
+    const doc = await openDocument(fileKey, pdfBlob);
+    const { contentHash } = doc;
+    const size = sizeKey(width, height);
+    numPages = doc.numPages;
 
     // Clamp page range
     const start = Math.max(1, startPage);
-    const end = Math.min(totalPages, endPage);
+    const end = Math.min(doc.numPages, endPage);
 
+    const cached = await getCachedThumbnails(contentHash, size, start, end);
+    const hits: ThumbnailResponse[] = [];
     for (let pageNum = start; pageNum <= end; pageNum++) {
-      const result = await generateThumbnail({
-        id: `batch-${Date.now()}`,
-        pdfBlob,
-        pageNumber: pageNum,
-        ...options,
-      });
-      results.push(result);
+      const image = cached.get(pageNum);
+      if (image) hits.push({ id: batchId, pageNumber: pageNum, image, cached: true });
+    }
+    if (hits.length > 0) {
+      self.postMessage({ id: batchId, type: 'batch_ready', results: hits });
     }
-  } catch (error) {
-    return [
-      {
-        id: `batch-${Date.now()}`,
-        pageNumber: startPage,
-        error: error instanceof Error ? error.message : 'Unknown error',
-      },
-    ];
-  }
 
-  return results;
-}
+    const rendered: Array<{ pageNumber: number; image: Blob }> = [];
+    for (let pageNum = start; pageNum <= end; pageNum++) {
+      if (cached.has(pageNum)) continue;
+
+      try {
+        const pdf = await parseDocument(doc, pdfBlob);
+        const image = await renderPage(pdf, pageNum, width, height, quality);
+        rendered.push({ pageNumber: pageNum, image });
+        self.postMessage({
+          id: batchId,
+          type: 'thumbnail_ready',
+          result: { id: batchId, pageNumber: pageNum, image, cached: false },
+        });
+      } catch (error) {
+        self.postMessage({
+          id: batchId,
+          type: 'thumbnail_ready',
+          result: {
+            id: batchId,
+            pageNumber: pageNum,
+            error: error instanceof Error ? error.message : 'Unknown error',
+          },
+        });
+      }
+    }
 
-/**
- * Convert Blob to ArrayBuffer
- */
-function blobToArrayBuffer(blob: Blob): Promise<ArrayBuffer> {
-  return new Promise((resolve, reject) => {
-    const reader = new FileReader();
-    reader.onload = () => resolve(reader.result as ArrayBuffer);
-    reader.onerror = () => reject(reader.error);
-    reader.readAsArrayBuffer(blob);
-  });
-}
+    await putCachedThumbnails(contentHash, size, rendered);
+    scheduleEviction();
+  } catch (error) {
+    self.postMessage({
+      id: batchId,
+      type: 'batch_ready',
+      results: [
+        {
+          id: batchId,
+          pageNumber: startPage,
+          error: error instanceof Error ? error.message : 'Unknown error',
+        },
+      ],
+    });
+  }
 
-/**
- * Clear cache
- */
-function clearCache(): void {
-  thumbnailCache.clear();
+  self.postMessage({ id: batchId, type: 'batch_complete', numPages });
 }
 
 /**
- * Get cache statistics
+ * Trim the persistent cache to its byte budget shortly after writes settle
  */
-function getCacheStats(): { size: number; capacity: number; items: number } {
-  return {
-    size: thumbnailCache.size,
-    capacity: CACHE_SIZE,
-    items: thumbnailCache.size,
-  };
+function scheduleEviction(): void {
+  if (evictionTimer) return;
+  evictionTimer = setTimeout(() => {
+    evictionTimer = null;
+    evictThumbnails(DEFAULT_THUMBNAIL_BUDGET).catch((error) =>
+      console.warn('Thumbnail cache eviction failed:', error)
+    );
+  }, 2000);
 }
 
 // Message handler
 self.onmessage = async (event: MessageEvent<any>) => {
-  const { type, payload } = event.data;
+  const { id, type, payload } = event.data;
 
   switch (type) {
     case 'generate_thumbnail':
       {
-        const result = await generateThumbnail(payload);
-        self.postMessage({ type: 'thumbnail_ready', result });
+        const { fileKey, pdfBlob, pageNumber, width, height, quality } = payload as ThumbnailRequest;
+        await generateThumbnailBatch(
+          {
+            fileKey,
+            pdfBlob,
+            startPage: pageNumber,
+            endPage: pageNumber,
+            options: { width, height, quality },
+          },
+          id
+        );
       }
       break;
 
     case 'generate_batch':
-      {
-        const { pdfBlob, startPage, endPage, options } = payload;
-        const results = await generateThumbnailBatch(pdfBlob, startPage, endPage, options);
-        self.postMessage({ type: 'batch_ready', results });
-      }
+      await generateThumbnailBatch(payload as ThumbnailBatchRequest, id);
+      break;
+
+    case 'close_document':
+      closeDocument(payload.fileKey);
+      break;
+
+    case 'close_all':
+      Array.from(openDocuments.keys()).forEach(closeDocument);
       break;
 
     case 'clear_cache':
       {
-        clearCache();
-        self.postMessage({ type: 'cache_cleared' });
+        Array.from(openDocuments.keys()).forEach(closeDocument);
+        await clearThumbnailCache();
+        self.postMessage({ id, type: 'cache_cleared' });
       }
       break;
 
     case 'get_stats':
       {
-        const stats = getCacheStats();
-        self.postMessage({ type: 'stats', stats });
+        const stats = await getThumbnailCacheStats();
+        self.postMessage({ id, type: 'stats', stats: { ...stats, openDocuments: openDocuments.size } });
       }
       break;
 
     default:
-      self.postMessage({ type: 'error', error: 'Unknown message type' });
+      self.postMessage({ id, type: 'error', error: 'Unknown message type' });
   }
 };
 
 // Export for TypeScript type checking
-export type { ThumbnailRequest, ThumbnailResponse };
+export type { ThumbnailRequest, ThumbnailBatchRequest, ThumbnailResponse };
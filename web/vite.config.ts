@@ -18,6 +18,8 @@ export default defineConfig({
       '@utils': path.resolve(__dirname, './src/utils'),
       '@types': path.resolve(__dirname, './src/types'),
       '@context': path.resolve(__dirname, './src/context'),
+      // Code shared with Cloud Functions lives in the deployed package
+      '@shared': path.resolve(__dirname, '../functions/src/shared'),
     },
   },
   optimizeDeps: {